@@ -0,0 +1,31 @@
+"""
+Performance benchmarks. They run against their own throwaway SQLite
+database and never touch the development database, e.g.::
+
+    python -m benchmarks.borrowing_indexes --rows 2000000
+"""
+import os
+import statistics
+import time
+
+
+def setup_django(database_path):
+    """Configure Django to use the given SQLite file and set it up."""
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "library_service.settings")
+    os.environ.setdefault("SECRET_KEY", "benchmark")
+
+    import django
+    from django.conf import settings
+
+    settings.DATABASES["default"]["NAME"] = str(database_path)
+    django.setup()
+
+
+def measure(func, repeat=20):
+    """Return the median run time of ``func`` in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
@@ -0,0 +1,164 @@
+"""
+Compare the sync (WSGI) and the async (ASGI) borrowing endpoints
+under concurrent load::
+
+    python -m benchmarks.async_borrowings --requests 2000 --concurrency 50
+
+Both applications are called in-process through httpx transports, so
+this measures the request handling of each stack (thread pool vs event
+loop), not the network. How many slow clients one worker can hold
+open is a property of the ASGI server running the async views.
+"""
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import httpx
+
+from benchmarks import setup_django
+
+BASE_URL = "http://localhost"
+
+
+def seed(borrowings):
+    """Create a user with ``borrowings`` borrowings, return a token."""
+    from datetime import date
+
+    from django.contrib.auth import get_user_model
+    from django.db import transaction
+
+    from books_app.models import Book
+    from borrowings_app.models import Borrowing
+    from users.serializers import ClaimsTokenObtainPairSerializer
+
+    with transaction.atomic():
+        user = get_user_model().objects.create_user(
+            "benchmark@test.com", "benchmark"
+        )
+        books = Book.objects.bulk_create(
+            Book(
+                title=f"Book {number}",
+                author="Author",
+                cover=Book.HARD,
+                inventory=10,
+                daily_fee=1,
+            )
+            for number in range(100)
+        )
+        Borrowing.objects.bulk_create(
+            Borrowing(
+                borrow_date=date.today(),
+                expected_return_date=date.today(),
+                book=books[number % len(books)],
+                user=user,
+            )
+            for number in range(borrowings)
+        )
+
+    token = ClaimsTokenObtainPairSerializer.get_token(user).access_token
+    return f"Bearer {token}", Borrowing.objects.latest("id").id
+
+
+def summary(name, timings, elapsed):
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    return (
+        f"{name:<28}{len(timings) / elapsed:>10.0f}"
+        f"{statistics.median(timings):>10.2f}{p95:>10.2f}"
+    )
+
+
+def run_wsgi(application, path, headers, requests, concurrency):
+    client = httpx.Client(
+        transport=httpx.WSGITransport(app=application), base_url=BASE_URL
+    )
+
+    def call(_):
+        start = time.perf_counter()
+        response = client.get(path, headers=headers)
+        response.raise_for_status()
+        return (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        timings = list(executor.map(call, range(requests)))
+    return timings, time.perf_counter() - start
+
+
+async def run_asgi(application, path, headers, requests, concurrency):
+    client = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=application), base_url=BASE_URL
+    )
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def call():
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.get(path, headers=headers)
+            response.raise_for_status()
+            return (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    timings = await asyncio.gather(*(call() for _ in range(requests)))
+    elapsed = time.perf_counter() - start
+    await client.aclose()
+    return timings, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--borrowings", type=int, default=10_000)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        setup_django(Path(directory) / "benchmark.sqlite3")
+
+        from django.core.asgi import get_asgi_application
+        from django.core.management import call_command
+        from django.core.wsgi import get_wsgi_application
+
+        call_command("migrate", verbosity=0)
+        token, borrowing_id = seed(args.borrowings)
+        headers = {"Authorize": token}
+
+        endpoints = {
+            "list": "borrowings/?page_size=20",
+            "detail": f"borrowings/{borrowing_id}/",
+        }
+        wsgi = get_wsgi_application()
+        asgi = get_asgi_application()
+
+        print(
+            f"{args.requests} requests, {args.concurrency} concurrent\n"
+            f"{'endpoint':<28}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}"
+        )
+        for name, path in endpoints.items():
+            timings, elapsed = run_wsgi(
+                wsgi,
+                f"/api/{path}",
+                headers,
+                args.requests,
+                args.concurrency,
+            )
+            print(summary(f"WSGI {name}", timings, elapsed))
+
+            timings, elapsed = asyncio.run(
+                run_asgi(
+                    asgi,
+                    f"/api/async/{path}",
+                    headers,
+                    args.requests,
+                    args.concurrency,
+                )
+            )
+            print(summary(f"ASGI {name}", timings, elapsed))
+
+
+if __name__ == "__main__":
+    main()
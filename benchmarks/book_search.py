@@ -0,0 +1,115 @@
+"""
+Compare the full-text book search with a LIKE '%...%' scan
+on a seeded catalog::
+
+    python -m benchmarks.book_search --books 1000000
+"""
+import argparse
+import random
+import tempfile
+from pathlib import Path
+
+from benchmarks import measure, setup_django
+
+SYLLABLES = "ka lo mi ren tas vel dor un shi pra gal ost em ri zu bel".split()
+
+
+def vocabulary(rng, size=20_000):
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.sample(SYLLABLES, rng.randint(2, 4))))
+    return sorted(words)
+
+
+def seed(connection, books, seed_value):
+    """Seed books titled with 4 random words, return one of the titles."""
+    from django.db import transaction
+    from django.utils import timezone
+
+    rng = random.Random(seed_value)
+    words = vocabulary(rng)
+    now = connection.ops.adapt_datetimefield_value(timezone.now())
+    title = None
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        chunk = 50_000
+        for start in range(0, books, chunk):
+            cursor.executemany(
+                "INSERT INTO books_app_book "
+                "(title, author, cover, inventory, daily_fee, updated_at, "
+                "borrow_count) VALUES (%s, %s, 'HARD', 10, 1.5, %s, 0)",
+                [
+                    (
+                        " ".join(rng.sample(words, 4)) + f" {number}",
+                        f"author{rng.randint(1, books // 10 or 1)}",
+                        now,
+                    )
+                    for number in range(start, min(start + chunk, books))
+                ],
+            )
+            cursor.execute(
+                "SELECT title FROM books_app_book ORDER BY id DESC LIMIT 1"
+            )
+            title = cursor.fetchone()[0]
+
+    return title
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--books", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--query",
+        default=None,
+        help="Search text, two words of the last title by default",
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        setup_django(Path(directory) / "benchmark.sqlite3")
+
+        from django.core.management import call_command
+        from django.db import connection
+        from django.db.models import Q
+
+        from books_app.models import Book
+        from books_app.search import search_books
+
+        call_command("migrate", verbosity=0)
+
+        print(f"Seeding {args.books} books...")
+        title = seed(connection, args.books, args.seed)
+        query = args.query or " ".join(title.split()[1:3])
+        print(f"Searching for {query!r}")
+
+        terms = query.split()
+        like = Book.objects.all()
+        for term in terms:
+            like = like.filter(
+                Q(title__icontains=term) | Q(author__icontains=term)
+            )
+
+        searches = {
+            "LIKE scan, first 20": like.order_by("id")[:20],
+            "LIKE scan, count": like,
+            "full-text, first 20": search_books(
+                Book.objects.all(), query
+            )[:20],
+            "full-text, count": search_books(Book.objects.all(), query),
+        }
+
+        print(f"{'search':<24}{'ms':>10}")
+        for name, queryset in searches.items():
+            if name.endswith("count"):
+                timing = measure(queryset.count, repeat=args.repeat)
+            else:
+                timing = measure(
+                    lambda: list(queryset.all()), repeat=args.repeat
+                )
+            print(f"{name:<24}{timing:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Compare the hot borrowing queries before and after the indexes of
+borrowings_app migration 0003 on a seeded table::
+
+    python -m benchmarks.borrowing_indexes --rows 2000000
+"""
+import argparse
+import random
+import tempfile
+from datetime import date, timedelta
+from pathlib import Path
+
+from benchmarks import measure, setup_django
+
+BEFORE = "0002_borrowing_is_active"
+AFTER = "0003_borrowing_indexes"
+# Columns of the borrowings table at both migrations, the model has
+# later ones
+COLUMNS = (
+    "id",
+    "borrow_date",
+    "expected_return_date",
+    "actual_return_date",
+    "book_id",
+    "user_id",
+    "is_active",
+)
+
+
+def seed(connection, rows, users, books, seed_value):
+    from django.db import transaction
+    from django.utils import timezone
+
+    rng = random.Random(seed_value)
+    today = date.today()
+    now = connection.ops.adapt_datetimefield_value(timezone.now())
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.executemany(
+            "INSERT INTO users_user (id, password, is_superuser, "
+            "first_name, last_name, is_staff, is_active, date_joined, "
+            "email, auth_version, updated_at) "
+            "VALUES (%s, '!', 0, '', '', 0, 1, %s, %s, 0, %s)",
+            [
+                (i, today.isoformat(), f"user{i}@example.com", now)
+                for i in range(1, users + 1)
+            ],
+        )
+        cursor.executemany(
+            "INSERT INTO books_app_book "
+            "(id, title, author, cover, inventory, daily_fee, updated_at, "
+            "borrow_count) VALUES (%s, %s, 'author', 'HARD', 10, 1.5, %s, 0)",
+            [(i, f"book {i}", now) for i in range(1, books + 1)],
+        )
+
+        chunk = 100_000
+        for start in range(0, rows, chunk):
+            batch = []
+            for _ in range(min(chunk, rows - start)):
+                borrowed = today - timedelta(days=rng.randint(0, 3 * 365))
+                expected = borrowed + timedelta(days=14)
+                # About 5% of the borrowings are still active
+                is_active = rng.random() < 0.05
+                returned = None if is_active else expected
+                batch.append(
+                    (
+                        borrowed.isoformat(),
+                        expected.isoformat(),
+                        returned and returned.isoformat(),
+                        rng.randint(1, books),
+                        rng.randint(1, users),
+                        is_active,
+                    )
+                )
+            cursor.executemany(
+                "INSERT INTO borrowings_app_borrowing (borrow_date, "
+                "expected_return_date, actual_return_date, book_id, "
+                "user_id, is_active) VALUES (%s, %s, %s, %s, %s, %s)",
+                batch,
+            )
+
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE")
+
+
+def queries(user_id, book_id):
+    from borrowings_app.models import Borrowing
+
+    return {
+        "active borrowings of user": Borrowing.objects.filter(
+            user_id=user_id, is_active=True
+        ).order_by("-id"),
+        "all borrowings of user": Borrowing.objects.filter(
+            user_id=user_id
+        ).order_by("-id")[:50],
+        "active borrowings of book": Borrowing.objects.filter(
+            book_id=book_id, is_active=True
+        ),
+        "overdue borrowings": Borrowing.objects.filter(
+            is_active=True, expected_return_date__lt=date.today()
+        ).order_by("expected_return_date")[:500],
+    }
+
+
+def run(connection, user_id, book_id, repeat):
+    results = {}
+    for name, queryset in queries(user_id, book_id).items():
+        queryset = queryset.values_list(*COLUMNS)
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            plan = "; ".join(row[-1] for row in cursor.fetchall())
+        timing = measure(lambda: list(queryset.all()), repeat=repeat)
+        results[name] = (timing, plan)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--books", type=int, default=2_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        setup_django(Path(directory) / "benchmark.sqlite3")
+
+        from django.core.management import call_command
+        from django.db import connection
+
+        call_command("migrate", verbosity=0)
+        call_command("migrate", "borrowings_app", BEFORE, verbosity=0)
+
+        print(f"Seeding {args.rows} borrowings...")
+        seed(connection, args.rows, args.users, args.books, args.seed)
+
+        user_id, book_id = args.users // 2, args.books // 2
+        before = run(connection, user_id, book_id, args.repeat)
+
+        call_command("migrate", "borrowings_app", AFTER, verbosity=0)
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+        after = run(connection, user_id, book_id, args.repeat)
+
+        print(f"{'query':<28}{'before, ms':>12}{'after, ms':>12}")
+        for name, (timing, plan) in before.items():
+            print(f"{name:<28}{timing:>12.2f}{after[name][0]:>12.2f}")
+            print(f"    before: {plan}")
+            print(f"    after:  {after[name][1]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,474 @@
+"""
+Latency, throughput and queries per request of every public endpoint
+(books CRUD, borrowings, users and tokens) on a seeded dataset::
+
+    python -m benchmarks.endpoints --borrowings 100000 --output run.json
+    python -m benchmarks.endpoints --baseline run.json
+
+Requests are sent one at a time to the WSGI application in-process
+through an httpx transport, so the numbers are the request handling of
+Django and the database, not the network, and every query of a request
+is counted. The results are written as JSON with ``--output``; with
+``--baseline`` they are compared with a stored run, and the command
+fails when an endpoint got slower than ``--tolerance`` or runs more
+queries.
+"""
+import argparse
+import json
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from itertools import count, cycle
+from pathlib import Path
+
+import httpx
+
+from benchmarks import setup_django
+
+BASE_URL = "http://localhost"
+PASSWORD = "benchmark"
+# Slowdowns below this are noise, however big relatively
+NOISE_MS = 1.0
+
+
+def seed(users, books, borrowings, seed_value):
+    """
+    Create ``users`` readers (sharing one password hash), ``books``
+    books and ``borrowings`` borrowings of random readers and books,
+    and a staff user. Return the staff user and the first reader.
+    """
+    from django.contrib.auth import get_user_model
+    from django.contrib.auth.hashers import make_password
+    from django.db import transaction
+
+    from books_app.models import Book
+    from borrowings_app.models import Borrowing
+
+    rng = random.Random(seed_value)
+    today = date.today()
+    password = make_password(PASSWORD)
+    chunk = 10_000
+
+    with transaction.atomic():
+        user_model = get_user_model()
+        staff = user_model.objects.create_user(
+            "staff@benchmark.com", PASSWORD, is_staff=True
+        )
+        readers = user_model.objects.bulk_create(
+            user_model(
+                email=f"reader{number}@benchmark.com", password=password
+            )
+            for number in range(users)
+        )
+        book_ids = [
+            book.id
+            for book in Book.objects.bulk_create(
+                Book(
+                    title=f"Book {number}",
+                    author=f"Author {number % 100}",
+                    cover=Book.HARD,
+                    inventory=1000,
+                    daily_fee=1,
+                )
+                for number in range(books)
+            )
+        ]
+
+        for start in range(0, borrowings, chunk):
+            batch = []
+            for _ in range(min(chunk, borrowings - start)):
+                borrowed = today - timedelta(days=rng.randint(0, 365))
+                is_active = rng.random() < 0.1
+                batch.append(
+                    Borrowing(
+                        borrow_date=borrowed,
+                        expected_return_date=borrowed + timedelta(days=14),
+                        actual_return_date=(
+                            None if is_active else borrowed + timedelta(7)
+                        ),
+                        is_active=is_active,
+                        book_id=rng.choice(book_ids),
+                        user_id=rng.choice(readers).id,
+                    )
+                )
+            Borrowing.objects.bulk_create(batch)
+
+    return staff, readers[0]
+
+
+def tokens(user):
+    from users.serializers import ClaimsTokenObtainPairSerializer
+
+    refresh = ClaimsTokenObtainPairSerializer.get_token(user)
+    return {
+        "Authorize": f"Bearer {refresh.access_token}"
+    }, str(refresh)
+
+
+def endpoints(staff, reader, state):
+    """
+    ``name: (method, path, data, headers, keep)`` of the benchmarked
+    requests, in the order they run. ``path`` and ``data`` may be called
+    with the ``state`` of the run, which the ``keep`` of a request fills
+    with ids from its responses for the later ones, e.g. the borrowings
+    created by "borrowing create" are returned by "borrowing return".
+    """
+    from books_app.models import Book
+
+    staff_headers, _ = tokens(staff)
+    reader_headers, refresh = tokens(reader)
+    book_ids = list(Book.objects.values_list("id", flat=True))
+    today = date.today()
+    state["book_ids"] = cycle(book_ids)
+    state["emails"] = count()
+
+    def keep(key):
+        def add(state, response):
+            state.setdefault(key, []).append(response.json()["id"])
+
+        return add
+
+    def take(key, path):
+        return lambda state: path.format(state[key].pop())
+
+    state["titles"] = count()
+
+    def book(state):
+        return {
+            "title": f"Benchmark {next(state['titles'])}",
+            "author": "Author",
+            "cover": Book.SOFT,
+            "inventory": 10,
+            "daily_fee": "1.50",
+        }
+
+    return {
+        "book list": ("GET", "/api/books/", None, reader_headers, None),
+        "book list page": (
+            "GET",
+            "/api/books/?page_size=20",
+            None,
+            reader_headers,
+            None,
+        ),
+        "book search": (
+            "GET",
+            "/api/books/?search=book author",
+            None,
+            reader_headers,
+            None,
+        ),
+        "book detail": (
+            "GET",
+            f"/api/books/{book_ids[0]}/",
+            None,
+            reader_headers,
+            None,
+        ),
+        "book create": (
+            "POST",
+            "/api/books/",
+            book,
+            staff_headers,
+            keep("books"),
+        ),
+        "book update": (
+            "PATCH",
+            lambda state: f"/api/books/{state['books'][0]}/",
+            {"inventory": 20},
+            staff_headers,
+            None,
+        ),
+        "book delete": (
+            "DELETE",
+            take("books", "/api/books/{}/"),
+            None,
+            staff_headers,
+            None,
+        ),
+        "borrowing list": (
+            "GET",
+            "/api/borrowings/",
+            None,
+            reader_headers,
+            None,
+        ),
+        "borrowing list page": (
+            "GET",
+            "/api/borrowings/?page_size=20",
+            None,
+            reader_headers,
+            None,
+        ),
+        "borrowing create": (
+            "POST",
+            "/api/borrowings/",
+            lambda state: {
+                "book": next(state["book_ids"]),
+                "borrow_date": str(today),
+                "expected_return_date": str(today + timedelta(days=14)),
+                "user": reader.id,
+                "is_active": True,
+            },
+            reader_headers,
+            keep("borrowings"),
+        ),
+        "borrowing detail": (
+            "GET",
+            lambda state: f"/api/borrowings/{state['borrowings'][0]}/",
+            None,
+            reader_headers,
+            None,
+        ),
+        "borrowing return": (
+            "POST",
+            take("borrowings", "/api/borrowings/{}/return/"),
+            None,
+            reader_headers,
+            None,
+        ),
+        "user register": (
+            "POST",
+            "/api/users/",
+            lambda state: {
+                "email": f"new{next(state['emails'])}@benchmark.com",
+                "password": PASSWORD,
+            },
+            {},
+            None,
+        ),
+        "user me": ("GET", "/api/users/me/", None, reader_headers, None),
+        "user update": (
+            "PATCH",
+            "/api/users/me/",
+            {"first_name": "Reader"},
+            reader_headers,
+            None,
+        ),
+        "token obtain": (
+            "POST",
+            "/api/users/token/",
+            {"email": reader.email, "password": PASSWORD},
+            {},
+            None,
+        ),
+        "token refresh": (
+            "POST",
+            "/api/users/token/refresh/",
+            {"refresh": refresh},
+            {},
+            None,
+        ),
+        "token verify": (
+            "POST",
+            "/api/users/token/verify/",
+            {"token": reader_headers["Authorize"].split()[1]},
+            {},
+            None,
+        ),
+    }
+
+
+class QueryCounter:
+    """Execute wrapper counting the queries of a connection."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def run(client, counter, endpoint, requests, warmup, state):
+    method, path, data, headers, keep = endpoint
+    timings = []
+    queries = []
+
+    for number in range(warmup + requests):
+        url = path(state) if callable(path) else path
+        body = data(state) if callable(data) else data
+        counter.count = 0
+
+        start = time.perf_counter()
+        response = client.request(method, url, json=body, headers=headers)
+        elapsed = (time.perf_counter() - start) * 1000
+
+        if response.status_code >= 400:
+            raise RuntimeError(
+                f"{method} {url}: {response.status_code} {response.text}"
+            )
+        if keep:
+            keep(state, response)
+        if number >= warmup:
+            timings.append(elapsed)
+            queries.append(counter.count)
+
+    return timings, queries
+
+
+def summary(timings, queries):
+    # 99 cut points, the n-th is the n-th percentile
+    percentiles = statistics.quantiles(timings, n=100, method="inclusive")
+    return {
+        "requests": len(timings),
+        "throughput": round(len(timings) / (sum(timings) / 1000), 1),
+        "mean_ms": round(statistics.fmean(timings), 3),
+        "p50_ms": round(percentiles[49], 3),
+        "p95_ms": round(percentiles[94], 3),
+        "p99_ms": round(percentiles[98], 3),
+        "queries": round(statistics.fmean(queries), 2),
+        "max_queries": max(queries),
+    }
+
+
+def compare(results, baseline, tolerance):
+    """
+    Print the change of every endpoint since the baseline, and return
+    the names of the ones that regressed: slower p95 latency beyond the
+    tolerance, or more queries per request.
+    """
+    regressions = []
+
+    if results["config"] != baseline["config"]:
+        print(f"\nThe baseline ran with {baseline['config']}")
+
+    print(
+        f"\n{'compared to baseline':<24}{'p95 ms':>10}{'baseline':>10}"
+        f"{'change':>9}{'queries':>9}{'baseline':>10}"
+    )
+
+    for name, result in results["endpoints"].items():
+        before = baseline["endpoints"].get(name)
+
+        if before is None:
+            print(f"{name:<24}{'(new)':>10}")
+            continue
+
+        change = result["p95_ms"] / before["p95_ms"] - 1
+        slower = result["p95_ms"] - before["p95_ms"] > NOISE_MS
+        regressed = (slower and change > tolerance) or (
+            result["queries"] > before["queries"]
+        )
+        print(
+            f"{name:<24}{result['p95_ms']:>10.2f}{before['p95_ms']:>10.2f}"
+            f"{change:>+9.0%}{result['queries']:>9.2f}"
+            f"{before['queries']:>10.2f}{'  REGRESSED' if regressed else ''}"
+        )
+
+        if regressed:
+            regressions.append(name)
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--books", type=int, default=1000)
+    parser.add_argument("--borrowings", type=int, default=100_000)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--endpoints",
+        nargs="+",
+        metavar="NAME",
+        help="Only run the endpoints whose name starts with one of these "
+        "(ex. --endpoints book borrowing)",
+    )
+    parser.add_argument("--output", type=Path, help="Write the JSON here")
+    parser.add_argument("--baseline", type=Path, help="JSON of an old run")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="Allowed p95 slowdown against the baseline (0.2 = 20%%)",
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        setup_django(Path(directory) / "benchmark.sqlite3")
+
+        from django.core.cache import caches
+        from django.core.management import call_command
+        from django.core.wsgi import get_wsgi_application
+        from django.db import connection
+
+        call_command("migrate", verbosity=0)
+        for cache in caches.all(initialized_only=True):
+            cache.clear()
+
+        start = time.perf_counter()
+        staff, reader = seed(
+            args.users, args.books, args.borrowings, args.seed
+        )
+        print(f"Seeded in {time.perf_counter() - start:.1f}s")
+
+        client = httpx.Client(
+            transport=httpx.WSGITransport(app=get_wsgi_application()),
+            base_url=BASE_URL,
+        )
+        counter = QueryCounter()
+        state = {}
+        results = {
+            "config": {
+                key: getattr(args, key)
+                for key in (
+                    "users",
+                    "books",
+                    "borrowings",
+                    "requests",
+                    "warmup",
+                    "seed",
+                )
+            },
+            "endpoints": {},
+        }
+
+        print(
+            f"{'endpoint':<24}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}"
+            f"{'p99 ms':>10}{'queries':>9}"
+        )
+        with connection.execute_wrapper(counter):
+            for name, endpoint in endpoints(staff, reader, state).items():
+                if args.endpoints and not name.startswith(
+                    tuple(args.endpoints)
+                ):
+                    continue
+
+                result = summary(
+                    *run(
+                        client,
+                        counter,
+                        endpoint,
+                        args.requests,
+                        args.warmup,
+                        state,
+                    )
+                )
+                results["endpoints"][name] = result
+                print(
+                    f"{name:<24}{result['throughput']:>10.0f}"
+                    f"{result['p50_ms']:>10.2f}{result['p95_ms']:>10.2f}"
+                    f"{result['p99_ms']:>10.2f}{result['queries']:>9.2f}"
+                )
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2) + "\n")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        regressions = compare(results, baseline, args.tolerance)
+
+        if regressions:
+            sys.exit(f"\nRegressed: {', '.join(regressions)}")
+
+
+if __name__ == "__main__":
+    main()
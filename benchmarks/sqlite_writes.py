@@ -0,0 +1,170 @@
+"""
+Compare the default SQLite setup with the production mode
+(DATABASE_PRODUCTION_MODE) under concurrent writers::
+
+    python -m benchmarks.sqlite_writes --writers 8 --checkouts 200
+
+Every writer borrows and returns books through the borrowing
+services, one transaction each, while readers list borrowings. Each
+mode runs in its own process against its own database file, as the
+pragmas are applied when a connection is opened.
+"""
+import argparse
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from benchmarks import setup_django
+
+MODES = ("default", "production")
+
+
+def seed(books):
+    from django.contrib.auth import get_user_model
+
+    from books_app.models import Book
+
+    user = get_user_model().objects.create_user(
+        "benchmark@test.com", "benchmark"
+    )
+    Book.objects.bulk_create(
+        Book(
+            title=f"Book {number}",
+            author="Author",
+            cover=Book.HARD,
+            inventory=1000000,
+            daily_fee=1,
+        )
+        for number in range(books)
+    )
+    return user
+
+
+def writer(user, book_ids, checkouts, failures, lock):
+    from datetime import date
+
+    from django.db import connection, OperationalError
+
+    from borrowings_app.services import checkout_books, return_borrowings
+
+    try:
+        for number in range(checkouts):
+            book_id = book_ids[number % len(book_ids)]
+            try:
+                borrowings, _ = checkout_books(user, [book_id], date.today())
+                return_borrowings([borrowings[0].id])
+            except OperationalError:
+                with lock:
+                    failures.append(1)
+    finally:
+        connection.close()
+
+
+def reader(user, stop):
+    from django.db import connection
+
+    from borrowings_app.models import Borrowing
+
+    try:
+        while not stop.is_set():
+            list(
+                Borrowing.objects.filter(user=user)
+                .select_related("book")
+                .order_by("-id")[:50]
+            )
+    finally:
+        connection.close()
+
+
+def run(mode, database, writers, readers, checkouts, queue):
+    os.environ["DATABASE_PRODUCTION_MODE"] = str(mode == "production")
+    setup_django(database)
+
+    from django.conf import settings
+    from django.core.management import call_command
+
+    from books_app.models import Book
+
+    call_command("migrate", verbosity=0)
+    user = seed(books=100)
+    book_ids = list(Book.objects.values_list("id", flat=True))
+
+    failures = []
+    lock = threading.Lock()
+    stop = threading.Event()
+    writer_threads = [
+        threading.Thread(
+            target=writer, args=(user, book_ids, checkouts, failures, lock)
+        )
+        for _ in range(writers)
+    ]
+    reader_threads = [
+        threading.Thread(target=reader, args=(user, stop))
+        for _ in range(readers)
+    ]
+
+    start = time.perf_counter()
+    for thread in reader_threads + writer_threads:
+        thread.start()
+    for thread in writer_threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    stop.set()
+    for thread in reader_threads:
+        thread.join()
+
+    transactions = writers * checkouts * 2
+    queue.put(
+        (
+            mode,
+            settings.SQLITE_PRAGMAS.get("journal_mode", "delete"),
+            (transactions - 2 * len(failures)) / elapsed,
+            len(failures),
+        )
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument(
+        "--checkouts",
+        type=int,
+        default=200,
+        help="checkouts (each followed by a return) per writer",
+    )
+    args = parser.parse_args()
+
+    print(
+        f"{args.writers} writers x {args.checkouts} checkouts and returns, "
+        f"{args.readers} readers"
+    )
+    print(f"{'mode':<14}{'journal':>10}{'writes/s':>12}{'failed':>10}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        queue = multiprocessing.Queue()
+
+        for mode in MODES:
+            process = multiprocessing.Process(
+                target=run,
+                args=(
+                    mode,
+                    Path(directory) / f"{mode}.sqlite3",
+                    args.writers,
+                    args.readers,
+                    args.checkouts,
+                    queue,
+                ),
+            )
+            process.start()
+            mode, journal, throughput, failed = queue.get()
+            process.join()
+            print(f"{mode:<14}{journal:>10}{throughput:>12.0f}{failed:>10}")
+
+
+if __name__ == "__main__":
+    main()
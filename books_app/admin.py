@@ -1,6 +1,29 @@
 from django.contrib import admin
 
 from books_app.models import Book
+from books_app.search import search_books
+from library_service.pagination import EstimatedCountPaginator
 
 
-admin.site.register(Book)
+@admin.register(Book)
+class BookAdmin(admin.ModelAdmin):
+    list_display = (
+        "title",
+        "author",
+        "cover",
+        "inventory",
+        "daily_fee",
+        "borrow_count",
+    )
+    # Searched with the full-text index, see get_search_results
+    search_fields = ("title", "author")
+    ordering = ("id",)
+    readonly_fields = ("borrow_count",)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term.strip():
+            return queryset, False
+
+        return search_books(queryset, search_term), False
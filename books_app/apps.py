@@ -4,3 +4,13 @@ from django.apps import AppConfig
 class BooksAppConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "books_app"
+
+    def ready(self):
+        from django.db.models.signals import post_delete, post_save
+
+        from books_app.cache import invalidate_book, invalidate_saved_book
+        from books_app.signals import inventory_changed
+
+        post_save.connect(invalidate_saved_book, sender="books_app.Book")
+        post_delete.connect(invalidate_saved_book, sender="books_app.Book")
+        inventory_changed.connect(invalidate_book)
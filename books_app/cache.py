@@ -0,0 +1,170 @@
+import threading
+import time
+
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from books_app.models import Book
+from books_app.serializers import BookSerializer
+
+BOOK_CACHE_ALIAS = "books"
+
+
+class SingleFlight:
+    """
+    Run a function at most once at a time per key in this process.
+    Threads calling ``do`` with a key that is already being loaded wait
+    for that call and share its result (or exception) instead of
+    running the function again.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, func):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+
+            if leader:
+                call = self._calls[key] = {"done": threading.Event()}
+
+        if leader:
+            try:
+                call["result"] = func()
+            except Exception as error:
+                call["error"] = error
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call["done"].set()
+        else:
+            call["done"].wait()
+
+        if "error" in call:
+            raise call["error"]
+
+        return call["result"]
+
+
+class BookCache:
+    """
+    Read-through cache of Book instances and of their serialized
+    payloads.
+
+    A miss is loaded by a single thread of the process, and by a single
+    process while it holds the ``lock_timeout`` lock in the shared
+    cache; the others wait for its result instead of querying the
+    database too. Entries expire after the TTL of the cache alias and
+    are dropped when the book changes (see ``invalidate``). A load
+    racing with a write may still cache the old row until the TTL, so
+    callers that know the current ``updated_at`` pass it on. Misses are
+    read from the primary database, a lagging replica would cache an
+    old row just the same.
+    """
+
+    def __init__(
+        self,
+        alias=BOOK_CACHE_ALIAS,
+        lock_timeout=5,
+        poll_interval=0.05,
+    ):
+        self.alias = alias
+        self.lock_timeout = lock_timeout
+        self.poll_interval = poll_interval
+        self.flight = SingleFlight()
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    @staticmethod
+    def key(kind: str, book_id) -> str:
+        return f"book:{kind}:{book_id}"
+
+    def get_book(self, book_id) -> Book:
+        """The book with ``book_id``, raise Book.DoesNotExist if none."""
+        return self._get_or_load(
+            self.key("instance", int(book_id)),
+            lambda: Book.objects.using(DEFAULT_DB_ALIAS).get(pk=book_id),
+        )
+
+    def get_payload(self, book_id, fresh_since=None) -> dict:
+        """
+        The serialized book with ``book_id``, with its stats. A cached
+        payload older than ``fresh_since`` (an ``updated_at`` value the
+        caller has already read) is loaded again.
+        """
+        key = self.key("payload", int(book_id))
+
+        def load():
+            book = Book.objects.using(DEFAULT_DB_ALIAS).get(pk=book_id)
+            payload = BookSerializer(book, context={"stats": True}).data
+            return book.updated_at, dict(payload)
+
+        updated_at, payload = self._get_or_load(key, load)
+
+        if fresh_since and updated_at < fresh_since:
+            updated_at, payload = self.flight.do(key, load)
+            self.cache.set(key, (updated_at, payload))
+
+        return payload
+
+    def invalidate(self, *book_ids):
+        """
+        Drop the cached entries of the books, and again once the write
+        commits, as a read before the commit can cache the old row.
+        """
+        keys = [
+            self.key(kind, book_id)
+            for book_id in book_ids
+            for kind in ("instance", "payload")
+        ]
+        self.cache.delete_many(keys)
+
+        if transaction.get_connection().in_atomic_block:
+            transaction.on_commit(lambda: self.cache.delete_many(keys))
+
+    def _get_or_load(self, key, load):
+        value = self.cache.get(key)
+
+        if value is None:
+            value = self.flight.do(key, lambda: self._load(key, load))
+
+        return value
+
+    def _load(self, key, load):
+        lock_key = f"{key}:lock"
+        locked = self.cache.add(lock_key, 1, self.lock_timeout)
+
+        if not locked:
+            # Another process is loading it, wait for its result
+            deadline = time.monotonic() + self.lock_timeout
+
+            while time.monotonic() < deadline:
+                time.sleep(self.poll_interval)
+                value = self.cache.get(key)
+
+                if value is not None:
+                    return value
+
+        try:
+            value = load()
+            self.cache.set(key, value)
+        finally:
+            if locked:
+                self.cache.delete(lock_key)
+
+        return value
+
+
+book_cache = BookCache()
+
+
+def invalidate_saved_book(sender, instance, **kwargs):
+    book_cache.invalidate(instance.pk)
+
+
+def invalidate_book(sender, book_id, **kwargs):
+    book_cache.invalidate(book_id)
@@ -0,0 +1,154 @@
+import csv
+import io
+import json
+from itertools import islice
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from books_app.cache import book_cache
+from books_app.models import Book
+from books_app.serializers import BookImportSerializer
+from library_service.db import retry_on_locked
+
+CSV = "csv"
+NDJSON = "ndjson"
+FORMATS = (CSV, NDJSON)
+EXTENSIONS = {".csv": CSV, ".ndjson": NDJSON, ".jsonl": NDJSON}
+
+UPDATE_FIELDS = ("author", "cover", "inventory", "daily_fee", "updated_at")
+
+
+def guess_format(filename: str):
+    """Input format of a file by its extension, None if unknown."""
+    for extension, file_format in EXTENSIONS.items():
+        if filename.lower().endswith(extension):
+            return file_format
+    return None
+
+
+def _is_utf8(*texts) -> bool:
+    # Undecodable bytes are kept as lone surrogates by text_stream
+    try:
+        for text in texts:
+            if isinstance(text, str):
+                text.encode("utf-8")
+    except UnicodeEncodeError:
+        return False
+    return True
+
+
+def read_rows(stream, file_format: str):
+    """
+    Yield ``(line, row)`` pairs of a CSV (with a header) or NDJSON
+    text stream one by one. ``row`` is None for a line that can't be
+    parsed or isn't valid UTF-8.
+    """
+    if file_format == CSV:
+        reader = csv.DictReader(stream)
+        for row in reader:
+            valid = _is_utf8(*row, *row.values())
+            yield reader.line_num, row if valid else None
+        return
+
+    for line, text in enumerate(stream, start=1):
+        if not text.strip():
+            continue
+
+        if not _is_utf8(text):
+            yield line, None
+            continue
+
+        try:
+            row = json.loads(text)
+        except ValueError:
+            row = None
+
+        yield line, row if isinstance(row, dict) else None
+
+
+def text_stream(binary):
+    """
+    Read a binary file as UTF-8 text (a BOM is skipped). Invalid bytes
+    don't raise, read_rows reports their rows as malformed.
+    """
+    return io.TextIOWrapper(
+        binary, encoding="utf-8-sig", errors="surrogateescape", newline=""
+    )
+
+
+@retry_on_locked
+def _save_chunk(books: dict) -> tuple:
+    """Upsert the validated books of a chunk, keyed by title."""
+    now = timezone.now()
+
+    with transaction.atomic():
+        existing = Book.objects.in_bulk(list(books), field_name="title")
+        created = []
+        updated = []
+
+        for title, attrs in books.items():
+            book = existing.get(title)
+
+            if book is None:
+                created.append(Book(**attrs))
+                continue
+
+            for field, value in attrs.items():
+                setattr(book, field, value)
+            book.updated_at = now
+            updated.append(book)
+
+        Book.objects.bulk_create(created)
+        Book.objects.bulk_update(updated, UPDATE_FIELDS)
+
+        # bulk_update doesn't send post_save
+        if updated:
+            book_cache.invalidate(*(book.pk for book in updated))
+
+    return len(created), len(updated)
+
+
+def import_books(rows, chunk_size=1000, max_errors=1000) -> dict:
+    """
+    Validate ``(line, row)`` pairs with the BookSerializer rules and
+    upsert them by title, ``chunk_size`` rows per transaction, so that
+    memory doesn't depend on the size of the input.
+
+    A later row with the same title wins. Rows that fail validation are
+    counted and the first ``max_errors`` of them are reported with
+    their line numbers; the valid rows are imported anyway.
+    """
+    serializer = BookImportSerializer()
+    report = {"created": 0, "updated": 0, "failed": 0, "errors": []}
+    rows = iter(rows)
+
+    while chunk := list(islice(rows, chunk_size)):
+        books = {}
+
+        for line, row in chunk:
+            try:
+                if row is None:
+                    raise ValidationError("Malformed row")
+                attrs = serializer.run_validation(row)
+            except ValidationError as error:
+                report["failed"] += 1
+                if len(report["errors"]) < max_errors:
+                    report["errors"].append(
+                        {"line": line, "errors": error.detail}
+                    )
+                continue
+
+            books[attrs["title"]] = attrs
+
+        try:
+            created, updated = _save_chunk(books)
+        except IntegrityError:
+            # A title was created concurrently, it is an update now
+            created, updated = _save_chunk(books)
+
+        report["created"] += created
+        report["updated"] += updated
+
+    return report
@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from books_app.importer import (
+    FORMATS,
+    guess_format,
+    import_books,
+    read_rows,
+    text_stream,
+)
+
+
+class Command(BaseCommand):
+    help = "Create or update books (by title) from a CSV or NDJSON file"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV file with a header or NDJSON")
+        parser.add_argument(
+            "--format",
+            choices=FORMATS,
+            default=None,
+            help="Input format, guessed from the file extension by default",
+        )
+        parser.add_argument("--chunk-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        file_format = options["format"] or guess_format(path)
+
+        if file_format is None:
+            raise CommandError(
+                f"Can't guess the format of {path}, use --format"
+            )
+
+        with open(path, "rb") as file:
+            report = import_books(
+                read_rows(text_stream(file), file_format),
+                chunk_size=options["chunk_size"],
+            )
+
+        for error in report["errors"]:
+            self.stderr.write(f"line {error['line']}: {error['errors']}")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{report['created']} book(s) created, "
+                f"{report['updated']} updated, {report['failed']} failed"
+            )
+        )
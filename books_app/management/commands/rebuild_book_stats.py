@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from books_app.stats import rebuild_book_stats
+
+
+class Command(BaseCommand):
+    help = "Count the borrowings of every book again (borrow counts)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        rows = rebuild_book_stats(chunk_size=options["chunk_size"])
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Book stats rebuilt, {rows} daily count(s)")
+        )
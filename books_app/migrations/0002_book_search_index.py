@@ -0,0 +1,13 @@
+from django.db import migrations
+
+from books_app.search import create_search_index, drop_search_index
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("books_app", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
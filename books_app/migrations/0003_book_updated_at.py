@@ -0,0 +1,24 @@
+# Generated by Django 5.0.1 on 2026-10-18 17:14
+
+from django.db import migrations, models
+
+from books_app.search import create_search_index
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("books_app", "0002_book_search_index"),
+    ]
+
+    # SQLite rebuilds the book table to add the column, which drops
+    # the search index triggers, so they are created again afterwards
+    # (and before, when the migration is reversed)
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop, create_search_index),
+        migrations.AddField(
+            model_name="book",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.RunPython(create_search_index, migrations.RunPython.noop),
+    ]
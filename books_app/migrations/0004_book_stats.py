@@ -0,0 +1,54 @@
+# Generated by Django 5.0.1 on 2026-10-18 17:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from books_app.search import create_search_index
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("books_app", "0003_book_updated_at"),
+    ]
+
+    # Adding the column rebuilds the book table on SQLite, see 0003.
+    # Existing borrowings are counted by the rebuild_book_stats command.
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop, create_search_index),
+        migrations.AddField(
+            model_name="book",
+            name="borrow_count",
+            field=models.PositiveIntegerField(db_index=True, default=0),
+        ),
+        migrations.RunPython(create_search_index, migrations.RunPython.noop),
+        migrations.CreateModel(
+            name="DailyBorrowCount",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("borrow_count", models.PositiveIntegerField(default=0)),
+                (
+                    "book",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_borrow_counts",
+                        to="books_app.book",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="dailyborrowcount",
+            constraint=models.UniqueConstraint(
+                fields=("day", "book"), name="daily_borrow_count_unique"
+            ),
+        ),
+    ]
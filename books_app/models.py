@@ -1,4 +1,113 @@
-from django.db import models
+from datetime import date
+
+from django.db import connections, models, router
+from django.db.models import Case, F, IntegerField, Value, When
+from django.utils import timezone
+
+from books_app.signals import inventory_changed
+
+
+def _copies_per_book(copies: dict, default=None):
+    return Case(
+        *(
+            When(pk=book_id, then=Value(count))
+            for book_id, count in copies.items()
+        ),
+        default=Value(default),
+        output_field=IntegerField(),
+    )
+
+
+class BookQuerySet(models.QuerySet):
+    def checkout_copy(self, book_id: int, day: date = None) -> bool:
+        """
+        Take one copy of the book out of the inventory with a single
+        conditional UPDATE, counting the borrowing of ``day`` (today by
+        default) in the book statistics. Return False if no copy was
+        left.
+        """
+        updated = self.filter(pk=book_id, inventory__gt=0).update(
+            inventory=F("inventory") - 1,
+            borrow_count=F("borrow_count") + 1,
+            updated_at=timezone.now(),
+        )
+
+        if updated:
+            DailyBorrowCount.objects.record({book_id: 1}, day)
+            inventory_changed.send(sender=Book, book_id=book_id)
+
+        return bool(updated)
+
+    def return_copy(self, book_id: int) -> bool:
+        """Put one copy of the book back into the inventory."""
+        updated = self.filter(pk=book_id).update(
+            inventory=F("inventory") + 1,
+            updated_at=timezone.now(),
+        )
+
+        if updated:
+            inventory_changed.send(sender=Book, book_id=book_id)
+
+        return bool(updated)
+
+    def checkout_copies(self, copies: dict, day: date = None) -> int:
+        """
+        Take ``copies[book_id]`` copies of every book out of the
+        inventory with a single UPDATE, skipping the books that don't
+        have that many copies left. Return the number of books updated.
+
+        The borrowings of ``day`` are counted in the book statistics
+        when every book was updated, a partial checkout is expected to
+        be rolled back by the caller.
+        """
+        taken = _copies_per_book(copies)
+        updated = self.filter(pk__in=copies, inventory__gte=taken).update(
+            inventory=F("inventory") - taken,
+            borrow_count=F("borrow_count") + taken,
+            updated_at=timezone.now(),
+        )
+
+        if updated == len(copies):
+            DailyBorrowCount.objects.record(copies, day)
+
+        for book_id in copies:
+            inventory_changed.send(sender=Book, book_id=book_id)
+
+        return updated
+
+    def return_copies(self, copies: dict, handed_over: dict = None) -> int:
+        """
+        Put ``copies[book_id]`` copies of every book back into the
+        inventory with a single UPDATE.
+
+        ``handed_over[book_id]`` of them went straight to the next
+        borrowers instead (see borrowings_app.reservations): they stay
+        out of the inventory and are counted as borrowings of today.
+        """
+        handed_over = handed_over or {}
+        changes = {
+            "inventory": F("inventory")
+            + _copies_per_book(
+                {
+                    book_id: count - handed_over.get(book_id, 0)
+                    for book_id, count in copies.items()
+                }
+            ),
+            "updated_at": timezone.now(),
+        }
+
+        if handed_over:
+            changes["borrow_count"] = F("borrow_count") + _copies_per_book(
+                handed_over, default=0
+            )
+            DailyBorrowCount.objects.record(handed_over)
+
+        updated = self.filter(pk__in=copies).update(**changes)
+
+        for book_id in copies:
+            inventory_changed.send(sender=Book, book_id=book_id)
+
+        return updated
 
 
 class Book(models.Model):
@@ -15,6 +124,83 @@ class Book(models.Model):
     cover = models.CharField(max_length=4, choices=COVER_CHOICES)
     inventory = models.PositiveIntegerField()
     daily_fee = models.DecimalField(max_digits=10, decimal_places=2)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+    # Borrowings of the book of all time, kept up to date by the
+    # checkouts (see DailyBorrowCount for the recent ones)
+    borrow_count = models.PositiveIntegerField(default=0, db_index=True)
+
+    objects = BookQuerySet.as_manager()
 
     def __str__(self):
         return self.title
+
+
+class DailyBorrowCountQuerySet(models.QuerySet):
+    def record(self, copies: dict, day: date = None):
+        """
+        Add ``copies[book_id]`` borrowings of ``day`` (today by default)
+        to the counts of the books with a single INSERT ... ON CONFLICT.
+        """
+        if not copies:
+            return
+
+        day = day or date.today()
+        connection = connections[router.db_for_write(self.model)]
+        quote = connection.ops.quote_name
+        opts = self.model._meta
+        count = quote(opts.get_field("borrow_count").column)
+        rows = ", ".join(["(%s, %s, %s)"] * len(copies))
+        params = []
+
+        for book_id, borrowings in copies.items():
+            params += [
+                book_id,
+                connection.ops.adapt_datefield_value(day),
+                borrowings,
+            ]
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {quote(opts.db_table)} "
+                f"({quote('book_id')}, {quote('day')}, {count}) "
+                f"VALUES {rows} "
+                f"ON CONFLICT ({quote('day')}, {quote('book_id')}) "
+                f"DO UPDATE SET {count} = {quote(opts.db_table)}.{count} "
+                f"+ excluded.{count}",
+                params,
+            )
+
+    def top_books(self, since: date, limit: int):
+        """``(book_id, borrowings)`` of the most borrowed books since a day."""
+        return (
+            self.filter(day__gte=since)
+            .values("book_id")
+            .annotate(borrowings=models.Sum("borrow_count"))
+            .order_by("-borrowings", "book_id")
+            .values_list("book_id", "borrowings")[:limit]
+        )
+
+
+class DailyBorrowCount(models.Model):
+    """
+    Borrowings of a book in a day. Leaderboards of recent periods sum
+    a few of these per book instead of counting the borrowings.
+    """
+
+    book = models.ForeignKey(
+        Book, on_delete=models.CASCADE, related_name="daily_borrow_counts"
+    )
+    day = models.DateField()
+    borrow_count = models.PositiveIntegerField(default=0)
+
+    objects = DailyBorrowCountQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["day", "book"], name="daily_borrow_count_unique"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.book_id} borrowed {self.borrow_count} on {self.day}"
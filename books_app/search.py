@@ -0,0 +1,110 @@
+import re
+
+from django.db import connections
+from django.db.models import Q
+
+FTS_TABLE = "books_app_book_fts"
+
+# SQLite FTS5 index over Book.title and Book.author. It is an external
+# content table: it stores only the index and reads the text from
+# books_app_book, and the triggers keep it in sync on every write,
+# including bulk and queryset updates that bypass model signals.
+CREATE_SEARCH_INDEX = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title,
+        author,
+        content='books_app_book',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_insert
+    AFTER INSERT ON books_app_book BEGIN
+        INSERT INTO {FTS_TABLE} (rowid, title, author)
+        VALUES (new.id, new.title, new.author);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_delete
+    AFTER DELETE ON books_app_book BEGIN
+        INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, title, author)
+        VALUES ('delete', old.id, old.title, old.author);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update
+    AFTER UPDATE OF title, author ON books_app_book BEGIN
+        INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, title, author)
+        VALUES ('delete', old.id, old.title, old.author);
+        INSERT INTO {FTS_TABLE} (rowid, title, author)
+        VALUES (new.id, new.title, new.author);
+    END
+    """,
+    f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('rebuild')",
+]
+
+DROP_SEARCH_INDEX = [
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_insert",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_delete",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_update",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+
+
+def create_search_index(apps, schema_editor):
+    """
+    Migration operation creating the search index. SQLite drops the
+    triggers whenever a migration rebuilds books_app_book, so such
+    migrations must run it again afterwards.
+    """
+    if schema_editor.connection.vendor != "sqlite":
+        return
+
+    for statement in CREATE_SEARCH_INDEX:
+        schema_editor.execute(statement)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+
+    for statement in DROP_SEARCH_INDEX:
+        schema_editor.execute(statement)
+
+
+def search_terms(text: str) -> list:
+    return re.findall(r"\w+", text)
+
+
+def search_books(queryset, text: str):
+    """
+    Books whose title or author contain words starting with every
+    word of ``text``, the most relevant first.
+    """
+    terms = search_terms(text)
+
+    if not terms:
+        return queryset.none()
+
+    if connections[queryset.db].vendor != "sqlite":
+        condition = Q()
+        for term in terms:
+            condition &= Q(title__icontains=term) | Q(author__icontains=term)
+        return queryset.filter(condition).order_by("title", "id")
+
+    # Every term is quoted, so user input can't inject FTS5 syntax
+    match = " ".join(f'"{term}"*' for term in terms)
+
+    # The FTS5 table is not a model, so join it with extra()
+    return queryset.extra(
+        tables=[FTS_TABLE],
+        where=[
+            f"{FTS_TABLE}.rowid = books_app_book.id",
+            f"{FTS_TABLE} MATCH %s",
+        ],
+        params=[match],
+        select={"rank": f"{FTS_TABLE}.rank"},
+        order_by=["rank", "id"],
+    )
@@ -4,6 +4,37 @@ from books_app.models import Book
 
 
 class BookSerializer(serializers.ModelSerializer):
+    """
+    ``borrow_count`` is a column of the book, so it costs no query, but
+    it is only included when the ``stats`` context flag is set.
+    """
+
     class Meta:
         fields = "__all__"
         model = Book
+        read_only_fields = ("borrow_count",)
+
+    def get_fields(self):
+        fields = super().get_fields()
+
+        if not self.context.get("stats"):
+            fields.pop("borrow_count", None)
+
+        return fields
+
+
+class BookImportSerializer(BookSerializer):
+    """
+    Validates one row of a catalog import. An existing title is not an
+    error here, since the import updates that book.
+    """
+
+    class Meta:
+        fields = ("title", "author", "cover", "inventory", "daily_fee")
+        model = Book
+        extra_kwargs = {"title": {"validators": []}}
+
+
+class BookLeaderboardSerializer(serializers.Serializer):
+    book = BookSerializer()
+    borrowings = serializers.IntegerField()
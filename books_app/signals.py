@@ -0,0 +1,5 @@
+from django.dispatch import Signal
+
+# Sent with ``book_id`` when a queryset update changes the inventory of
+# a book, since such updates don't send post_save
+inventory_changed = Signal()
@@ -0,0 +1,81 @@
+from datetime import date, timedelta
+from itertools import islice
+
+from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.utils import timezone
+
+from books_app.cache import book_cache
+from books_app.models import Book, DailyBorrowCount
+
+# Days of the leaderboard periods, None for all time
+PERIODS = {"week": 7, "month": 30, "all": None}
+
+
+def leaderboard(period: str, limit: int = 10, today: date = None) -> list:
+    """
+    ``{"book", "borrowings"}`` of the ``limit`` most borrowed books of
+    the period, read from the counters in two queries at most.
+    """
+    days = PERIODS[period]
+
+    if days is None:
+        books = Book.objects.order_by("-borrow_count", "id")[:limit]
+        return [
+            {"book": book, "borrowings": book.borrow_count} for book in books
+        ]
+
+    since = (today or date.today()) - timedelta(days=days - 1)
+    top = list(DailyBorrowCount.objects.top_books(since, limit))
+    books = Book.objects.in_bulk([book_id for book_id, _ in top])
+
+    return [
+        {"book": books[book_id], "borrowings": borrowings}
+        for book_id, borrowings in top
+        if book_id in books
+    ]
+
+
+def rebuild_book_stats(chunk_size: int = 1000) -> int:
+    """
+    Count the borrowings of every book again, for all time and per day,
+    e.g. after borrowings were created or deleted bypassing checkouts.
+    Return the number of daily counts.
+    """
+    borrowings = (
+        Book.objects.filter(pk=OuterRef("pk"))
+        .annotate(borrowings=Count("borrowing"))
+        .values("borrowings")
+    )
+    daily = (
+        Book.objects.filter(borrowing__isnull=False)
+        .values_list("id", "borrowing__borrow_date")
+        .annotate(borrowings=Count("borrowing"))
+        .order_by()
+        .iterator(chunk_size=chunk_size)
+    )
+    rows = 0
+
+    with transaction.atomic():
+        Book.objects.update(
+            borrow_count=Subquery(borrowings), updated_at=timezone.now()
+        )
+        DailyBorrowCount.objects.all().delete()
+
+        while chunk := list(islice(daily, chunk_size)):
+            DailyBorrowCount.objects.bulk_create(
+                DailyBorrowCount(
+                    book_id=book_id, day=day, borrow_count=borrowings
+                )
+                for book_id, day, borrowings in chunk
+            )
+            rows += len(chunk)
+
+    book_ids = Book.objects.values_list("id", flat=True).iterator(
+        chunk_size=chunk_size
+    )
+
+    while chunk := list(islice(book_ids, chunk_size)):
+        book_cache.invalidate(*chunk)
+
+    return rows
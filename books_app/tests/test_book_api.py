@@ -42,6 +42,23 @@ class UnauthenticatedBookApiTest(TestCase):
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(res.data, serializer.data)
 
+    def test_list_books_cursor_pagination(self):
+        books = [sample_book(title=f"book {i}") for i in range(5)]
+
+        res = self.client.get(BOOK_URL, {"page_size": 2})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [book["id"] for book in res.data["results"]],
+            [books[0].id, books[1].id],
+        )
+
+        res = self.client.get(res.data["next"])
+        self.assertEqual(
+            [book["id"] for book in res.data["results"]],
+            [books[2].id, books[3].id],
+        )
+
     def test_unauth_cannot_create_book(self):
         defaults = {
             "title": "test book",
@@ -0,0 +1,165 @@
+import threading
+import time
+
+from django.core.cache import caches
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from books_app.cache import BookCache, SingleFlight, book_cache
+from books_app.models import Book
+
+
+def detail_url(book_id: int):
+    return reverse("books_app:book-detail", args=[book_id])
+
+
+def sample_book(**params):
+    defaults = {
+        "title": "Sample",
+        "author": "Somebody",
+        "cover": Book.HARD,
+        "inventory": 10,
+        "daily_fee": 1,
+    }
+    defaults.update(params)
+    return Book.objects.create(**defaults)
+
+
+class SingleFlightTest(TestCase):
+    def test_concurrent_calls_share_one_run(self):
+        flight = SingleFlight()
+        calls = []
+        results = []
+
+        def load():
+            calls.append(1)
+            time.sleep(0.1)
+            return "value"
+
+        def worker():
+            results.append(flight.do("key", load))
+
+        threads = [threading.Thread(target=worker) for _ in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ["value"] * 20)
+
+    def test_error_is_raised_and_not_kept(self):
+        flight = SingleFlight()
+
+        def fail():
+            raise KeyError("key")
+
+        with self.assertRaises(KeyError):
+            flight.do("key", fail)
+
+        self.assertEqual(flight.do("key", lambda: 1), 1)
+
+
+class BookCacheTest(TestCase):
+    def setUp(self):
+        caches["books"].clear()
+        self.book = sample_book()
+
+    def test_get_book_is_cached(self):
+        book_cache.get_book(self.book.id)
+
+        with self.assertNumQueries(0):
+            book = book_cache.get_book(self.book.id)
+
+        self.assertEqual(book, self.book)
+
+    def test_missing_book(self):
+        with self.assertRaises(Book.DoesNotExist):
+            book_cache.get_book(self.book.id + 1)
+
+    def test_invalidated_on_save_and_delete(self):
+        book_cache.get_book(self.book.id)
+
+        self.book.title = "Renamed"
+        self.book.save()
+        self.assertEqual(book_cache.get_book(self.book.id).title, "Renamed")
+
+        book_id = self.book.id
+        self.book.delete()
+        with self.assertRaises(Book.DoesNotExist):
+            book_cache.get_book(book_id)
+
+    def test_invalidated_on_inventory_change(self):
+        book_cache.get_book(self.book.id)
+
+        Book.objects.checkout_copy(self.book.id)
+        self.assertEqual(book_cache.get_book(self.book.id).inventory, 9)
+
+        Book.objects.return_copy(self.book.id)
+        self.assertEqual(book_cache.get_book(self.book.id).inventory, 10)
+
+    def test_stale_payload_is_reloaded(self):
+        stale = book_cache.get_payload(self.book.id)
+        Book.objects.filter(pk=self.book.id).update(
+            title="Renamed", updated_at=timezone.now()
+        )
+        self.book.refresh_from_db()
+
+        self.assertEqual(book_cache.get_payload(self.book.id), stale)
+        payload = book_cache.get_payload(
+            self.book.id, fresh_since=self.book.updated_at
+        )
+        self.assertEqual(payload["title"], "Renamed")
+
+    def test_waits_for_another_process_loading(self):
+        cache = BookCache(lock_timeout=2, poll_interval=0.01)
+        key = cache.key("instance", self.book.id)
+        caches["books"].add(f"{key}:lock", 1)
+
+        timer = threading.Timer(
+            0.1, lambda: caches["books"].set(key, self.book)
+        )
+        timer.start()
+
+        with self.assertNumQueries(0):
+            book = cache.get_book(self.book.id)
+
+        timer.join()
+        self.assertEqual(book, self.book)
+
+
+class BookRetrieveCacheTest(TestCase):
+    def setUp(self):
+        caches["books"].clear()
+        self.client = APIClient()
+        self.book = sample_book()
+
+    def test_retrieve_serves_cached_payload(self):
+        self.client.get(detail_url(self.book.id))
+
+        # Only the ETag version query
+        with self.assertNumQueries(1):
+            res = self.client.get(detail_url(self.book.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["title"], self.book.title)
+
+    def test_retrieve_after_update(self):
+        self.client.get(detail_url(self.book.id))
+        Book.objects.filter(pk=self.book.id).update(
+            title="Renamed", updated_at=timezone.now()
+        )
+
+        res = self.client.get(detail_url(self.book.id))
+
+        self.assertEqual(res.data["title"], "Renamed")
+
+    def test_retrieve_invalid_id(self):
+        res = self.client.get(detail_url(self.book.id + 1))
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+        res = self.client.get("/api/books/abc/")
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,131 @@
+from unittest import mock
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from books_app.models import Book
+from books_app.serializers import BookSerializer
+
+BOOK_URL = reverse("books_app:book-list")
+
+
+def detail_url(book_id: int):
+    return reverse("books_app:book-detail", args=[book_id])
+
+
+def sample_book(**params):
+    defaults = {
+        "title": "Sample",
+        "author": "Somebody",
+        "cover": Book.HARD,
+        "inventory": 10,
+        "daily_fee": 1,
+    }
+    defaults.update(params)
+    return Book.objects.create(**defaults)
+
+
+class BookConditionalGetTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.book = sample_book()
+
+    def test_list_not_modified(self):
+        res = self.client.get(BOOK_URL)
+        etag = res["ETag"]
+
+        with mock.patch.object(
+            BookSerializer, "to_representation"
+        ) as to_representation:
+            res = self.client.get(BOOK_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res["ETag"], etag)
+        to_representation.assert_not_called()
+
+    def test_list_etag_changes_on_write(self):
+        etag = self.client.get(BOOK_URL)["ETag"]
+
+        Book.objects.checkout_copy(self.book.id)
+        res = self.client.get(BOOK_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res["ETag"], etag)
+
+    def test_list_etag_changes_on_delete(self):
+        other = sample_book(title="Other")
+        etag = self.client.get(BOOK_URL)["ETag"]
+
+        other.delete()
+        res = self.client.get(BOOK_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_list_version_does_not_scan_rows(self):
+        etag = self.client.get(BOOK_URL, {"page_size": 1})["ETag"]
+
+        with self.assertNumQueries(1) as queries:
+            res = self.client.get(
+                BOOK_URL, {"page_size": 1}, HTTP_IF_NONE_MATCH=etag
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertNotIn(
+            'FROM "books_app_book"', queries.captured_queries[0]["sql"]
+        )
+
+    def test_no_list_etag_without_version_triggers(self):
+        with mock.patch(
+            "library_service.conditional.has_version_triggers",
+            return_value=False,
+        ):
+            res = self.client.get(BOOK_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotIn("ETag", res)
+
+    def test_list_etag_depends_on_query(self):
+        etag = self.client.get(BOOK_URL)["ETag"]
+        res = self.client.get(
+            BOOK_URL, {"page_size": 1}, HTTP_IF_NONE_MATCH=etag
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_detail_not_modified(self):
+        res = self.client.get(detail_url(self.book.id))
+        self.assertIn("Last-Modified", res)
+
+        res = self.client.get(
+            detail_url(self.book.id), HTTP_IF_NONE_MATCH=res["ETag"]
+        )
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_detail_if_modified_since(self):
+        since = http_date(self.book.updated_at.timestamp() + 1)
+        res = self.client.get(
+            detail_url(self.book.id), HTTP_IF_MODIFIED_SINCE=since
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_detail_modified_after_update(self):
+        etag = self.client.get(detail_url(self.book.id))["ETag"]
+
+        self.book.title = "Renamed"
+        self.book.save()
+        res = self.client.get(
+            detail_url(self.book.id), HTTP_IF_NONE_MATCH=etag
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["title"], "Renamed")
+
+    def test_missing_book(self):
+        res = self.client.get(detail_url(self.book.id + 1))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertNotIn("ETag", res)
@@ -0,0 +1,200 @@
+import io
+import json
+import tempfile
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from books_app.importer import CSV, NDJSON, import_books, read_rows
+from books_app.models import Book
+
+IMPORT_URL = reverse("books_app:book-import-books")
+
+CSV_INPUT = (
+    "title,author,cover,inventory,daily_fee\n"
+    "Dune,Frank Herbert,HARD,3,1.50\n"
+    "Emma,Jane Austen,SOFT,2,0.99\n"
+    "Broken,Nobody,PAPER,-1,x\n"
+)
+
+
+def ndjson(*rows):
+    return "".join(json.dumps(row) + "\n" for row in rows)
+
+
+class ImportBooksTest(TestCase):
+    def import_csv(self, text, **kwargs):
+        return import_books(read_rows(io.StringIO(text), CSV), **kwargs)
+
+    def test_creates_books_and_reports_errors(self):
+        report = self.import_csv(CSV_INPUT)
+
+        self.assertEqual(report["created"], 2)
+        self.assertEqual(report["failed"], 1)
+        self.assertEqual(report["errors"][0]["line"], 4)
+        self.assertEqual(
+            set(report["errors"][0]["errors"]),
+            {"cover", "inventory", "daily_fee"},
+        )
+        self.assertEqual(Book.objects.get(title="Dune").daily_fee, 1.5)
+
+    def test_updates_existing_titles(self):
+        Book.objects.create(
+            title="Dune",
+            author="Unknown",
+            cover=Book.SOFT,
+            inventory=1,
+            daily_fee=1,
+        )
+
+        report = self.import_csv(CSV_INPUT, chunk_size=1)
+
+        self.assertEqual((report["created"], report["updated"]), (1, 1))
+        dune = Book.objects.get(title="Dune")
+        self.assertEqual(dune.author, "Frank Herbert")
+        self.assertEqual(dune.inventory, 3)
+
+    def test_last_duplicate_wins(self):
+        rows = read_rows(
+            io.StringIO(
+                ndjson(
+                    {
+                        "title": "Emma",
+                        "author": "A",
+                        "cover": "SOFT",
+                        "inventory": 1,
+                        "daily_fee": "1.00",
+                    },
+                    {
+                        "title": "Emma",
+                        "author": "B",
+                        "cover": "SOFT",
+                        "inventory": 2,
+                        "daily_fee": "1.00",
+                    },
+                )
+            ),
+            NDJSON,
+        )
+
+        report = import_books(rows)
+
+        self.assertEqual(report["created"], 1)
+        self.assertEqual(Book.objects.get().author, "B")
+
+    def test_malformed_ndjson_lines(self):
+        text = "not json\n\n[1, 2]\n"
+
+        report = import_books(read_rows(io.StringIO(text), NDJSON))
+
+        self.assertEqual(report["failed"], 2)
+        self.assertEqual([error["line"] for error in report["errors"]], [1, 3])
+
+    def test_errors_are_capped(self):
+        report = self.import_csv(CSV_INPUT * 3, max_errors=2)
+
+        self.assertEqual(report["failed"], 3 + 2)
+        self.assertEqual(len(report["errors"]), 2)
+
+
+class ImportBooksCommandTest(TestCase):
+    def test_import_file(self):
+        with tempfile.NamedTemporaryFile(
+            "w", suffix=".csv", delete=False
+        ) as file:
+            file.write(CSV_INPUT)
+
+        out = io.StringIO()
+        err = io.StringIO()
+        call_command("import_books", file.name, stdout=out, stderr=err)
+
+        self.assertIn("2 book(s) created, 0 updated, 1 failed", out.getvalue())
+        self.assertIn("line 4", err.getvalue())
+        self.assertEqual(Book.objects.count(), 2)
+
+
+class ImportBooksApiTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    def upload(self, name, content, **data):
+        if isinstance(content, str):
+            content = content.encode()
+
+        return self.client.post(
+            IMPORT_URL,
+            {"file": SimpleUploadedFile(name, content), **data},
+            format="multipart",
+        )
+
+    def test_staff_only(self):
+        user = get_user_model().objects.create_user(
+            "user@test.com", "test12345"
+        )
+        self.client.force_authenticate(user)
+
+        res = self.upload("books.csv", CSV_INPUT)
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_import(self):
+        admin = get_user_model().objects.create_user(
+            "admin@test.com", "test12345", is_staff=True
+        )
+        self.client.force_authenticate(admin)
+
+        res = self.upload("books.csv", CSV_INPUT)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["created"], 2)
+        self.assertEqual(res.data["failed"], 1)
+
+        res = self.upload(
+            "books.txt",
+            ndjson(
+                {
+                    "title": "Emma",
+                    "author": "Jane Austen",
+                    "cover": "SOFT",
+                    "inventory": 7,
+                    "daily_fee": "0.99",
+                }
+            ),
+            type=NDJSON,
+        )
+        self.assertEqual(res.data["updated"], 1)
+        self.assertEqual(
+            Book.objects.get(title="Emma").daily_fee, Decimal("0.99")
+        )
+
+        res = self.upload("books.txt", "")
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_invalid_utf8(self):
+        admin = get_user_model().objects.create_user(
+            "admin@test.com", "test12345", is_staff=True
+        )
+        self.client.force_authenticate(admin)
+
+        content = CSV_INPUT.encode().replace(b"Emma", b"Em\xe9ma")
+        res = self.upload("books.csv", content)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["created"], 1)
+        self.assertEqual(
+            [error["line"] for error in res.data["errors"]], [3, 4]
+        )
+
+        lines = ndjson({"title": "Dune"}).encode() + b'{"title": "\xff"}\n'
+        res = self.upload("books.ndjson", lines)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [error["line"] for error in res.data["errors"]], [1, 2]
+        )
+        self.assertEqual(res.data["errors"][1]["errors"], ["Malformed row"])
@@ -0,0 +1,83 @@
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from books_app.models import Book
+
+BOOK_URL = reverse("books_app:book-list")
+
+
+def sample_book(title, author="Somebody"):
+    return Book.objects.create(
+        title=title,
+        author=author,
+        cover=Book.HARD,
+        inventory=10,
+        daily_fee=1,
+    )
+
+
+class BookSearchApiTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    def search(self, text, **params):
+        res = self.client.get(BOOK_URL, {"search": text, **params})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res
+
+    def titles(self, res):
+        return [book["title"] for book in res.data["results"]]
+
+    def test_search_by_title_and_author(self):
+        sample_book("The Hobbit", author="J. R. R. Tolkien")
+        sample_book("Dune", author="Frank Herbert")
+
+        self.assertEqual(self.titles(self.search("hobbit")), ["The Hobbit"])
+        self.assertEqual(self.titles(self.search("herbert")), ["Dune"])
+
+    def test_search_matches_word_prefixes_of_all_terms(self):
+        sample_book("Programming Pearls")
+        sample_book("Programming Rust")
+
+        self.assertEqual(
+            self.titles(self.search("program pear")), ["Programming Pearls"]
+        )
+
+    def test_results_ranked_by_relevance(self):
+        sample_book("Cooking for one", author="Cook Cookson")
+        sample_book("Gardening", author="Ann Cook")
+        sample_book("Cook, cook, cook", author="Cook")
+
+        self.assertEqual(
+            self.titles(self.search("cook"))[0], "Cook, cook, cook"
+        )
+
+    def test_index_follows_updates_and_deletes(self):
+        book = sample_book("Old title")
+
+        Book.objects.filter(pk=book.pk).update(title="New title")
+        self.assertEqual(self.titles(self.search("old")), [])
+        self.assertEqual(self.titles(self.search("new")), ["New title"])
+
+        book.delete()
+        self.assertEqual(self.titles(self.search("new")), [])
+
+    def test_search_is_paginated(self):
+        for i in range(5):
+            sample_book(f"Volume {i}")
+
+        res = self.search("volume", page_size=2)
+
+        self.assertEqual(res.data["count"], 5)
+        self.assertEqual(len(res.data["results"]), 2)
+        self.assertIsNotNone(res.data["next"])
+
+    def test_search_syntax_is_not_interpreted(self):
+        sample_book("Dune")
+
+        res = self.search('"dune*) -')
+
+        self.assertEqual(self.titles(res), ["Dune"])
+        self.assertEqual(self.search("!!!").data["count"], 0)
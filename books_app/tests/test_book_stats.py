@@ -0,0 +1,197 @@
+from datetime import date, timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from books_app.models import Book, DailyBorrowCount
+from books_app.stats import rebuild_book_stats
+from borrowings_app.models import Borrowing
+from borrowings_app.services import checkout_books
+
+BOOK_URL = reverse("books_app:book-list")
+LEADERBOARD_URL = reverse("books_app:book-leaderboard")
+
+
+def detail_url(book_id: int):
+    return reverse("books_app:book-detail", args=[book_id])
+
+
+class BookStatsTestCase(TestCase):
+    def setUp(self):
+        caches["books"].clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com", "test12345"
+        )
+        self.books = [
+            Book.objects.create(
+                title=f"Book {number}",
+                author="Author",
+                cover=Book.HARD,
+                inventory=10,
+                daily_fee=1,
+            )
+            for number in range(3)
+        ]
+        self.today = date.today()
+
+    def borrow(self, book, day, times=1):
+        checkout_books(
+            self.user,
+            [book.id] * times,
+            expected_return_date=day,
+            borrow_date=day,
+        )
+
+    def daily_counts(self):
+        return set(
+            DailyBorrowCount.objects.values_list(
+                "book_id", "day", "borrow_count"
+            )
+        )
+
+
+class BookStatsTests(BookStatsTestCase):
+    def test_checkouts_are_counted(self):
+        yesterday = self.today - timedelta(days=1)
+
+        self.borrow(self.books[0], yesterday)
+        self.borrow(self.books[0], self.today, times=2)
+        self.borrow(self.books[1], self.today)
+        Book.objects.checkout_copy(self.books[1].id)
+
+        self.assertEqual(
+            list(
+                Book.objects.order_by("id").values_list(
+                    "borrow_count", flat=True
+                )
+            ),
+            [3, 2, 0],
+        )
+        self.assertEqual(
+            self.daily_counts(),
+            {
+                (self.books[0].id, yesterday, 1),
+                (self.books[0].id, self.today, 2),
+                (self.books[1].id, self.today, 2),
+            },
+        )
+
+    def test_partial_checkout_is_not_counted(self):
+        Book.objects.checkout_copies({self.books[0].id: 1, 999: 1})
+
+        self.assertFalse(DailyBorrowCount.objects.exists())
+
+    def test_rebuild(self):
+        self.borrow(self.books[0], self.today, times=2)
+        expected = self.daily_counts()
+        # Created bypassing the checkout, so not counted yet
+        Borrowing.objects.create(
+            borrow_date=self.today,
+            expected_return_date=self.today,
+            book=self.books[2],
+            user=self.user,
+        )
+        DailyBorrowCount.objects.filter(book=self.books[0]).update(
+            borrow_count=100
+        )
+
+        self.assertEqual(rebuild_book_stats(chunk_size=1), 2)
+
+        self.assertEqual(
+            list(
+                Book.objects.order_by("id").values_list(
+                    "borrow_count", flat=True
+                )
+            ),
+            [2, 0, 1],
+        )
+        self.assertEqual(
+            self.daily_counts(),
+            expected | {(self.books[2].id, self.today, 1)},
+        )
+
+    def test_rebuild_command(self):
+        self.borrow(self.books[0], self.today)
+        Book.objects.update(borrow_count=0)
+
+        out = StringIO()
+        call_command("rebuild_book_stats", stdout=out)
+
+        self.books[0].refresh_from_db()
+        self.assertEqual(self.books[0].borrow_count, 1)
+        self.assertIn("1 daily count(s)", out.getvalue())
+
+
+class BookStatsApiTests(BookStatsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.borrow(self.books[0], self.today - timedelta(days=20), times=3)
+        self.borrow(self.books[1], self.today, times=2)
+        self.borrow(self.books[2], self.today - timedelta(days=100), times=5)
+
+    def leaderboard(self, **params):
+        res = self.client.get(LEADERBOARD_URL, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return [(row["book"]["id"], row["borrowings"]) for row in res.data]
+
+    def test_leaderboard_periods(self):
+        books = self.books
+
+        self.assertEqual(self.leaderboard(), [(books[1].id, 2)])
+        self.assertEqual(
+            self.leaderboard(period="month"),
+            [(books[0].id, 3), (books[1].id, 2)],
+        )
+        self.assertEqual(
+            self.leaderboard(period="all"),
+            [(books[2].id, 5), (books[0].id, 3), (books[1].id, 2)],
+        )
+        self.assertEqual(
+            self.leaderboard(period="all", limit=1), [(books[2].id, 5)]
+        )
+
+    def test_leaderboard_queries(self):
+        with self.assertNumQueries(2):
+            self.leaderboard(period="month")
+
+        with self.assertNumQueries(1):
+            self.leaderboard(period="all")
+
+    def test_leaderboard_invalid_params(self):
+        res = self.client.get(LEADERBOARD_URL, {"period": "year"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        res = self.client.get(LEADERBOARD_URL, {"limit": "many"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_borrow_count_is_optional(self):
+        res = self.client.get(BOOK_URL)
+        self.assertNotIn("borrow_count", res.data[0])
+
+        with self.assertNumQueries(2):
+            res = self.client.get(BOOK_URL, {"stats": "true"})
+        self.assertEqual(
+            [book["borrow_count"] for book in res.data],
+            [3, 2, 5],
+        )
+
+    def test_borrow_count_of_cached_book(self):
+        url = detail_url(self.books[0].id)
+
+        self.assertNotIn("borrow_count", self.client.get(url).data)
+        self.assertEqual(
+            self.client.get(url, {"stats": "true"}).data["borrow_count"], 3
+        )
+
+        self.borrow(self.books[0], self.today)
+
+        self.assertEqual(
+            self.client.get(url, {"stats": "true"}).data["borrow_count"], 4
+        )
@@ -1,11 +1,222 @@
-from rest_framework import viewsets
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import (
+    extend_schema,
+    extend_schema_view,
+    OpenApiParameter,
+)
+from django.http import Http404
+from rest_framework import serializers, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.parsers import MultiPartParser
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
 
+from books_app.cache import book_cache
+from books_app.importer import (
+    FORMATS,
+    guess_format,
+    import_books,
+    read_rows,
+    text_stream,
+)
 from books_app.models import Book
 from books_app.permissions import ReadOnlyOrAdminPermission
-from books_app.serializers import BookSerializer
+from books_app.search import search_books
+from books_app.serializers import BookLeaderboardSerializer, BookSerializer
+from books_app.stats import leaderboard, PERIODS
+from library_service.conditional import ConditionalGetMixin
+from library_service.pagination import (
+    CachedCountPageNumberPagination,
+    OptInCursorPagination,
+)
 
+MAX_LEADERBOARD_SIZE = 100
 
-class BookViewSet(viewsets.ModelViewSet):
+
+class BookPagination(OptInCursorPagination):
+    ordering = "id"
+
+
+class BookSearchPagination(CachedCountPageNumberPagination):
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+
+@extend_schema_view(
+    list=extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "search",
+                type=OpenApiTypes.STR,
+                description="Full-text search over title and author, "
+                "results are ranked by relevance and paginated by page "
+                "(ex. ?search=harry potter)",
+            ),
+            OpenApiParameter(
+                "stats",
+                type=OpenApiTypes.BOOL,
+                description="Include the borrow_count of the books",
+            ),
+        ]
+    ),
+    retrieve=extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "stats",
+                type=OpenApiTypes.BOOL,
+                description="Include the borrow_count of the book",
+            ),
+        ]
+    ),
+)
+class BookViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Book.objects.all()
     serializer_class = BookSerializer
     permission_classes = (ReadOnlyOrAdminPermission,)
+    pagination_class = BookPagination
+
+    def get_search_text(self):
+        if self.action == "list":
+            return self.request.query_params.get("search", "").strip()
+        return ""
+
+    def with_stats(self):
+        return self.request.query_params.get("stats") in ("true", "1")
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["stats"] = self.with_stats()
+        return context
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        search = self.get_search_text()
+
+        if search:
+            queryset = search_books(queryset, search)
+
+        return queryset
+
+    def retrieve(self, request, *args, **kwargs):
+        # The payload comes from the book cache, checked against the
+        # updated_at the ETag was computed from
+        version = self.get_object_version()
+
+        if version is None:
+            raise Http404
+
+        _, updated_at = version
+
+        def respond():
+            try:
+                payload = book_cache.get_payload(
+                    self.kwargs["pk"], fresh_since=updated_at
+                )
+            except Book.DoesNotExist:
+                raise Http404
+
+            if not self.with_stats():
+                payload = {
+                    field: value
+                    for field, value in payload.items()
+                    if field != "borrow_count"
+                }
+
+            return Response(payload)
+
+        return self.conditional_response(request, version, respond)
+
+    @extend_schema(
+        request={
+            "multipart/form-data": {
+                "type": "object",
+                "properties": {
+                    "file": {"type": "string", "format": "binary"},
+                    "type": {"type": "string", "enum": list(FORMATS)},
+                },
+            }
+        },
+        responses={200: OpenApiTypes.OBJECT},
+        description="Create or update books (by title) from an uploaded "
+        "CSV file with a header or an NDJSON file. The format is taken "
+        "from `type` or from the file extension.",
+    )
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="import",
+        permission_classes=[IsAdminUser],
+        parser_classes=[MultiPartParser],
+    )
+    def import_books(self, request):
+        upload = request.FILES.get("file")
+
+        if upload is None:
+            raise serializers.ValidationError({"file": "No file uploaded"})
+
+        file_format = request.data.get("type") or guess_format(upload.name)
+
+        if file_format not in FORMATS:
+            raise serializers.ValidationError(
+                {"type": f"Unknown format, use one of {', '.join(FORMATS)}"}
+            )
+
+        report = import_books(
+            read_rows(text_stream(upload.file), file_format)
+        )
+
+        return Response(report, status=status.HTTP_200_OK)
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "period",
+                type=OpenApiTypes.STR,
+                enum=list(PERIODS),
+                description="Last 7 days (week, the default), last 30 "
+                "days (month) or all time",
+            ),
+            OpenApiParameter(
+                "limit",
+                type=OpenApiTypes.INT,
+                description=f"Number of books, 10 by default, "
+                f"{MAX_LEADERBOARD_SIZE} at most",
+            ),
+        ],
+        responses=BookLeaderboardSerializer(many=True),
+        description="The most borrowed books of the period, with the "
+        "number of their borrowings",
+    )
+    @action(detail=False, methods=["get"])
+    def leaderboard(self, request):
+        period = request.query_params.get("period", "week")
+
+        if period not in PERIODS:
+            raise serializers.ValidationError(
+                {"period": f"Unknown period, use one of {', '.join(PERIODS)}"}
+            )
+
+        try:
+            limit = int(request.query_params.get("limit", 10))
+        except ValueError:
+            raise serializers.ValidationError(
+                {"limit": "A valid integer is required"}
+            )
+
+        limit = min(max(limit, 1), MAX_LEADERBOARD_SIZE)
+        serializer = BookLeaderboardSerializer(
+            leaderboard(period, limit),
+            many=True,
+            context={**self.get_serializer_context(), "stats": True},
+        )
+
+        return Response(serializer.data)
+
+    @property
+    def paginator(self):
+        # Ranked search results can't be paginated by a cursor
+        if not hasattr(self, "_paginator") and self.get_search_text():
+            self._paginator = BookSearchPagination()
+
+        return super().paginator
@@ -1,6 +1,77 @@
-from django.contrib import admin
+from datetime import date
+
+from django.contrib import admin, messages
 
 from borrowings_app.models import Borrowing
+from borrowings_app.services import RETURN_CHUNK_SIZE, return_borrowings
+from library_service.pagination import EstimatedCountPaginator
+
+
+class OverdueFilter(admin.SimpleListFilter):
+    """Active borrowings past their expected return date (indexed)."""
+
+    title = "overdue"
+    parameter_name = "overdue"
+
+    def lookups(self, request, model_admin):
+        return (("yes", "Overdue"),)
+
+    def queryset(self, request, queryset):
+        if self.value() == "yes":
+            return queryset.filter(
+                is_active=True, expected_return_date__lt=date.today()
+            )
+        return queryset
+
+
+@admin.register(Borrowing)
+class BorrowingAdmin(admin.ModelAdmin):
+    """
+    Changelist of millions of borrowings in a fixed number of queries:
+    users and books are joined, counts are estimated, facets are off
+    and users and books are picked with autocomplete widgets instead
+    of dropdowns of all of them.
+    """
+
+    list_display = (
+        "id",
+        "user",
+        "book",
+        "borrow_date",
+        "expected_return_date",
+        "actual_return_date",
+        "is_active",
+    )
+    list_select_related = ("user", "book")
+    list_filter = ("is_active", OverdueFilter)
+    date_hierarchy = "borrow_date"
+    ordering = ("-id",)
+    autocomplete_fields = ("user", "book")
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    show_facets = admin.ShowFacets.NEVER
+    actions = ("return_borrowings",)
+
+    @admin.action(description="Return selected borrowings")
+    def return_borrowings(self, request, queryset):
+        # "Select all" may pick millions of rows, they are read and
+        # returned a chunk at a time, in the order of their ids
+        ids = queryset.order_by("id").values_list("id", flat=True)
+        returned = skipped = last_id = 0
 
+        while chunk := list(ids.filter(id__gt=last_id)[:RETURN_CHUNK_SIZE]):
+            last_id = chunk[-1]
+            chunk_returned, errors = return_borrowings(
+                chunk, user=request.user
+            )
+            returned += len(chunk_returned)
+            skipped += len(errors)
 
-admin.site.register(Borrowing)
+        if returned:
+            self.message_user(request, f"{returned} borrowing(s) returned.")
+        if skipped:
+            self.message_user(
+                request,
+                f"{skipped} borrowing(s) could not be returned.",
+                messages.WARNING,
+            )
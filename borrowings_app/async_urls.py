@@ -0,0 +1,19 @@
+from django.urls import path
+
+from borrowings_app.async_views import (
+    borrowing_detail_view,
+    borrowing_list_view,
+    borrowing_return_view,
+)
+
+app_name = "borrowings_async"
+
+urlpatterns = [
+    path("", borrowing_list_view, name="borrowing-list"),
+    path("<int:pk>/", borrowing_detail_view, name="borrowing-detail"),
+    path(
+        "<int:pk>/return/",
+        borrowing_return_view,
+        name="borrowing-return",
+    ),
+]
@@ -0,0 +1,198 @@
+import functools
+import json
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_http_methods
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+from rest_framework.renderers import JSONRenderer
+
+from borrowings_app.models import Borrowing
+from borrowings_app.serializers import (
+    BorrowingCreateSerializer,
+    BorrowingReadSerializer,
+)
+from borrowings_app.services import create_borrowing, return_borrowing
+from borrowings_app.views import filter_borrowings
+from users.authentication import ClaimsJWTAuthentication
+
+MAX_PAGE_SIZE = 500
+
+
+def json_response(data, status=status.HTTP_200_OK):
+    return HttpResponse(
+        JSONRenderer().render(data),
+        status=status,
+        content_type="application/json",
+    )
+
+
+def authenticated(view):
+    """
+    Authenticate an async view with the JWT of the request, awaiting the
+    cache and the database, and answer 401 without a valid one.
+    """
+
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        try:
+            auth = await ClaimsJWTAuthentication().aauthenticate(request)
+        except APIException as error:
+            return json_response(
+                {"detail": error.detail}, status.HTTP_401_UNAUTHORIZED
+            )
+
+        if auth is None:
+            return json_response(
+                {"detail": "Authentication credentials were not provided."},
+                status.HTTP_401_UNAUTHORIZED,
+            )
+
+        request.user, request.auth = auth
+        return await view(request, *args, **kwargs)
+
+    # Tokens aren't sent by browsers on their own, like cookies are
+    return csrf_exempt(wrapper)
+
+
+def _request_data(request):
+    if request.content_type == "application/json":
+        return json.loads(request.body or b"{}")
+    return request.POST
+
+
+async def _list(request):
+    try:
+        queryset = filter_borrowings(
+            Borrowing.objects.select_related("book", "user"),
+            request.user,
+            request.GET,
+        ).order_by("-id")
+    except ValidationError as error:
+        return json_response(error.detail, status.HTTP_400_BAD_REQUEST)
+
+    if not request.GET.get("page_size"):
+        borrowings = [borrowing async for borrowing in queryset]
+        return json_response(
+            BorrowingReadSerializer(borrowings, many=True).data
+        )
+
+    # Keyset pagination: the page ends before the ``before`` id
+    try:
+        page_size = min(int(request.GET["page_size"]), MAX_PAGE_SIZE)
+        before = int(request.GET.get("before", 0))
+    except ValueError:
+        return json_response(
+            {"detail": "page_size and before must be integers"},
+            status.HTTP_400_BAD_REQUEST,
+        )
+
+    if page_size < 1:
+        return json_response(
+            {"detail": "page_size must be at least 1"},
+            status.HTTP_400_BAD_REQUEST,
+        )
+
+    if before:
+        queryset = queryset.filter(id__lt=before)
+
+    borrowings = [borrowing async for borrowing in queryset[: page_size + 1]]
+    next_url = None
+
+    if len(borrowings) > page_size:
+        borrowings = borrowings[:page_size]
+        query = request.GET.copy()
+        query["before"] = borrowings[-1].id
+        next_url = request.build_absolute_uri(f"?{query.urlencode()}")
+
+    return json_response(
+        {
+            "next": next_url,
+            "results": BorrowingReadSerializer(borrowings, many=True).data,
+        }
+    )
+
+
+async def _create(request):
+    try:
+        data = _request_data(request)
+    except ValueError as error:
+        # The reply of the JSON parser of the sync views
+        return json_response(
+            {"detail": f"JSON parse error - {error}"},
+            status.HTTP_400_BAD_REQUEST,
+        )
+
+    serializer = BorrowingCreateSerializer(data=data)
+
+    # Validation reads the book, and the checkout needs a transaction,
+    # which the async ORM doesn't support yet: both run in a thread
+    try:
+        if not await sync_to_async(serializer.is_valid)():
+            return json_response(
+                serializer.errors, status.HTTP_400_BAD_REQUEST
+            )
+
+        await sync_to_async(create_borrowing)(serializer)
+    except ValidationError as error:
+        return json_response(error.detail, status.HTTP_400_BAD_REQUEST)
+
+    return json_response(serializer.data, status.HTTP_201_CREATED)
+
+
+@require_http_methods(["GET", "POST"])
+@authenticated
+async def borrowing_list_view(request):
+    """
+    Async version of ``BorrowingListCreateView``. Lists are paginated
+    by ``page_size`` and the ``before`` id of the ``next`` link.
+    """
+    if request.method == "POST":
+        return await _create(request)
+
+    return await _list(request)
+
+
+@require_GET
+@authenticated
+async def borrowing_detail_view(request, pk: int):
+    try:
+        borrowing = await Borrowing.objects.select_related(
+            "book", "user"
+        ).aget(pk=pk)
+    except Borrowing.DoesNotExist:
+        return json_response(
+            {"detail": "Not found."}, status.HTTP_404_NOT_FOUND
+        )
+
+    return json_response(BorrowingReadSerializer(borrowing).data)
+
+
+@require_http_methods(["POST"])
+@authenticated
+async def borrowing_return_view(request, pk: int):
+    """Async version of ``borrowing_return_view``."""
+    try:
+        borrowing = await Borrowing.objects.select_related(
+            "book", "user"
+        ).aget(pk=pk)
+    except Borrowing.DoesNotExist:
+        return json_response({"Error": "Not Found"}, status.HTTP_404_NOT_FOUND)
+
+    if not borrowing.is_active:
+        return json_response(
+            {"Error": "You cannot return borrowing twice"},
+            status.HTTP_403_FORBIDDEN,
+        )
+
+    try:
+        serializer = await sync_to_async(return_borrowing)(borrowing)
+    except ValidationError as error:
+        return json_response(error.detail, status.HTTP_400_BAD_REQUEST)
+
+    if serializer.errors:
+        return json_response(serializer.errors, status.HTTP_400_BAD_REQUEST)
+
+    return json_response(serializer.data)
@@ -0,0 +1,213 @@
+import random
+from datetime import date, timedelta
+from functools import lru_cache
+from itertools import accumulate
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.utils import timezone
+
+from books_app.models import Book
+from borrowings_app.models import Borrowing
+
+COVERS = (Book.HARD, Book.SOFT)
+# Loans last from one to four weeks, returns are up to two weeks late
+LOAN_DAYS = (7, 28)
+MAX_LATE_DAYS = 14
+
+
+def zipf_weights(count: int, exponent: float) -> list:
+    """Cumulative weights of ranks 1..count of a Zipf distribution."""
+    return list(
+        accumulate(1 / rank**exponent for rank in range(1, count + 1))
+    )
+
+
+def _ids(objects) -> list:
+    return [obj.pk for obj in objects]
+
+
+def _create_users(count: int, password: str, batch_size: int) -> list:
+    user_model = get_user_model()
+    # Hashing takes most of the time of creating a user, all of them
+    # share the hash of the same password
+    password = make_password(password)
+    ids = []
+
+    for start in range(0, count, batch_size):
+        ids += _ids(
+            user_model.objects.bulk_create(
+                user_model(
+                    email=f"reader{number}@example.com",
+                    first_name="Reader",
+                    last_name=str(number),
+                    password=password,
+                )
+                for number in range(start, min(start + batch_size, count))
+            )
+        )
+
+    return ids
+
+
+def _create_books(count: int, rng: random.Random, batch_size: int) -> list:
+    ids = []
+
+    for start in range(0, count, batch_size):
+        ids += _ids(
+            Book.objects.bulk_create(
+                Book(
+                    title=f"Book {number}",
+                    author=f"Author {rng.randrange(max(count // 10, 1))}",
+                    cover=rng.choice(COVERS),
+                    # Copies left on the shelf, some books have none
+                    inventory=rng.randint(0, 5),
+                    daily_fee=rng.randint(50, 500) / 100,
+                )
+                for number in range(start, min(start + batch_size, count))
+            )
+        )
+
+    return ids
+
+
+def _days(rng: random.Random, low: int, high: int) -> timedelta:
+    # rng.randint() is several times slower, called millions of times
+    return timedelta(days=low + int(rng.random() * (high - low + 1)))
+
+
+def _borrowing(rng: random.Random, today: date, days: int, kind: str):
+    """
+    ``(borrow_date, expected_return_date, actual_return_date,
+    is_active)`` of an active, overdue or returned borrowing.
+    """
+    loan = _days(rng, *LOAN_DAYS)
+
+    if kind == "active":
+        expected = today + _days(rng, 0, loan.days - 1)
+        return expected - loan, expected, None, True
+
+    if kind == "overdue":
+        expected = today - _days(rng, 1, 60)
+        return expected - loan, expected, None, True
+
+    borrowed = today - _days(rng, 1, days)
+    returned = borrowed + _days(rng, 0, loan.days + MAX_LATE_DAYS)
+    return borrowed, borrowed + loan, min(returned, today), False
+
+
+def _insert_borrowings(rows: list) -> None:
+    """
+    Insert ``(book_id, user_id, borrow_date, expected_return_date,
+    actual_return_date, is_active)`` rows with one prepared statement:
+    bulk_create builds model instances and splits the rows into
+    statements of a few hundred, too slow for millions of them.
+    """
+    fields = [
+        Borrowing._meta.get_field(name)
+        for name in (
+            "book",
+            "user",
+            "borrow_date",
+            "expected_return_date",
+            "actual_return_date",
+            "is_active",
+            "updated_at",
+        )
+    ]
+    ops = connection.ops
+    # Few distinct days for millions of dates
+    adapt_date = lru_cache(maxsize=None)(ops.adapt_datefield_value)
+    updated_at = ops.adapt_datetimefield_value(timezone.now())
+    sql = "INSERT INTO {} ({}) VALUES ({})".format(
+        ops.quote_name(Borrowing._meta.db_table),
+        ", ".join(ops.quote_name(field.column) for field in fields),
+        ", ".join(["%s"] * len(fields)),
+    )
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.executemany(
+            sql,
+            [
+                (
+                    book_id,
+                    user_id,
+                    adapt_date(borrowed),
+                    adapt_date(expected),
+                    adapt_date(returned),
+                    is_active,
+                    updated_at,
+                )
+                for book_id, user_id, borrowed, expected, returned, is_active
+                in rows
+            ],
+        )
+
+
+def generate_dataset(
+    users: int,
+    books: int,
+    borrowings: int,
+    seed: int = 0,
+    active: float = 0.05,
+    overdue: float = 0.02,
+    days: int = 3 * 365,
+    exponent: float = 1.0,
+    password: str = "password",
+    today: date = None,
+    batch_size: int = 100_000,
+    progress=None,
+) -> dict:
+    """
+    Create readers, books and borrowings of ``days`` of history, the
+    same for the same ``seed`` and ``today``:
+
+    - the books are borrowed following a Zipf law of ``exponent``, the
+      most popular book about twice as often as the second one, three
+      times as often as the third one, and so on (for 1.0);
+    - an ``active`` fraction of the borrowings is still running and an
+      ``overdue`` fraction is late, the others were returned;
+    - every book has a few copies left or none, so that inventories
+      stay valid whatever the active borrowings of the book.
+
+    Rows are inserted ``batch_size`` at a time, one transaction each,
+    and ``progress`` is called with the number of borrowings created
+    after each batch. Book counters and stats are not updated, rebuild them
+    afterwards (see books_app.stats). Return the number of rows of each
+    kind.
+    """
+    rng = random.Random(seed)
+    today = today or date.today()
+
+    with transaction.atomic():
+        user_ids = _create_users(users, password, batch_size)
+        book_ids = _create_books(books, rng, batch_size)
+
+    # The popularity of a book does not depend on its id
+    ranked = rng.sample(book_ids, len(book_ids))
+    weights = zipf_weights(len(ranked), exponent)
+    kinds = ("active", "overdue", "returned")
+    kind_weights = (active, active + overdue, 1)
+    counts = dict.fromkeys(kinds, 0)
+
+    for start in range(0, borrowings, batch_size):
+        size = min(batch_size, borrowings - start)
+        batch = []
+
+        for book_id, user_id, kind in zip(
+            rng.choices(ranked, cum_weights=weights, k=size),
+            rng.choices(user_ids, k=size),
+            rng.choices(kinds, cum_weights=kind_weights, k=size),
+        ):
+            counts[kind] += 1
+            batch.append(
+                (book_id, user_id, *_borrowing(rng, today, days, kind))
+            )
+
+        _insert_borrowings(batch)
+
+        if progress:
+            progress(start + size)
+
+    return {"users": len(user_ids), "books": len(book_ids), **counts}
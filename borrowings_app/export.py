@@ -0,0 +1,68 @@
+import csv
+import json
+from itertools import islice
+
+CSV = "csv"
+NDJSON = "ndjson"
+CONTENT_TYPES = {CSV: "text/csv", NDJSON: "application/x-ndjson"}
+
+COLUMNS = (
+    "id",
+    "borrow_date",
+    "expected_return_date",
+    "actual_return_date",
+    "is_active",
+    "book_id",
+    "book__title",
+    "book__author",
+    "user_id",
+    "user__email",
+)
+
+
+class Echo:
+    """File-like object handing back what csv.writer writes to it."""
+
+    def write(self, value):
+        return value
+
+
+def export_rows(queryset, chunk_size=2000):
+    """
+    Stream the borrowings of ``queryset`` in id order as tuples of
+    ``COLUMNS``, with the book and the user joined in the same query.
+    """
+    return (
+        queryset.order_by("id")
+        .values_list(*COLUMNS)
+        .iterator(chunk_size=chunk_size)
+    )
+
+
+def _batches(lines, size):
+    # One write per line is slow to send, join them in batches
+    lines = iter(lines)
+
+    while batch := "".join(islice(lines, size)):
+        yield batch
+
+
+def export_lines(queryset, file_format: str, chunk_size=2000):
+    """
+    Text of the borrowings export in CSV (with a header) or NDJSON,
+    produced a batch of rows at a time. The CSV header is produced
+    before the query runs, so that the response starts at once.
+    """
+    rows = export_rows(queryset, chunk_size)
+
+    if file_format == CSV:
+        writer = csv.writer(Echo())
+        yield writer.writerow(COLUMNS)
+        lines = (writer.writerow(row) for row in rows)
+    else:
+        lines = (
+            json.dumps(dict(zip(COLUMNS, row)), default=str) + "\n"
+            for row in rows
+        )
+
+    yield from _batches(lines, chunk_size)
@@ -0,0 +1,180 @@
+from datetime import date
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import (
+    Count,
+    DateField,
+    DecimalField,
+    ExpressionWrapper,
+    F,
+    Func,
+    IntegerField,
+    Sum,
+    Value,
+)
+
+from borrowings_app.models import Borrowing
+
+FINE_FIELD = DecimalField(max_digits=14, decimal_places=2)
+CACHE_PREFIX = "fines"
+
+
+class DaysBetween(Func):
+    """Number of whole days from the ``start`` date to the ``end`` date."""
+
+    arg_joiner = " - "
+    template = "(%(expressions)s)"
+    output_field = IntegerField()
+
+    def __init__(self, end, start, **extra):
+        super().__init__(end, start, **extra)
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        end, start = self.get_source_expressions()
+        end_sql, end_params = compiler.compile(end)
+        start_sql, start_params = compiler.compile(start)
+        return (
+            f"CAST(julianday({end_sql}) - julianday({start_sql}) AS INTEGER)",
+            (*end_params, *start_params),
+        )
+
+    def as_mysql(self, compiler, connection, **extra_context):
+        return self.as_sql(
+            compiler,
+            connection,
+            template="DATEDIFF(%(expressions)s)",
+            arg_joiner=", ",
+            **extra_context,
+        )
+
+
+def outstanding_fines(as_of: date):
+    """
+    Active borrowings that are overdue on ``as_of``, annotated with
+    ``overdue_days`` and ``fine`` computed inside the database.
+    """
+    return (
+        Borrowing.objects.filter(
+            is_active=True, expected_return_date__lt=as_of
+        )
+        .annotate(
+            overdue_days=DaysBetween(
+                Value(as_of, output_field=DateField()),
+                F("expected_return_date"),
+            )
+        )
+        .annotate(
+            fine=ExpressionWrapper(
+                F("overdue_days") * F("book__daily_fee"),
+                output_field=FINE_FIELD,
+            )
+        )
+    )
+
+
+def late_return_fines(returned_on: date):
+    """Borrowings returned late on ``returned_on`` with their ``fine``."""
+    return Borrowing.objects.filter(
+        is_active=False,
+        actual_return_date=returned_on,
+        actual_return_date__gt=F("expected_return_date"),
+    ).annotate(
+        fine=ExpressionWrapper(
+            DaysBetween(
+                F("actual_return_date"), F("expected_return_date")
+            )
+            * F("book__daily_fee"),
+            output_field=FINE_FIELD,
+        ),
+    )
+
+
+def _totals(queryset):
+    totals = queryset.aggregate(total=Sum("fine"), borrowings=Count("id"))
+    return {
+        "total": totals["total"] or Decimal("0.00"),
+        "borrowings": totals["borrowings"],
+    }
+
+
+def _version(key: str) -> int:
+    return cache.get_or_set(key, 1, timeout=None)
+
+
+def _bump(key: str):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 2, timeout=None)
+
+
+def user_fines(user_id: int, as_of: date) -> dict:
+    """Outstanding fees of a user on ``as_of``, cached."""
+    version = _version(f"{CACHE_PREFIX}:user:{user_id}")
+    key = f"{CACHE_PREFIX}:user:{user_id}:{as_of}:v{version}"
+    result = cache.get(key)
+
+    if result is None:
+        queryset = outstanding_fines(as_of).filter(user_id=user_id)
+        result = {
+            "user_id": user_id,
+            "date": as_of,
+            **_totals(queryset),
+            "items": [
+                {
+                    "borrowing_id": borrowing_id,
+                    "book_id": book_id,
+                    "book": title,
+                    "overdue_days": overdue_days,
+                    "fine": fine,
+                }
+                for borrowing_id, book_id, title, overdue_days, fine in (
+                    queryset.order_by("expected_return_date").values_list(
+                        "id", "book_id", "book__title", "overdue_days", "fine"
+                    )
+                )
+            ],
+        }
+        cache.set(key, result, settings.FINES_CACHE_TIMEOUT)
+
+    return result
+
+
+def fines_report(as_of: date, limit: int = 100) -> dict:
+    """
+    Library-wide fines on ``as_of``: outstanding totals per user and
+    per book (the ``limit`` largest of each) and the fines charged for
+    the books returned late that day. Cached.
+    """
+    version = _version(f"{CACHE_PREFIX}:report")
+    key = f"{CACHE_PREFIX}:report:{as_of}:{limit}:v{version}"
+    result = cache.get(key)
+
+    if result is None:
+        outstanding = outstanding_fines(as_of)
+        result = {
+            "date": as_of,
+            "outstanding": _totals(outstanding),
+            "charged": _totals(late_return_fines(as_of)),
+            "per_user": list(
+                outstanding.values("user_id", "user__email")
+                .annotate(total=Sum("fine"), borrowings=Count("id"))
+                .order_by("-total", "user_id")[:limit]
+            ),
+            "per_book": list(
+                outstanding.values("book_id", "book__title")
+                .annotate(total=Sum("fine"), borrowings=Count("id"))
+                .order_by("-total", "book_id")[:limit]
+            ),
+        }
+        cache.set(key, result, settings.FINES_CACHE_TIMEOUT)
+
+    return result
+
+
+def invalidate_fines(user_id: int):
+    """Drop the cached fines of a user and the library-wide reports."""
+    _bump(f"{CACHE_PREFIX}:user:{user_id}")
+    _bump(f"{CACHE_PREFIX}:report")
@@ -0,0 +1,95 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from books_app.stats import rebuild_book_stats
+from borrowings_app.dataset import generate_dataset
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill the database with synthetic readers, books and borrowings "
+        "(the same ones for the same --seed)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=100_000)
+        parser.add_argument("--books", type=int, default=100_000)
+        parser.add_argument("--borrowings", type=int, default=1_000_000)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--active",
+            type=float,
+            default=0.05,
+            help="Fraction of running borrowings",
+        )
+        parser.add_argument(
+            "--overdue",
+            type=float,
+            default=0.02,
+            help="Fraction of overdue borrowings",
+        )
+        parser.add_argument(
+            "--days", type=int, default=3 * 365, help="Days of history"
+        )
+        parser.add_argument(
+            "--zipf",
+            type=float,
+            default=1.0,
+            help="Exponent of the Zipf law of the book popularity",
+        )
+        parser.add_argument(
+            "--password",
+            default="password",
+            help="Password of every generated reader",
+        )
+        parser.add_argument("--batch-size", type=int, default=100_000)
+        parser.add_argument(
+            "--skip-stats",
+            action="store_true",
+            help="Don't count the borrowings of every book afterwards",
+        )
+
+    def handle(self, *args, **options):
+        if get_user_model().objects.filter(
+            email="reader0@example.com"
+        ).exists():
+            raise CommandError(
+                "The database already holds a generated dataset"
+            )
+        if options["borrowings"] and not (
+            options["users"] and options["books"]
+        ):
+            raise CommandError("Borrowings need --users and --books")
+        if options["active"] + options["overdue"] > 1:
+            raise CommandError("--active and --overdue exceed 1")
+
+        total = options["borrowings"]
+
+        def progress(created):
+            if options["verbosity"] > 1:
+                self.stdout.write(f"{created}/{total} borrowings")
+
+        report = generate_dataset(
+            users=options["users"],
+            books=options["books"],
+            borrowings=total,
+            seed=options["seed"],
+            active=options["active"],
+            overdue=options["overdue"],
+            days=options["days"],
+            exponent=options["zipf"],
+            password=options["password"],
+            batch_size=options["batch_size"],
+            progress=progress,
+        )
+
+        if not options["skip_stats"]:
+            rebuild_book_stats()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{report['users']} user(s), {report['books']} book(s) and "
+                f"{total} borrowing(s) created: {report['active']} active, "
+                f"{report['overdue']} overdue, {report['returned']} returned"
+            )
+        )
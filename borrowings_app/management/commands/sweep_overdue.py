@@ -0,0 +1,29 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from borrowings_app.overdue import sweep_overdue
+
+
+class Command(BaseCommand):
+    help = "Queue one notification per user with overdue borrowings"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--date",
+            type=date.fromisoformat,
+            default=None,
+            help="Day to sweep for (YYYY-MM-DD), today by default",
+        )
+        parser.add_argument("--chunk-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        sweep = sweep_overdue(
+            today=options["date"],
+            chunk_size=options["chunk_size"],
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{sweep}: {sweep.notified_users} user(s) notified"
+            )
+        )
@@ -0,0 +1,30 @@
+# Generated by Django 5.0.1 on 2026-10-18 16:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("borrowings_app", "0003_borrowing_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="OverdueSweep",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("sweep_date", models.DateField(unique=True)),
+                ("last_user_id", models.BigIntegerField(default=0)),
+                ("notified_users", models.PositiveIntegerField(default=0)),
+                ("finished_at", models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+    ]
@@ -2,7 +2,10 @@ from datetime import date
 
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
+from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
+from django.db.models import Case, F, IntegerField, Value, When
+from django.db.models.functions import RowNumber
 
 from books_app.models import Book
 
@@ -17,6 +20,34 @@ class Borrowing(models.Model):
     book = models.ForeignKey(Book, on_delete=models.CASCADE)
     user = models.ForeignKey(get_user_model(), on_delete=models.CASCADE)
     is_active = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            # Active borrowings of a user, newest first
+            models.Index(
+                fields=["user", "id"],
+                condition=models.Q(is_active=True),
+                name="borrowing_active_user_idx",
+            ),
+            # Active borrowings of a book
+            models.Index(
+                fields=["book", "id"],
+                condition=models.Q(is_active=True),
+                name="borrowing_active_book_idx",
+            ),
+            # Active borrowings past their expected return date
+            models.Index(
+                fields=["expected_return_date", "id"],
+                condition=models.Q(is_active=True),
+                name="borrowing_active_due_idx",
+            ),
+            # Borrowings by date, for the admin date hierarchy
+            models.Index(
+                fields=["borrow_date", "id"],
+                name="borrowing_borrow_date_idx",
+            ),
+        ]
 
     def __str__(self):
         return (
@@ -85,3 +116,121 @@ class Borrowing(models.Model):
             self.is_active,
             self.actual_return_date,
         )
+
+
+class OverdueSweep(models.Model):
+    """
+    Progress of the overdue sweep of a day. Users are processed in
+    ``user_id`` order, so an interrupted sweep resumes after
+    ``last_user_id`` and a finished one is not repeated.
+    """
+
+    sweep_date = models.DateField(unique=True)
+    last_user_id = models.BigIntegerField(default=0)
+    notified_users = models.PositiveIntegerField(default=0)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Overdue sweep of {self.sweep_date}"
+
+
+class ReservationQuerySet(models.QuerySet):
+    def next_in_line(self, copies: dict):
+        """
+        The ``copies[book_id]`` oldest waiting reservations of active
+        users of every book. The queue of a single book is read from
+        the waiting reservation index (an index seek, whatever its
+        length), the queues of several books with one window query.
+        """
+        waiting = self.filter(
+            status=Reservation.WAITING,
+            book_id__in=copies,
+            user__is_active=True,
+        )
+
+        if len(copies) == 1:
+            return waiting.order_by("id")[: next(iter(copies.values()))]
+
+        return waiting.annotate(
+            position=models.Window(
+                RowNumber(),
+                partition_by=[F("book_id")],
+                order_by=F("id").asc(),
+            )
+        ).filter(
+            position__lte=Case(
+                *(
+                    When(book_id=book_id, then=Value(count))
+                    for book_id, count in copies.items()
+                ),
+                output_field=IntegerField(),
+            )
+        )
+
+
+class Reservation(models.Model):
+    """
+    A place in the queue of a book that has no copy left. A returned
+    copy goes to the oldest waiting reservation as a borrowing of
+    ``loan_days`` days, instead of back into the inventory.
+    """
+
+    WAITING = "WAITING"
+    FULFILLED = "FULFILLED"
+    CANCELLED = "CANCELLED"
+
+    STATUS_CHOICES = [
+        (WAITING, "Waiting"),
+        (FULFILLED, "Fulfilled"),
+        (CANCELLED, "Cancelled"),
+    ]
+
+    MAX_LOAN_DAYS = 60
+
+    book = models.ForeignKey(
+        Book, on_delete=models.CASCADE, related_name="reservations"
+    )
+    user = models.ForeignKey(get_user_model(), on_delete=models.CASCADE)
+    loan_days = models.PositiveSmallIntegerField(
+        default=14,
+        validators=[
+            MinValueValidator(1),
+            MaxValueValidator(MAX_LOAN_DAYS),
+        ],
+    )
+    status = models.CharField(
+        max_length=9,
+        choices=STATUS_CHOICES,
+        default=WAITING,
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    fulfilled_at = models.DateTimeField(null=True, blank=True)
+    borrowing = models.OneToOneField(
+        Borrowing,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="reservation",
+    )
+
+    objects = ReservationQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Waiting queue of a book, oldest first
+            models.Index(
+                fields=["book", "id"],
+                condition=models.Q(status="WAITING"),
+                name="reservation_waiting_book_idx",
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["book", "user"],
+                condition=models.Q(status="WAITING"),
+                name="reservation_waiting_unique",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user} reserved {self.book.title}"
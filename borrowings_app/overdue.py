@@ -0,0 +1,93 @@
+from datetime import date
+from itertools import groupby
+from operator import itemgetter
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from borrowings_app.models import Borrowing, OverdueSweep
+from notifications_app.models import Notification
+
+
+def overdue_rows(today: date, after_user_id: int = 0, chunk_size=2000):
+    """
+    Stream the active overdue borrowings ordered by user, with the
+    user and book columns joined in, as tuples instead of model
+    instances so that memory stays constant.
+    """
+    return (
+        Borrowing.objects.filter(
+            is_active=True,
+            expected_return_date__lt=today,
+            user_id__gt=after_user_id,
+        )
+        .order_by("user_id", "id")
+        .values_list(
+            "user_id",
+            "user__first_name",
+            "user__last_name",
+            "user__email",
+            "book__title",
+            "expected_return_date",
+        )
+        .iterator(chunk_size=chunk_size)
+    )
+
+
+def overdue_message(rows, today: date) -> str:
+    _, first_name, last_name, email = rows[0][:4]
+    lines = [f"Overdue borrowings of {first_name} {last_name} ({email}):"]
+
+    for *_, title, expected_return_date in rows:
+        days = (today - expected_return_date).days
+        lines.append(
+            f"- {title}: due {expected_return_date}, {days} day(s) late"
+        )
+
+    return "\n".join(lines)
+
+
+def _save_progress(sweep, messages, last_user_id):
+    with transaction.atomic():
+        Notification.objects.enqueue_many(messages)
+        OverdueSweep.objects.filter(pk=sweep.pk).update(
+            last_user_id=last_user_id,
+            notified_users=F("notified_users") + len(messages),
+        )
+
+
+def sweep_overdue(today: date = None, chunk_size=2000, users_per_commit=100):
+    """
+    Queue one notification per user listing all of their overdue
+    borrowings. Progress is committed together with the queued
+    notifications every ``users_per_commit`` users, so a rerun
+    continues where the previous run stopped and never notifies
+    a user twice on the same day.
+    """
+    today = today or timezone.localdate()
+    sweep, _ = OverdueSweep.objects.get_or_create(sweep_date=today)
+
+    if sweep.finished_at:
+        return sweep
+
+    messages = []
+    last_user_id = sweep.last_user_id
+    rows = overdue_rows(today, sweep.last_user_id, chunk_size)
+
+    for last_user_id, user_rows in groupby(rows, key=itemgetter(0)):
+        messages.append(overdue_message(list(user_rows), today))
+
+        if len(messages) >= users_per_commit:
+            _save_progress(sweep, messages, last_user_id)
+            messages = []
+
+    if messages:
+        _save_progress(sweep, messages, last_user_id)
+
+    OverdueSweep.objects.filter(pk=sweep.pk).update(
+        finished_at=timezone.now()
+    )
+    sweep.refresh_from_db()
+
+    return sweep
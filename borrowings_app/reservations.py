@@ -0,0 +1,139 @@
+from collections import Counter
+from datetime import date, timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from books_app.models import Book
+from borrowings_app.fines import invalidate_fines
+from borrowings_app.models import Borrowing, Reservation
+from library_service.db import retry_on_locked
+from notifications_app.models import Notification
+
+
+def _fulfil(reservations, today: date) -> list:
+    """
+    Borrow the books of fulfilled reservations for their users, link
+    the borrowings and queue a notification for each of them.
+    """
+    borrowings = Borrowing.objects.bulk_create(
+        Borrowing(
+            borrow_date=today,
+            expected_return_date=today
+            + timedelta(days=reservation.loan_days),
+            book=reservation.book,
+            user=reservation.user,
+        )
+        for reservation in reservations
+    )
+
+    for reservation, borrowing in zip(reservations, borrowings):
+        reservation.borrowing = borrowing
+
+    Reservation.objects.bulk_update(reservations, ["borrowing"])
+
+    Notification.objects.enqueue_many(
+        f"Reserved Book Borrowed:\n"
+        f"User: {reservation.user}\n"
+        f"Book: {reservation.book.title}\n"
+        f"Return by: {borrowing.expected_return_date}"
+        for reservation, borrowing in zip(reservations, borrowings)
+    )
+
+    for user_id in {reservation.user_id for reservation in reservations}:
+        invalidate_fines(user_id)
+
+    return borrowings
+
+
+def _claim_next(copies: dict) -> list:
+    """
+    Claim the ``copies[book_id]`` oldest waiting reservations of the
+    books, reading the next ones in line for the copies whose
+    reservation was cancelled or claimed by another return meanwhile.
+    """
+    claimed = []
+
+    while copies:
+        queue = list(
+            Reservation.objects.next_in_line(copies).select_related(
+                "book", "user"
+            )
+        )
+
+        if not queue:
+            break
+
+        ids = [reservation.pk for reservation in queue]
+        count = Reservation.objects.filter(
+            pk__in=ids, status=Reservation.WAITING
+        ).update(status=Reservation.FULFILLED, fulfilled_at=timezone.now())
+
+        if count == len(ids):
+            claimed += queue
+            break
+
+        # Those claimed by another return are linked to its borrowings
+        won = list(
+            Reservation.objects.filter(
+                pk__in=ids, status=Reservation.FULFILLED, borrowing=None
+            ).select_related("book", "user")
+        )
+        claimed += won
+        copies = Counter(reservation.book_id for reservation in queue)
+        copies.subtract(reservation.book_id for reservation in won)
+        copies = {book_id: left for book_id, left in copies.items() if left}
+
+    return claimed
+
+
+def release_copies(copies: dict) -> list:
+    """
+    Hand ``copies[book_id]`` returned copies of the books to the oldest
+    waiting reservations, as borrowings, and put the rest back into the
+    inventory. Call it inside the transaction of the return.
+
+    The reservations are read, then claimed by their ids with one
+    UPDATE whatever their number, only while they are still waiting, so
+    a reservation is never fulfilled twice; without any, reading them
+    is the only extra query of a return. Return the new borrowings.
+    """
+    reservations = _claim_next(copies)
+    borrowings = []
+    handed_over = Counter()
+
+    if reservations:
+        borrowings = _fulfil(reservations, date.today())
+        handed_over.update(
+            reservation.book_id for reservation in reservations
+        )
+
+    Book.objects.return_copies(copies, handed_over)
+
+    return borrowings
+
+
+@retry_on_locked
+def reserve(user_id: int, book: Book, loan_days: int) -> Reservation:
+    """
+    Queue the user for the book. If a copy was
+    returned since the inventory was read, it is borrowed for the
+    reservation right away instead of waiting for the next return.
+    """
+    today = date.today()
+
+    with transaction.atomic():
+        reservation = Reservation.objects.create(
+            user_id=user_id, book=book, loan_days=loan_days
+        )
+
+        if Book.objects.checkout_copy(reservation.book_id, today):
+            Reservation.objects.filter(pk=reservation.pk).update(
+                status=Reservation.FULFILLED, fulfilled_at=timezone.now()
+            )
+            reservation = Reservation.objects.select_related(
+                "book", "user"
+            ).get(pk=reservation.pk)
+            _fulfil([reservation], today)
+
+    return reservation
@@ -1,7 +1,13 @@
+from django.db import transaction
+from django.utils import timezone
 from rest_framework import serializers
 
+from books_app.cache import book_cache
+from books_app.models import Book
 from books_app.serializers import BookSerializer
-from borrowings_app.models import Borrowing
+from borrowings_app.fines import invalidate_fines
+from borrowings_app.models import Borrowing, Reservation
+from borrowings_app.reservations import release_copies
 
 
 class BorrowingReadSerializer(serializers.ModelSerializer):
@@ -13,7 +19,21 @@ class BorrowingReadSerializer(serializers.ModelSerializer):
         fields = "__all__"
 
 
+class CachedBookField(serializers.PrimaryKeyRelatedField):
+    """Book primary key field reading the book from the book cache."""
+
+    def to_internal_value(self, data):
+        try:
+            return book_cache.get_book(data)
+        except Book.DoesNotExist:
+            self.fail("does_not_exist", pk_value=data)
+        except (TypeError, ValueError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+
+
 class BorrowingCreateSerializer(serializers.ModelSerializer):
+    book = CachedBookField(queryset=Book.objects.all())
+
     def validate(self, attrs):
         data = super(BorrowingCreateSerializer, self).validate(attrs)
         Borrowing.validate_borrowing(
@@ -29,34 +49,120 @@ class BorrowingCreateSerializer(serializers.ModelSerializer):
     def save(self):
         book = self.validated_data["book"]
 
-        if book.inventory > 0:
-            book.inventory -= 1
-            book.save()
-        else:
-            raise serializers.ValidationError(
-                "Book inventory is 0, you cannot take this book"
-            )
+        with transaction.atomic():
+            if not Book.objects.checkout_copy(
+                book.id, self.validated_data["borrow_date"]
+            ):
+                raise serializers.ValidationError(
+                    "Book inventory is 0, you cannot take this book"
+                )
+
+            self.instance = super().create(self.validated_data)
+
+        invalidate_fines(self.instance.user_id)
 
-        return super().create(self.validated_data)
+        return self.instance
 
     class Meta:
         model = Borrowing
         fields = "__all__"
 
 
+class BulkCheckoutSerializer(serializers.Serializer):
+    books = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        min_length=1,
+        max_length=100,
+    )
+    borrow_date = serializers.DateField(required=False)
+    expected_return_date = serializers.DateField()
+    atomic = serializers.BooleanField(
+        default=True,
+        help_text="Borrow all the books or none of them",
+    )
+
+
+class BulkReturnSerializer(serializers.Serializer):
+    borrowings = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        min_length=1,
+        max_length=1000,
+    )
+
+
 class BorrowingReturnSerializer(serializers.ModelSerializer):
     book = BookSerializer()
     user = serializers.StringRelatedField(many=False)
 
     def save(self):
-        instance = super().update(self.instance, self.validated_data)
+        instance = self.instance
+        now = timezone.now()
+
+        with transaction.atomic():
+            # Only an active borrowing can be returned, even when
+            # two returns of the same borrowing race each other
+            returned = Borrowing.objects.filter(
+                pk=instance.pk, is_active=True
+            ).update(updated_at=now, **self.validated_data)
+
+            if not returned:
+                raise serializers.ValidationError(
+                    "You cannot return borrowing twice"
+                )
+
+            # The copy goes to the next reservation of the book, if any
+            release_copies({instance.book_id: 1})
+
+        invalidate_fines(instance.user_id)
 
-        book = instance.book
-        book.inventory += 1
-        book.save()
+        for attr, value in self.validated_data.items():
+            setattr(instance, attr, value)
+        instance.updated_at = now
+
+        if Borrowing.book.is_cached(instance):
+            instance.book.refresh_from_db(fields=["inventory", "updated_at"])
 
         return instance
 
     class Meta:
         model = Borrowing
         fields = "__all__"
+
+
+class ReservationSerializer(serializers.ModelSerializer):
+    book = CachedBookField(queryset=Book.objects.all())
+
+    class Meta:
+        model = Reservation
+        fields = (
+            "id",
+            "book",
+            "loan_days",
+            "status",
+            "created_at",
+            "fulfilled_at",
+            "borrowing",
+        )
+        read_only_fields = (
+            "status",
+            "created_at",
+            "fulfilled_at",
+            "borrowing",
+        )
+
+    def validate_book(self, book):
+        if book.inventory > 0:
+            raise serializers.ValidationError(
+                "The book is available, borrow it instead"
+            )
+
+        user = self.context["request"].user
+
+        if Reservation.objects.filter(
+            book=book, user_id=user.id, status=Reservation.WAITING
+        ).exists():
+            raise serializers.ValidationError(
+                "You are already waiting for this book"
+            )
+
+        return book
@@ -0,0 +1,273 @@
+from collections import Counter
+from datetime import date
+
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import serializers
+
+from books_app.models import Book
+from borrowings_app.fines import invalidate_fines
+from borrowings_app.models import Borrowing
+from borrowings_app.reservations import release_copies
+from borrowings_app.serializers import BorrowingReturnSerializer
+from library_service.db import retry_on_locked
+from notifications_app.models import Notification
+
+CHECKOUT_ATTEMPTS = 3
+RETURN_ATTEMPTS = 3
+# Borrowings read and updated per transaction by return_borrowings
+RETURN_CHUNK_SIZE = 500
+
+
+@retry_on_locked
+def create_borrowing(serializer) -> Borrowing:
+    """
+    Save a valid BorrowingCreateSerializer and queue the notification
+    of the new borrowing in the same transaction (the outbox).
+    """
+    with transaction.atomic():
+        borrowing = serializer.save()
+
+        Notification.objects.enqueue(
+            f"New Borrowing Created:\n"
+            f"User: {borrowing.user}\n"
+            f"Book: {borrowing.book.title}"
+        )
+
+    return borrowing
+
+
+@retry_on_locked
+def return_borrowing(borrowing):
+    """
+    Return an active borrowing with BorrowingReturnSerializer.
+    Return the serializer, with its errors if the data was invalid.
+    """
+    serializer = BorrowingReturnSerializer(
+        borrowing,
+        data={"is_active": False, "actual_return_date": date.today()},
+        partial=True,
+    )
+
+    if serializer.is_valid():
+        serializer.save()
+
+    return serializer
+
+
+class CheckoutConflict(Exception):
+    """Another checkout took the last copies of a book meanwhile."""
+
+
+def _checkout_errors(books, copies, borrow_date, expected_return_date):
+    errors = {}
+
+    for book_id, count in copies.items():
+        book = books.get(book_id)
+
+        if book is None:
+            errors[book_id] = {"Book ERROR": "Book does not exist"}
+            continue
+
+        try:
+            Borrowing.validate_borrowing(
+                borrow_date=borrow_date,
+                expected_return_date=expected_return_date,
+                book=book,
+                error_to_raise=serializers.ValidationError,
+            )
+        except serializers.ValidationError as error:
+            errors[book_id] = error.detail
+            continue
+
+        if book.inventory < count:
+            errors[book_id] = {
+                "Book inventory ERROR": f"Only {book.inventory} "
+                f"cop(ies) of this book left, {count} requested"
+            }
+
+    return errors
+
+
+def _checkout(user, book_ids, borrow_date, expected_return_date, atomic):
+    copies = Counter(book_ids)
+    books = Book.objects.in_bulk(list(copies))
+    errors = _checkout_errors(books, copies, borrow_date, expected_return_date)
+
+    if errors and atomic:
+        raise serializers.ValidationError({"books": errors})
+
+    copies = {
+        book_id: count
+        for book_id, count in copies.items()
+        if book_id not in errors
+    }
+
+    if not copies:
+        return [], errors
+
+    with transaction.atomic():
+        if Book.objects.checkout_copies(copies, borrow_date) < len(copies):
+            raise CheckoutConflict
+
+        borrowings = Borrowing.objects.bulk_create(
+            Borrowing(
+                borrow_date=borrow_date,
+                expected_return_date=expected_return_date,
+                book=books[book_id],
+                user=user,
+            )
+            for book_id in book_ids
+            if book_id in copies
+        )
+
+        Notification.objects.enqueue(
+            f"New Borrowings Created:\n"
+            f"User: {user}\n"
+            + "\n".join(f"Book: {books[book_id].title}" for book_id in copies)
+        )
+
+    for book_id, count in copies.items():
+        books[book_id].inventory -= count
+
+    invalidate_fines(user.id)
+
+    return borrowings, errors
+
+
+@retry_on_locked
+def checkout_books(
+    user,
+    book_ids: list,
+    expected_return_date: date,
+    borrow_date: date = None,
+    atomic: bool = True,
+):
+    """
+    Borrow several books at once (a book listed twice is borrowed
+    twice) with a constant number of queries: one to read the books,
+    one UPDATE of all their inventories and one INSERT of all the
+    borrowings, in one transaction.
+
+    With ``atomic`` every book must be available, or nothing is
+    borrowed and ValidationError is raised. Otherwise the available
+    books are borrowed and the errors of the others are returned
+    along with the borrowings.
+    """
+    borrow_date = borrow_date or date.today()
+
+    for _ in range(CHECKOUT_ATTEMPTS):
+        try:
+            return _checkout(
+                user, book_ids, borrow_date, expected_return_date, atomic
+            )
+        except CheckoutConflict:
+            # Read the inventories again and retry
+            continue
+
+    raise serializers.ValidationError(
+        {"books": "The books are being borrowed by others, try again"}
+    )
+
+
+class ReturnConflict(Exception):
+    """Some of the borrowings were returned by another request meanwhile."""
+
+
+def _return(borrowing_ids, user, returned_on):
+    borrowings = Borrowing.objects.filter(pk__in=borrowing_ids)
+
+    if user is not None and not user.is_staff:
+        borrowings = borrowings.filter(user_id=user.id)
+
+    rows = {
+        borrowing_id: (book_id, user_id, is_active)
+        for borrowing_id, book_id, user_id, is_active in (
+            borrowings.values_list("id", "book_id", "user_id", "is_active")
+        )
+    }
+    errors = {}
+
+    for borrowing_id in borrowing_ids:
+        if borrowing_id not in rows:
+            errors[borrowing_id] = "Not found"
+        elif not rows[borrowing_id][2]:
+            errors[borrowing_id] = "You cannot return borrowing twice"
+
+    active = [
+        borrowing_id
+        for borrowing_id, (_, _, is_active) in rows.items()
+        if is_active
+    ]
+
+    if not active:
+        return [], errors
+
+    with transaction.atomic():
+        # Only the still active borrowings are updated, so a borrowing
+        # returned meanwhile is never returned twice
+        returned = Borrowing.objects.filter(
+            pk__in=active, is_active=True
+        ).update(
+            is_active=False,
+            actual_return_date=returned_on,
+            updated_at=timezone.now(),
+        )
+
+        if returned < len(active):
+            raise ReturnConflict
+
+        # Copies go to the next reservations of the books, if any
+        release_copies(
+            Counter(rows[borrowing_id][0] for borrowing_id in active)
+        )
+
+    for user_id in {rows[borrowing_id][1] for borrowing_id in active}:
+        invalidate_fines(user_id)
+
+    return active, errors
+
+
+@retry_on_locked
+def _return_chunk(borrowing_ids, user, returned_on):
+    for _ in range(RETURN_ATTEMPTS):
+        try:
+            return _return(borrowing_ids, user, returned_on)
+        except ReturnConflict:
+            # Read the borrowings again and retry
+            continue
+
+    raise serializers.ValidationError(
+        {"borrowings": "The borrowings are being returned, try again"}
+    )
+
+
+def return_borrowings(
+    borrowing_ids,
+    user=None,
+    returned_on: date = None,
+    chunk_size: int = RETURN_CHUNK_SIZE,
+):
+    """
+    Return several borrowings at once, ``chunk_size`` of them per
+    transaction with a constant number of queries: one to read them,
+    one UPDATE of the borrowings and one of the inventories of their
+    books.
+
+    Borrowings that are already returned (or, unless ``user`` is staff,
+    belong to another user) are skipped and reported in the errors.
+    Return the ids of the returned borrowings and the errors.
+    """
+    returned_on = returned_on or date.today()
+    borrowing_ids = list(dict.fromkeys(borrowing_ids))
+    returned = []
+    errors = {}
+
+    for start in range(0, len(borrowing_ids), chunk_size):
+        chunk_returned, chunk_errors = _return_chunk(
+            borrowing_ids[start: start + chunk_size], user, returned_on
+        )
+        returned += chunk_returned
+        errors.update(chunk_errors)
+
+    return returned, errors
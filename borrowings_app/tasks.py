@@ -0,0 +1,10 @@
+from celery import shared_task
+
+from borrowings_app.overdue import sweep_overdue
+
+
+@shared_task
+def sweep_overdue_borrowings():
+    """Notify about overdue borrowings, one message per user."""
+    sweep = sweep_overdue()
+    return sweep.notified_users
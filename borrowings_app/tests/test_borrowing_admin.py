@@ -0,0 +1,110 @@
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from books_app.models import Book
+from borrowings_app.models import Borrowing
+from library_service.pagination import estimated_count
+from library_service.testing import QueryBudgetMixin
+
+CHANGELIST_URL = reverse("admin:borrowings_app_borrowing_changelist")
+
+
+def change_url(borrowing_id: int):
+    return reverse(
+        "admin:borrowings_app_borrowing_change", args=[borrowing_id]
+    )
+
+
+class BorrowingAdminTests(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        self.admin = get_user_model().objects.create_superuser(
+            "admin@test.com", "test12345"
+        )
+        self.client.force_login(self.admin)
+        self.books = Book.objects.bulk_create(
+            Book(
+                title=f"Book {number}",
+                author="Author",
+                cover=Book.HARD,
+                inventory=10,
+                daily_fee=1,
+            )
+            for number in range(5)
+        )
+
+    def create_borrowings(self, count):
+        Borrowing.objects.bulk_create(
+            Borrowing(
+                borrow_date=date.today() - timedelta(days=number),
+                expected_return_date=date.today() - timedelta(days=1),
+                book=self.books[number % len(self.books)],
+                user=self.admin,
+            )
+            for number in range(count)
+        )
+
+    def get_changelist(self, budget, **params):
+        with self.assertMaxQueries(budget):
+            res = self.client.get(CHANGELIST_URL, params)
+
+        self.assertEqual(res.status_code, 200)
+        return res
+
+    def test_changelist_queries_do_not_grow_with_rows(self):
+        # session, user, count (capped), page (users and books
+        # joined), date hierarchy range and dates
+        self.create_borrowings(1)
+        self.get_changelist(6)
+
+        self.create_borrowings(99)
+        res = self.get_changelist(6)
+
+        self.assertContains(res, "borrowed Book 4")
+
+    def test_filtered_changelist_queries(self):
+        self.create_borrowings(20)
+        year = date.today().year
+
+        self.get_changelist(6, is_active__exact=1)
+        self.get_changelist(6, overdue="yes")
+        self.get_changelist(6, borrow_date__year=year)
+
+    def test_overdue_filter(self):
+        self.create_borrowings(3)
+        Borrowing.objects.filter(pk=Borrowing.objects.first().pk).update(
+            is_active=False, actual_return_date=date.today()
+        )
+
+        res = self.get_changelist(6, overdue="yes")
+
+        self.assertEqual(res.context["cl"].result_count, 2)
+
+    def test_change_form_has_no_dropdowns(self):
+        self.create_borrowings(1)
+        borrowing = Borrowing.objects.get()
+
+        # session, user, savepoint, borrowing, its user and book,
+        # content type, savepoint release, selected book and user
+        with self.assertMaxQueries(10):
+            res = self.client.get(change_url(borrowing.id))
+
+        self.assertEqual(res.status_code, 200)
+        # Only the selected user and book are rendered
+        self.assertNotContains(res, "Book 3")
+        self.assertContains(res, "admin-autocomplete")
+
+    def test_estimated_count(self):
+        self.create_borrowings(30)
+        borrowings = Borrowing.objects.all()
+
+        self.assertEqual(estimated_count(borrowings), 30)
+        self.assertEqual(estimated_count(borrowings, threshold=10), 30)
+        self.assertEqual(
+            estimated_count(
+                borrowings.filter(book=self.books[0]), threshold=3
+            ),
+            3,
+        )
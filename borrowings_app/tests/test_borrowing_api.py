@@ -9,6 +9,7 @@ from rest_framework.test import APIClient
 from borrowings_app.models import Borrowing
 from books_app.models import Book
 from borrowings_app.serializers import BorrowingReadSerializer
+from notifications_app.models import Notification
 
 BORROWINGS_LIST_URL = reverse("borrowings_app:borrowing-list")
 
@@ -94,6 +95,23 @@ class AuthenticatedBorrowingTests(TestCase):
         self.assertEqual(Borrowing.objects.count(), 1)
         self.assertEqual(book.inventory, 9)
 
+    def test_create_borrowing_enqueues_notification(self):
+        book = sample_book()
+        data = {
+            "borrow_date": date.today(),
+            "expected_return_date": date.today(),
+            "book": book.id,
+            "user": self.user.id,
+            "is_active": True,
+        }
+
+        res = self.client.post(BORROWINGS_LIST_URL, data)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        notification = Notification.objects.get()
+        self.assertEqual(notification.status, Notification.PENDING)
+        self.assertIn(book.title, notification.text)
+
     def test_create_forbidden_when_book_inventory_zero(self):
         book = sample_book(inventory=0)
         data = {
@@ -217,6 +235,95 @@ class AuthenticatedBorrowingTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(res.data, serializer.data)
 
+    def test_list_borrowings_cursor_pagination(self):
+        book = sample_book()
+
+        for is_active in (True, False, True, True):
+            Borrowing.objects.create(
+                borrow_date=date.today(),
+                expected_return_date=date.today(),
+                actual_return_date=None if is_active else date.today(),
+                book=book,
+                user=self.user,
+                is_active=is_active,
+            )
+
+        res = self.client.get(
+            BORROWINGS_LIST_URL, {"is_active": "true", "page_size": 2}
+        )
+
+        active = Borrowing.objects.filter(is_active=True).order_by("-id")
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.data["results"],
+            BorrowingReadSerializer(active[:2], many=True).data,
+        )
+
+        res = self.client.get(res.data["next"])
+        self.assertEqual(
+            res.data["results"],
+            BorrowingReadSerializer(active[2:], many=True).data,
+        )
+        self.assertIsNone(res.data["next"])
+
+    def test_borrowing_conditional_get(self):
+        book = sample_book()
+        borrowing = Borrowing.objects.create(
+            borrow_date=date.today(),
+            expected_return_date=date.today(),
+            book=book,
+            user=self.user,
+        )
+
+        for url in (BORROWINGS_LIST_URL, detail_url(borrowing.id)):
+            res = self.client.get(url)
+            self.assertIn("Authorize", res["Vary"])
+
+            res = self.client.get(url, HTTP_IF_NONE_MATCH=res["ETag"])
+            self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        etags = [
+            self.client.get(url)["ETag"]
+            for url in (BORROWINGS_LIST_URL, detail_url(borrowing.id))
+        ]
+        Book.objects.checkout_copy(book.id)
+
+        for url, etag in zip(
+            (BORROWINGS_LIST_URL, detail_url(borrowing.id)), etags
+        ):
+            res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            self.assertEqual(res.data, self.client.get(url).data)
+
+    def test_borrowing_etag_changes_with_user(self):
+        borrowing = Borrowing.objects.create(
+            borrow_date=date.today(),
+            expected_return_date=date.today(),
+            book=sample_book(),
+            user=self.user,
+        )
+        urls = (BORROWINGS_LIST_URL, detail_url(borrowing.id))
+        etags = [self.client.get(url)["ETag"] for url in urls]
+
+        self.user.first_name = "Renamed"
+        self.user.save()
+
+        for url, etag in zip(urls, etags):
+            res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            self.assertIn("Renamed", str(res.data))
+
+    def test_borrowing_etag_differs_per_user(self):
+        res = self.client.get(BORROWINGS_LIST_URL)
+
+        self.client.force_authenticate(sample_user())
+        other = self.client.get(
+            BORROWINGS_LIST_URL, HTTP_IF_NONE_MATCH=res["ETag"]
+        )
+
+        self.assertEqual(other.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(other["ETag"], res["ETag"])
+
 
 class AdminBorrowingTests(TestCase):
     def setUp(self):
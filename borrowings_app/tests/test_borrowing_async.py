@@ -0,0 +1,195 @@
+from datetime import date
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+
+from books_app.models import Book
+from borrowings_app.models import Borrowing
+from borrowings_app.serializers import BorrowingReadSerializer
+from notifications_app.models import Notification
+from users.serializers import ClaimsTokenObtainPairSerializer
+
+BORROWINGS_LIST_URL = reverse("borrowings_async:borrowing-list")
+
+
+def detail_url(borrowing_id: int):
+    return reverse("borrowings_async:borrowing-detail", args=[borrowing_id])
+
+
+def return_url(borrowing_id: int):
+    return reverse("borrowings_async:borrowing-return", args=[borrowing_id])
+
+
+def access_token(user):
+    token = ClaimsTokenObtainPairSerializer.get_token(user)
+    return f"Bearer {token.access_token}"
+
+
+class AsyncBorrowingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com", "test12345"
+        )
+        self.other = get_user_model().objects.create_user(
+            "other@test.com", "test12345"
+        )
+        self.book = Book.objects.create(
+            title="Dune",
+            author="Frank Herbert",
+            cover=Book.HARD,
+            inventory=3,
+            daily_fee=1,
+        )
+        self.borrowings = [
+            Borrowing.objects.create(
+                borrow_date=date.today(),
+                expected_return_date=date.today(),
+                book=self.book,
+                user=user,
+            )
+            for user in (self.user, self.user, self.user, self.other)
+        ]
+        self.headers = {"Authorize": access_token(self.user)}
+
+    async def test_auth_required(self):
+        res = await self.async_client.get(BORROWINGS_LIST_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    async def test_invalid_token(self):
+        res = await self.async_client.get(
+            BORROWINGS_LIST_URL, headers={"Authorize": "Bearer nonsense"}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    async def test_list_own_borrowings(self):
+        res = await self.async_client.get(
+            BORROWINGS_LIST_URL, headers=self.headers
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [borrowing["id"] for borrowing in res.json()],
+            [borrowing.id for borrowing in reversed(self.borrowings[:3])],
+        )
+
+    async def test_list_pages(self):
+        res = await self.async_client.get(
+            BORROWINGS_LIST_URL, {"page_size": 2}, headers=self.headers
+        )
+        page = res.json()
+        self.assertEqual(
+            [borrowing["id"] for borrowing in page["results"]],
+            [self.borrowings[2].id, self.borrowings[1].id],
+        )
+
+        res = await self.async_client.get(page["next"], headers=self.headers)
+        page = res.json()
+        self.assertEqual(
+            [borrowing["id"] for borrowing in page["results"]],
+            [self.borrowings[0].id],
+        )
+        self.assertIsNone(page["next"])
+
+    async def test_invalid_page_size(self):
+        for page_size in (0, -1, "x"):
+            res = await self.async_client.get(
+                BORROWINGS_LIST_URL,
+                {"page_size": page_size},
+                headers=self.headers,
+            )
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    async def test_detail(self):
+        borrowing = self.borrowings[0]
+
+        res = await self.async_client.get(
+            detail_url(borrowing.id), headers=self.headers
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json()["book"]["title"], "Dune")
+        self.assertEqual(res.json()["user"], str(self.user))
+
+        res = await self.async_client.get(
+            detail_url(999), headers=self.headers
+        )
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    async def test_create(self):
+        res = await self.async_client.post(
+            BORROWINGS_LIST_URL,
+            {
+                "borrow_date": date.today(),
+                "expected_return_date": date.today(),
+                "book": self.book.id,
+                "user": self.user.id,
+                "is_active": True,
+            },
+            content_type="application/json",
+            headers=self.headers,
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        await self.book.arefresh_from_db()
+        self.assertEqual(self.book.inventory, 2)
+        self.assertEqual(await Notification.objects.acount(), 1)
+
+    async def test_create_invalid(self):
+        res = await self.async_client.post(
+            BORROWINGS_LIST_URL,
+            {"book": self.book.id},
+            content_type="application/json",
+            headers=self.headers,
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("expected_return_date", res.json())
+
+    async def test_create_malformed_json(self):
+        res = await self.async_client.post(
+            BORROWINGS_LIST_URL,
+            "{",
+            content_type="application/json",
+            headers=self.headers,
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("JSON parse error", res.json()["detail"])
+
+    async def test_return(self):
+        borrowing = self.borrowings[0]
+
+        res = await self.async_client.post(
+            return_url(borrowing.id), headers=self.headers
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        await borrowing.arefresh_from_db()
+        self.assertFalse(borrowing.is_active)
+        self.assertEqual(res.json()["book"]["inventory"], 4)
+
+        res = await self.async_client.post(
+            return_url(borrowing.id), headers=self.headers
+        )
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_same_payload_as_sync_view(self):
+        borrowing = Borrowing.objects.select_related("book", "user").get(
+            pk=self.borrowings[0].id
+        )
+
+        res = self.client.get(
+            detail_url(borrowing.id),
+            headers=self.headers,
+        )
+
+        self.assertEqual(
+            res.json()["book"], BorrowingReadSerializer(borrowing).data["book"]
+        )
@@ -0,0 +1,286 @@
+from datetime import date, timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from books_app.models import Book, BookQuerySet
+from borrowings_app.models import Borrowing
+from borrowings_app.services import return_borrowings
+from notifications_app.models import Notification
+
+BULK_CHECKOUT_URL = reverse("borrowings_app:borrowing-bulk-checkout")
+BULK_RETURN_URL = reverse("borrowings_app:borrowing-bulk-return")
+
+
+def sample_book(**params):
+    defaults = {
+        "title": "Lorem ipsum",
+        "author": "John Connor",
+        "cover": Book.HARD,
+        "inventory": 10,
+        "daily_fee": 9.99,
+    }
+    defaults.update(params)
+
+    return Book.objects.create(**defaults)
+
+
+class BulkCheckoutTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "test12345",
+        )
+        self.client.force_authenticate(self.user)
+        self.books = [
+            sample_book(title=f"book {i}", inventory=2) for i in range(10)
+        ]
+
+    def checkout(self, book_ids, **data):
+        return self.client.post(
+            BULK_CHECKOUT_URL,
+            {
+                "books": book_ids,
+                "expected_return_date": date.today() + timedelta(days=7),
+                **data,
+            },
+            format="json",
+        )
+
+    def inventories(self):
+        return list(
+            Book.objects.order_by("id").values_list("inventory", flat=True)
+        )
+
+    def test_checkout_several_books(self):
+        book_ids = [self.books[0].id, self.books[1].id, self.books[1].id]
+
+        res = self.checkout(book_ids)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data["errors"], {})
+        self.assertEqual(
+            [borrowing["book"]["id"] for borrowing in res.data["borrowings"]],
+            book_ids,
+        )
+        self.assertEqual(res.data["borrowings"][1]["book"]["inventory"], 0)
+        self.assertEqual(self.inventories()[:3], [1, 0, 2])
+        self.assertEqual(
+            Borrowing.objects.filter(user=self.user, is_active=True).count(),
+            3,
+        )
+        self.assertEqual(Notification.objects.count(), 1)
+
+    def test_constant_number_of_queries(self):
+        # books, savepoint, inventory update, daily counts upsert,
+        # borrowings insert, notification insert, savepoint release
+        with self.assertNumQueries(7):
+            self.checkout([self.books[0].id])
+
+        with self.assertNumQueries(7):
+            self.checkout([book.id for book in self.books])
+
+    def test_atomic_checkout_borrows_nothing_on_error(self):
+        self.books[1].inventory = 0
+        self.books[1].save()
+
+        res = self.checkout([self.books[0].id, self.books[1].id, 999])
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(set(res.data["books"]), {self.books[1].id, 999})
+        self.assertFalse(Borrowing.objects.exists())
+        self.assertEqual(self.inventories()[0], 2)
+
+    def test_not_enough_copies(self):
+        res = self.checkout([self.books[0].id] * 3)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.inventories()[0], 2)
+
+    def test_partial_checkout(self):
+        self.books[1].inventory = 0
+        self.books[1].save()
+
+        res = self.checkout([self.books[0].id, self.books[1].id], atomic=False)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(res.data["borrowings"]), 1)
+        self.assertEqual(list(res.data["errors"]), [self.books[1].id])
+        self.assertEqual(self.inventories()[:2], [1, 0])
+
+    def test_partial_checkout_nothing_available(self):
+        res = self.checkout([999], atomic=False)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data["borrowings"], [])
+
+    def test_gives_up_when_copies_keep_being_taken(self):
+        with mock.patch.object(
+            BookQuerySet, "checkout_copies", return_value=0
+        ) as checkout_copies:
+            res = self.checkout([self.books[0].id])
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(checkout_copies.call_count, 3)
+        self.assertFalse(Borrowing.objects.exists())
+
+    def test_return_date_before_borrow_date(self):
+        res = self.checkout(
+            [self.books[0].id],
+            borrow_date=date.today() + timedelta(days=30),
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Borrowing.objects.exists())
+
+
+class BulkReturnTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "test12345",
+        )
+        self.client.force_authenticate(self.user)
+        self.books = [
+            sample_book(title=f"book {i}", inventory=0) for i in range(3)
+        ]
+        self.borrowings = [
+            Borrowing.objects.create(
+                borrow_date=date.today(),
+                expected_return_date=date.today(),
+                book=book,
+                user=self.user,
+            )
+            for book in (self.books[0], self.books[0], *self.books[1:])
+        ]
+
+    def return_borrowings(self, borrowing_ids):
+        return self.client.post(
+            BULK_RETURN_URL, {"borrowings": borrowing_ids}, format="json"
+        )
+
+    def inventories(self):
+        return list(
+            Book.objects.order_by("id").values_list("inventory", flat=True)
+        )
+
+    def test_return_several_borrowings(self):
+        ids = [borrowing.id for borrowing in self.borrowings[:3]]
+
+        res = self.return_borrowings(ids)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(sorted(res.data["returned"]), ids)
+        self.assertEqual(self.inventories(), [2, 1, 0])
+        self.assertEqual(
+            set(
+                Borrowing.objects.filter(is_active=False).values_list(
+                    "actual_return_date", flat=True
+                )
+            ),
+            {date.today()},
+        )
+
+    def test_constant_number_of_queries(self):
+        # borrowings, savepoint, borrowings update, reservations
+        # update (none waiting), books update, savepoint release
+        with self.assertNumQueries(6):
+            self.return_borrowings([self.borrowings[0].id])
+
+        with self.assertNumQueries(6):
+            self.return_borrowings(
+                [borrowing.id for borrowing in self.borrowings[1:]]
+            )
+
+    def test_returned_in_chunks(self):
+        ids = [borrowing.id for borrowing in self.borrowings]
+
+        # Two chunks of the same 6 queries
+        with self.assertNumQueries(12):
+            returned, errors = return_borrowings(
+                [*ids, ids[0]], user=self.user, chunk_size=2
+            )
+
+        self.assertEqual(returned, ids)
+        self.assertEqual(errors, {})
+        self.assertEqual(self.inventories(), [2, 1, 1])
+
+    def test_admin_action_in_chunks(self):
+        admin = get_user_model().objects.create_superuser(
+            "admin@test.com", "test12345"
+        )
+        self.client.force_login(admin)
+
+        with mock.patch("borrowings_app.admin.RETURN_CHUNK_SIZE", 2):
+            res = self.client.post(
+                reverse("admin:borrowings_app_borrowing_changelist"),
+                {
+                    "action": "return_borrowings",
+                    "select_across": 1,
+                    "_selected_action": [self.borrowings[0].id],
+                },
+                follow=True,
+            )
+
+        self.assertContains(res, "4 borrowing(s) returned.")
+        self.assertFalse(Borrowing.objects.filter(is_active=True).exists())
+
+    def test_cannot_return_twice(self):
+        first = self.borrowings[0].id
+        self.return_borrowings([first])
+
+        res = self.return_borrowings([first, first, self.borrowings[1].id])
+
+        self.assertEqual(res.data["returned"], [self.borrowings[1].id])
+        self.assertEqual(
+            res.data["errors"], {first: "You cannot return borrowing twice"}
+        )
+        self.assertEqual(self.inventories()[0], 2)
+
+        res = self.return_borrowings([first])
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_borrowings_of_other_users(self):
+        other = get_user_model().objects.create_user(
+            "other@test.com", "test12345"
+        )
+        self.client.force_authenticate(other)
+
+        res = self.return_borrowings([self.borrowings[0].id])
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            res.data["errors"], {self.borrowings[0].id: "Not found"}
+        )
+        self.assertTrue(
+            Borrowing.objects.get(pk=self.borrowings[0].id).is_active
+        )
+
+    def test_admin_action(self):
+        admin = get_user_model().objects.create_superuser(
+            "admin@test.com", "test12345"
+        )
+        self.client.force_login(admin)
+        self.return_borrowings([self.borrowings[0].id])
+
+        res = self.client.post(
+            reverse("admin:borrowings_app_borrowing_changelist"),
+            {
+                "action": "return_borrowings",
+                "_selected_action": [
+                    borrowing.id for borrowing in self.borrowings
+                ],
+            },
+            follow=True,
+        )
+
+        self.assertContains(res, "3 borrowing(s) returned.")
+        self.assertContains(res, "1 borrowing(s) could not be returned.")
+        self.assertFalse(Borrowing.objects.filter(is_active=True).exists())
+        self.assertEqual(self.inventories(), [2, 1, 1])
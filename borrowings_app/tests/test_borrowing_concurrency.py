@@ -0,0 +1,88 @@
+import threading
+from datetime import date
+
+from django.contrib.auth import get_user_model
+from django.db import connection, OperationalError
+from django.test import TransactionTestCase
+from rest_framework import serializers
+
+from books_app.models import Book
+from borrowings_app.models import Borrowing
+from borrowings_app.serializers import BorrowingCreateSerializer
+
+INVENTORY = 25
+CHECKOUTS = 200
+THREADS = 20
+
+
+class ConcurrentCheckoutTest(TransactionTestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "test12345",
+        )
+        self.book = Book.objects.create(
+            title="Hot book",
+            author="Popular Author",
+            cover=Book.HARD,
+            inventory=INVENTORY,
+            daily_fee=1,
+        )
+
+    def checkout(self):
+        data = {
+            "borrow_date": date.today(),
+            "expected_return_date": date.today(),
+            "book": self.book.id,
+            "user": self.user.id,
+            "is_active": True,
+        }
+
+        while True:
+            serializer = BorrowingCreateSerializer(data=data)
+            try:
+                if not serializer.is_valid():
+                    return False
+                serializer.save()
+                return True
+            except serializers.ValidationError:
+                return False
+            except OperationalError:
+                # SQLite reports lock contention instead of waiting,
+                # a real client would simply retry
+                continue
+
+    def test_inventory_never_goes_negative(self):
+        """
+        Fire hundreds of checkouts of one book from many threads,
+        only as many as there are copies may succeed.
+        """
+        results = []
+        lock = threading.Lock()
+        barrier = threading.Barrier(THREADS)
+
+        def worker(attempts):
+            barrier.wait()
+            try:
+                for _ in range(attempts):
+                    succeeded = self.checkout()
+                    with lock:
+                        results.append(succeeded)
+            finally:
+                connection.close()
+
+        threads = [
+            threading.Thread(target=worker, args=(CHECKOUTS // THREADS,))
+            for _ in range(THREADS)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.book.refresh_from_db()
+
+        self.assertEqual(len(results), CHECKOUTS)
+        self.assertEqual(self.book.inventory, 0)
+        self.assertEqual(results.count(True), INVENTORY)
+        self.assertEqual(Borrowing.objects.count(), INVENTORY)
@@ -0,0 +1,119 @@
+import csv
+import io
+import json
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.http import StreamingHttpResponse
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from books_app.models import Book
+from borrowings_app.export import COLUMNS
+from borrowings_app.models import Borrowing
+
+EXPORT_URL = reverse("borrowings_app:borrowing-export")
+
+
+class BorrowingExportTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = get_user_model().objects.create_user(
+            "admin@test.com", "test12345", is_staff=True
+        )
+        self.reader = get_user_model().objects.create_user(
+            "reader@test.com", "test12345"
+        )
+        self.client.force_authenticate(self.admin)
+
+        book = Book.objects.create(
+            title="Dune",
+            author="Frank Herbert",
+            cover=Book.HARD,
+            inventory=5,
+            daily_fee=1,
+        )
+        today = date.today()
+        self.borrowings = [
+            Borrowing.objects.create(
+                borrow_date=today - timedelta(days=days),
+                expected_return_date=today,
+                actual_return_date=None if is_active else today,
+                book=book,
+                user=user,
+                is_active=is_active,
+            )
+            for days, user, is_active in (
+                (30, self.reader, False),
+                (10, self.reader, True),
+                (1, self.admin, True),
+            )
+        ]
+
+    def export(self, **params):
+        res = self.client.get(EXPORT_URL, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIsInstance(res, StreamingHttpResponse)
+        return b"".join(res.streaming_content).decode()
+
+    def exported_ids(self, **params):
+        rows = csv.DictReader(io.StringIO(self.export(**params)))
+        return [int(row["id"]) for row in rows]
+
+    def test_csv_export(self):
+        rows = list(csv.reader(io.StringIO(self.export())))
+
+        self.assertEqual(tuple(rows[0]), COLUMNS)
+        self.assertEqual(len(rows), 4)
+        first = dict(zip(COLUMNS, rows[1]))
+        self.assertEqual(first["book__title"], "Dune")
+        self.assertEqual(first["user__email"], "reader@test.com")
+        self.assertEqual(first["is_active"], "False")
+
+    def test_ndjson_export(self):
+        lines = self.export(type="ndjson").splitlines()
+
+        self.assertEqual(len(lines), 3)
+        row = json.loads(lines[2])
+        self.assertEqual(row["id"], self.borrowings[2].id)
+        self.assertIsNone(row["actual_return_date"])
+        self.assertEqual(
+            row["borrow_date"], str(self.borrowings[2].borrow_date)
+        )
+
+    def test_filters(self):
+        ids = [borrowing.id for borrowing in self.borrowings]
+
+        self.assertEqual(self.exported_ids(is_active="true"), ids[1:])
+        self.assertEqual(self.exported_ids(user_id=self.reader.id), ids[:2])
+        self.assertEqual(
+            self.exported_ids(
+                borrowed_from=date.today() - timedelta(days=10),
+                borrowed_to=date.today() - timedelta(days=5),
+            ),
+            [ids[1]],
+        )
+
+    def test_one_query(self):
+        with self.assertNumQueries(1):
+            self.export()
+
+    def test_invalid_params(self):
+        res = self.client.get(EXPORT_URL, {"type": "xml"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        res = self.client.get(EXPORT_URL, {"borrowed_from": "yesterday"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        res = self.client.get(EXPORT_URL, {"user_id": "abc"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("user_id", res.data)
+
+    def test_staff_only(self):
+        self.client.force_authenticate(self.reader)
+
+        res = self.client.get(EXPORT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,103 @@
+from datetime import date
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from books_app.models import Book
+from borrowings_app.models import Borrowing
+from library_service.testing import QueryBudgetMixin
+
+BORROWINGS_LIST_URL = reverse("borrowings_app:borrowing-list")
+ROWS = 10
+
+
+def detail_url(borrowing_id: int):
+    return reverse("borrowings_app:borrowing-detail", args=[borrowing_id])
+
+
+def return_url(borrowing_id: int):
+    return reverse("borrowings_app:borrowing-return", args=[borrowing_id])
+
+
+class BorrowingQueryBudgetTests(QueryBudgetMixin, TestCase):
+    """
+    The read paths must run a constant number of queries,
+    whatever the number of borrowings they return: one for the
+    ETag version of the data and one for the data itself.
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com", "test12345", is_staff=True
+        )
+        self.client.force_authenticate(self.user)
+
+        self.borrowings = []
+        for i in range(ROWS):
+            book = Book.objects.create(
+                title=f"book {i}",
+                author=f"author {i}",
+                cover=Book.SOFT,
+                inventory=5,
+                daily_fee=1,
+            )
+            user = get_user_model().objects.create_user(
+                f"reader{i}@test.com", "test12345"
+            )
+            self.borrowings.append(
+                Borrowing.objects.create(
+                    borrow_date=date.today(),
+                    expected_return_date=date.today(),
+                    book=book,
+                    user=user,
+                )
+            )
+
+    def test_list_queries(self):
+        with self.assertMaxQueries(2):
+            res = self.client.get(BORROWINGS_LIST_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data), ROWS)
+
+    def test_paginated_list_queries(self):
+        cache.clear()
+
+        # The total count, until it is cached
+        with self.assertMaxQueries(3):
+            res = self.client.get(BORROWINGS_LIST_URL, {"page_size": ROWS})
+
+        self.assertEqual(len(res.data["results"]), ROWS)
+        self.assertEqual(res.data["count"], ROWS)
+
+        with self.assertMaxQueries(2):
+            self.client.get(BORROWINGS_LIST_URL, {"page_size": ROWS})
+
+    def test_filtered_list_queries(self):
+        with self.assertMaxQueries(2):
+            res = self.client.get(
+                BORROWINGS_LIST_URL, {"is_active": "true", "user_id": 2}
+            )
+
+        self.assertEqual(len(res.data), 1)
+
+    def test_detail_queries(self):
+        with self.assertMaxQueries(2):
+            res = self.client.get(detail_url(self.borrowings[0].id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_return_queries(self):
+        # select, savepoint, borrowing update, reservations update
+        # (none waiting), book update, savepoint release,
+        # book inventory refresh
+        with self.assertMaxQueries(7):
+            res = self.client.post(return_url(self.borrowings[0].id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["book"]["inventory"], 6)
@@ -0,0 +1,141 @@
+from collections import Counter
+from datetime import date
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db.models import F, Sum
+from django.test import TestCase
+
+from books_app.models import Book
+from borrowings_app.dataset import generate_dataset
+from borrowings_app.models import Borrowing
+
+TODAY = date(2024, 3, 1)
+
+
+class GenerateDatasetTests(TestCase):
+    def generate(self, **params):
+        defaults = {
+            "users": 20,
+            "books": 50,
+            "borrowings": 2000,
+            "seed": 1,
+            "today": TODAY,
+            "batch_size": 300,
+        }
+        defaults.update(params)
+
+        return generate_dataset(**defaults)
+
+    def rows(self):
+        return list(
+            Borrowing.objects.order_by("id").values_list(
+                "book__title",
+                "user__email",
+                "borrow_date",
+                "expected_return_date",
+                "actual_return_date",
+                "is_active",
+            )
+        )
+
+    def test_counts(self):
+        report = self.generate(active=0.1, overdue=0.05)
+
+        self.assertEqual(get_user_model().objects.count(), 20)
+        self.assertEqual(Book.objects.count(), 50)
+        self.assertEqual(Borrowing.objects.count(), 2000)
+        self.assertEqual(
+            report["active"] + report["overdue"] + report["returned"], 2000
+        )
+        self.assertEqual(
+            Borrowing.objects.filter(
+                is_active=True, expected_return_date__gte=TODAY
+            ).count(),
+            report["active"],
+        )
+        self.assertEqual(
+            Borrowing.objects.filter(
+                is_active=True, expected_return_date__lt=TODAY
+            ).count(),
+            report["overdue"],
+        )
+        self.assertAlmostEqual(report["active"] / 2000, 0.1, delta=0.03)
+        self.assertAlmostEqual(report["overdue"] / 2000, 0.05, delta=0.02)
+
+    def test_borrowings_are_valid(self):
+        self.generate()
+
+        self.assertFalse(
+            Borrowing.objects.filter(
+                expected_return_date__lt=F("borrow_date")
+            ).exists()
+        )
+        self.assertFalse(
+            Borrowing.objects.filter(
+                actual_return_date__lt=F("borrow_date")
+            ).exists()
+        )
+        self.assertFalse(
+            Borrowing.objects.filter(actual_return_date__gt=TODAY).exists()
+        )
+        self.assertFalse(
+            Borrowing.objects.filter(
+                is_active=False, actual_return_date=None
+            ).exists()
+        )
+        self.assertFalse(Book.objects.filter(inventory__lt=0).exists())
+
+    def test_book_popularity_is_zipfian(self):
+        self.generate(borrowings=5000)
+
+        counts = sorted(
+            Counter(
+                Borrowing.objects.values_list("book_id", flat=True)
+            ).values(),
+            reverse=True,
+        )
+
+        # About 1/1 : 1/2 : 1/10 for a 1.0 exponent
+        self.assertGreater(counts[0], counts[1] * 1.4)
+        self.assertGreater(counts[0], counts[9] * 5)
+
+    def reset(self):
+        Book.objects.all().delete()
+        get_user_model().objects.all().delete()
+
+    def test_same_seed_same_dataset(self):
+        self.generate()
+        first = self.rows()
+
+        self.reset()
+        self.generate()
+        self.assertEqual(self.rows(), first)
+
+        self.reset()
+        self.generate(seed=2)
+        self.assertNotEqual(self.rows(), first)
+
+    def test_users_share_the_password(self):
+        self.generate(users=3, borrowings=0, password="secret")
+
+        users = get_user_model().objects.all()
+        self.assertEqual(len({user.password for user in users}), 1)
+        self.assertTrue(users[0].check_password("secret"))
+
+    def test_command_rebuilds_book_stats(self):
+        out = StringIO()
+
+        call_command(
+            "generate_dataset",
+            "--users=5",
+            "--books=10",
+            "--borrowings=100",
+            stdout=out,
+        )
+
+        self.assertIn("100 borrowing(s) created", out.getvalue())
+        self.assertEqual(
+            Book.objects.aggregate(total=Sum("borrow_count"))["total"], 100
+        )
@@ -0,0 +1,182 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from books_app.models import Book
+from borrowings_app.fines import fines_report, user_fines
+from borrowings_app.models import Borrowing
+
+FEES_URL = reverse("borrowings_app:outstanding-fees")
+FEES_REPORT_URL = reverse("borrowings_app:fees-report")
+TODAY = date(2024, 3, 1)
+
+
+def sample_book(**params):
+    defaults = {
+        "title": "Lorem ipsum",
+        "author": "John Connor",
+        "cover": Book.HARD,
+        "inventory": 10,
+        "daily_fee": Decimal("1.50"),
+    }
+    defaults.update(params)
+
+    return Book.objects.create(**defaults)
+
+
+def borrow(user, book, days_late, returned_on=None):
+    expected = TODAY - timedelta(days=days_late)
+    return Borrowing.objects.create(
+        borrow_date=expected - timedelta(days=14),
+        expected_return_date=expected,
+        actual_return_date=returned_on,
+        book=book,
+        user=user,
+        is_active=returned_on is None,
+    )
+
+
+class FineEngineTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create(email="a@test.com")
+        self.other = get_user_model().objects.create(email="b@test.com")
+        self.cheap = sample_book(title="cheap", daily_fee=Decimal("1.50"))
+        self.pricey = sample_book(title="pricey", daily_fee=Decimal("4.00"))
+
+        borrow(self.user, self.cheap, days_late=4)
+        borrow(self.user, self.pricey, days_late=2)
+        borrow(self.other, self.pricey, days_late=1)
+        # Not overdue yet
+        borrow(self.other, self.cheap, days_late=0)
+        # Returned 3 days late on TODAY
+        borrow(self.other, self.cheap, days_late=3, returned_on=TODAY)
+
+    def test_user_fines(self):
+        fines = user_fines(self.user.id, TODAY)
+
+        self.assertEqual(fines["total"], Decimal("14.00"))
+        self.assertEqual(fines["borrowings"], 2)
+        self.assertEqual(
+            [
+                (item["book"], item["overdue_days"], item["fine"])
+                for item in fines["items"]
+            ],
+            [("cheap", 4, Decimal("6.00")), ("pricey", 2, Decimal("8.00"))],
+        )
+
+    def test_user_without_fines(self):
+        user = get_user_model().objects.create(email="c@test.com")
+
+        fines = user_fines(user.id, TODAY)
+
+        self.assertEqual(fines["total"], Decimal("0.00"))
+        self.assertEqual(fines["items"], [])
+
+    def test_report(self):
+        report = fines_report(TODAY)
+
+        self.assertEqual(report["outstanding"]["total"], Decimal("18.00"))
+        self.assertEqual(report["outstanding"]["borrowings"], 3)
+        self.assertEqual(report["charged"]["total"], Decimal("4.50"))
+        self.assertEqual(
+            [(row["user_id"], row["total"]) for row in report["per_user"]],
+            [
+                (self.user.id, Decimal("14.00")),
+                (self.other.id, Decimal("4.00")),
+            ],
+        )
+        self.assertEqual(
+            [
+                (row["book__title"], row["total"])
+                for row in report["per_book"]
+            ],
+            [("pricey", Decimal("12.00")), ("cheap", Decimal("6.00"))],
+        )
+
+    def test_fines_are_cached(self):
+        user_fines(self.user.id, TODAY)
+        fines_report(TODAY)
+
+        with self.assertNumQueries(0):
+            user_fines(self.user.id, TODAY)
+            fines_report(TODAY)
+
+
+class FeesApiTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create(email="a@test.com")
+        self.client.force_authenticate(self.user)
+
+    def test_outstanding_fees(self):
+        book = sample_book()
+        borrow(self.user, book, days_late=2)
+
+        res = self.client.get(FEES_URL, {"date": "2024-03-01"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["total"], Decimal("3.00"))
+
+    def test_invalid_date(self):
+        res = self.client.get(FEES_URL, {"date": "yesterday"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_return_invalidates_cached_fees(self):
+        borrowing = Borrowing.objects.create(
+            borrow_date=date.today() - timedelta(days=10),
+            expected_return_date=date.today() - timedelta(days=2),
+            book=sample_book(),
+            user=self.user,
+        )
+
+        res = self.client.get(FEES_URL)
+        self.assertEqual(res.data["total"], Decimal("3.00"))
+
+        self.client.post(
+            reverse("borrowings_app:borrowing-return", args=[borrowing.id])
+        )
+
+        res = self.client.get(FEES_URL)
+        self.assertEqual(res.data["total"], Decimal("0.00"))
+
+    def test_invalid_integers(self):
+        self.user.is_staff = True
+        self.user.save()
+
+        res = self.client.get(FEES_URL, {"user_id": "abc"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("user_id", res.data)
+
+        res = self.client.get(FEES_REPORT_URL, {"limit": "abc"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("limit", res.data)
+
+    def test_report_limit_is_clamped(self):
+        self.user.is_staff = True
+        self.user.save()
+        borrow(self.user, sample_book(), days_late=2)
+
+        res = self.client.get(FEES_REPORT_URL, {"limit": -1, "date": TODAY})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data["per_user"]), 1)
+
+    def test_report_only_for_staff(self):
+        res = self.client.get(FEES_REPORT_URL)
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.user.is_staff = True
+        self.user.save()
+
+        res = self.client.get(FEES_REPORT_URL, {"date": "2024-03-01"})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["outstanding"]["total"], Decimal("0.00"))
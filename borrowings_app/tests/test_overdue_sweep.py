@@ -0,0 +1,105 @@
+from datetime import date, timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+
+from books_app.models import Book
+from borrowings_app.models import Borrowing, OverdueSweep
+from borrowings_app.overdue import sweep_overdue
+from borrowings_app.tasks import sweep_overdue_borrowings
+from notifications_app.models import Notification
+
+TODAY = date(2024, 3, 1)
+
+
+class OverdueSweepTest(TestCase):
+    def setUp(self):
+        self.books = [
+            Book.objects.create(
+                title=f"book {i}",
+                author="author",
+                cover=Book.SOFT,
+                inventory=10,
+                daily_fee=1,
+            )
+            for i in range(3)
+        ]
+        self.users = [
+            get_user_model().objects.create(
+                email=f"reader{i}@test.com",
+                first_name=f"Reader{i}",
+            )
+            for i in range(3)
+        ]
+
+        # Two overdue borrowings of the first user, one of the second
+        self.borrow(self.users[0], self.books[0], days_late=3)
+        self.borrow(self.users[0], self.books[1], days_late=1)
+        self.borrow(self.users[1], self.books[2], days_late=5)
+        # Not overdue yet and already returned
+        self.borrow(self.users[2], self.books[0], days_late=0)
+        self.borrow(self.users[2], self.books[1], days_late=7, active=False)
+
+    @staticmethod
+    def borrow(user, book, days_late, active=True):
+        expected = TODAY - timedelta(days=days_late)
+        return Borrowing.objects.create(
+            borrow_date=expected - timedelta(days=14),
+            expected_return_date=expected,
+            actual_return_date=None if active else TODAY,
+            book=book,
+            user=user,
+            is_active=active,
+        )
+
+    def test_one_notification_per_user(self):
+        sweep = sweep_overdue(today=TODAY)
+
+        self.assertEqual(sweep.notified_users, 2)
+        self.assertIsNotNone(sweep.finished_at)
+
+        first, second = Notification.objects.order_by("id")
+        self.assertIn("Reader0", first.text)
+        self.assertIn("book 0: due 2024-02-27, 3 day(s) late", first.text)
+        self.assertIn("book 1", first.text)
+        self.assertIn("Reader1", second.text)
+        self.assertNotIn("Reader2", first.text + second.text)
+
+    def test_rerun_is_incremental(self):
+        sweep_overdue(today=TODAY)
+        sweep_overdue(today=TODAY)
+
+        self.assertEqual(Notification.objects.count(), 2)
+
+    def test_interrupted_sweep_resumes(self):
+        OverdueSweep.objects.create(
+            sweep_date=TODAY, last_user_id=self.users[0].id
+        )
+
+        sweep = sweep_overdue(today=TODAY)
+
+        self.assertEqual(sweep.notified_users, 1)
+        self.assertIn("Reader1", Notification.objects.get().text)
+
+    def test_progress_committed_in_batches(self):
+        sweep = sweep_overdue(today=TODAY, users_per_commit=1)
+
+        self.assertEqual(sweep.notified_users, 2)
+        self.assertEqual(sweep.last_user_id, self.users[1].id)
+
+    def test_management_command(self):
+        out = StringIO()
+
+        call_command("sweep_overdue", "--date", "2024-03-01", stdout=out)
+
+        self.assertIn("2 user(s) notified", out.getvalue())
+
+    def test_celery_task_runs_eagerly(self):
+        result = sweep_overdue_borrowings.apply()
+
+        self.assertTrue(result.successful())
+        self.assertEqual(
+            OverdueSweep.objects.get().notified_users, result.result
+        )
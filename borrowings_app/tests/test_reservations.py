@@ -0,0 +1,269 @@
+from datetime import date, timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from books_app.models import Book
+from borrowings_app.models import Borrowing, Reservation
+from borrowings_app.reservations import reserve
+from notifications_app.models import Notification
+
+RESERVATIONS_URL = reverse("borrowings_app:reservation-list")
+BULK_RETURN_URL = reverse("borrowings_app:borrowing-bulk-return")
+
+
+def reservation_url(reservation_id: int):
+    return reverse("borrowings_app:reservation-detail", args=[reservation_id])
+
+
+def return_url(borrowing_id: int):
+    return reverse("borrowings_app:borrowing-return", args=[borrowing_id])
+
+
+def sample_book(**params):
+    defaults = {
+        "title": "Lorem ipsum",
+        "author": "John Connor",
+        "cover": Book.HARD,
+        "inventory": 0,
+        "daily_fee": 9.99,
+    }
+    defaults.update(params)
+
+    return Book.objects.create(**defaults)
+
+
+class ReservationTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_superuser(
+            "admin@test.com", "test12345"
+        )
+        self.client.force_authenticate(self.user)
+        self.readers = [
+            get_user_model().objects.create_user(
+                f"reader{number}@test.com", "test12345"
+            )
+            for number in range(3)
+        ]
+        self.books = [sample_book(title=f"book {i}") for i in range(2)]
+        self.borrowings = [
+            Borrowing.objects.create(
+                borrow_date=date.today(),
+                expected_return_date=date.today(),
+                book=book,
+                user=self.user,
+            )
+            for book in (self.books[0], self.books[0], self.books[1])
+        ]
+
+    def queue(self, book, *users, loan_days=14):
+        return [
+            Reservation.objects.create(
+                book=book, user=user, loan_days=loan_days
+            )
+            for user in users
+        ]
+
+    def reserve(self, book, user, **data):
+        self.client.force_authenticate(user)
+        return self.client.post(
+            RESERVATIONS_URL, {"book": book.id, **data}, format="json"
+        )
+
+    def test_reserve_unavailable_book(self):
+        res = self.reserve(self.books[0], self.readers[0], loan_days=7)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data["status"], Reservation.WAITING)
+        self.assertEqual(res.data["loan_days"], 7)
+        self.assertIsNone(res.data["borrowing"])
+
+        res = self.reserve(self.books[0], self.readers[0])
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_available_book_cannot_be_reserved(self):
+        book = sample_book(title="On the shelf", inventory=1)
+
+        res = self.reserve(book, self.readers[0])
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("book", res.data)
+
+    def test_reserve_copy_returned_meanwhile(self):
+        book = sample_book(title="Just returned", inventory=1)
+
+        reservation = reserve(self.readers[0].id, book, loan_days=3)
+
+        self.assertEqual(reservation.status, Reservation.FULFILLED)
+        self.assertEqual(
+            reservation.borrowing.expected_return_date,
+            date.today() + timedelta(days=3),
+        )
+        book.refresh_from_db()
+        self.assertEqual(book.inventory, 0)
+
+    def test_return_hands_copy_to_next_reservation(self):
+        first, second = self.queue(
+            self.books[0], self.readers[0], self.readers[1], loan_days=7
+        )
+
+        res = self.client.post(return_url(self.borrowings[0].id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        # The copy never went back on the shelf
+        self.assertEqual(res.data["book"]["inventory"], 0)
+
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual(first.status, Reservation.FULFILLED)
+        self.assertEqual(second.status, Reservation.WAITING)
+        self.assertEqual(first.borrowing.user, self.readers[0])
+        self.assertEqual(first.borrowing.book, self.books[0])
+        self.assertEqual(
+            first.borrowing.expected_return_date,
+            date.today() + timedelta(days=7),
+        )
+        self.assertTrue(first.borrowing.is_active)
+        self.assertIn(
+            "reader0@test.com", Notification.objects.get().text
+        )
+        self.books[0].refresh_from_db()
+        self.assertEqual(self.books[0].borrow_count, 1)
+
+    def test_return_without_reservation(self):
+        self.client.post(return_url(self.borrowings[0].id))
+
+        self.books[0].refresh_from_db()
+        self.assertEqual(self.books[0].inventory, 1)
+        self.assertFalse(Notification.objects.exists())
+
+    def test_inactive_and_cancelled_reservations_are_skipped(self):
+        self.readers[0].is_active = False
+        self.readers[0].save()
+        inactive, cancelled, waiting = self.queue(self.books[0], *self.readers)
+        cancelled.status = Reservation.CANCELLED
+        cancelled.save()
+
+        self.client.post(return_url(self.borrowings[0].id))
+
+        self.assertEqual(
+            dict(Reservation.objects.values_list("id", "status")),
+            {
+                inactive.id: Reservation.WAITING,
+                cancelled.id: Reservation.CANCELLED,
+                waiting.id: Reservation.FULFILLED,
+            },
+        )
+
+    def test_bulk_return_hands_copies_in_queue_order(self):
+        queue = self.queue(self.books[0], *self.readers)
+        (other,) = self.queue(self.books[1], self.readers[0])
+
+        res = self.client.post(
+            BULK_RETURN_URL,
+            {"borrowings": [borrowing.id for borrowing in self.borrowings]},
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            set(
+                Reservation.objects.filter(
+                    status=Reservation.FULFILLED
+                ).values_list("id", flat=True)
+            ),
+            {queue[0].id, queue[1].id, other.id},
+        )
+        self.assertEqual(
+            list(
+                Book.objects.order_by("id").values_list(
+                    "inventory", flat=True
+                )
+            ),
+            [0, 0],
+        )
+        self.assertEqual(Notification.objects.count(), 3)
+
+    def test_constant_number_of_queries(self):
+        self.queue(self.books[0], self.readers[0])
+
+        # borrowing, savepoint, borrowing update, waiting reservations,
+        # reservations update, borrowings insert, reservations link,
+        # daily counts upsert, notifications insert, book update,
+        # savepoint release, book inventory refresh
+        with self.assertNumQueries(12):
+            self.client.post(return_url(self.borrowings[0].id))
+
+        self.queue(self.books[0], *self.readers)
+        self.queue(self.books[1], *self.readers)
+
+        # borrowings, and the same without the refresh
+        with self.assertNumQueries(11):
+            self.client.post(
+                BULK_RETURN_URL,
+                {"borrowings": [self.borrowings[1].id, self.borrowings[2].id]},
+                format="json",
+            )
+
+    def test_reservation_cancelled_before_claim(self):
+        first, second = self.queue(
+            self.books[0], self.readers[0], self.readers[1]
+        )
+        next_in_line = Reservation.objects.next_in_line
+
+        def cancel_after_read(copies):
+            reservations = next_in_line(copies).select_related()
+            list(reservations)
+            Reservation.objects.filter(pk=first.pk).update(
+                status=Reservation.CANCELLED
+            )
+            return mock.Mock(select_related=lambda *fields: reservations)
+
+        with mock.patch.object(
+            Reservation.objects, "next_in_line", cancel_after_read
+        ):
+            self.client.post(return_url(self.borrowings[0].id))
+
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual(first.status, Reservation.CANCELLED)
+        self.assertIsNone(first.borrowing)
+        # The copy went to the next reservation in line
+        self.assertEqual(second.status, Reservation.FULFILLED)
+        self.assertEqual(second.borrowing.user, self.readers[1])
+        self.books[0].refresh_from_db()
+        self.assertEqual(self.books[0].inventory, 0)
+
+    def test_list_own_reservations(self):
+        self.queue(self.books[0], self.readers[0])
+        (mine,) = self.queue(self.books[1], self.readers[1])
+        self.client.force_authenticate(self.readers[1])
+
+        res = self.client.get(RESERVATIONS_URL)
+
+        self.assertEqual([row["id"] for row in res.data], [mine.id])
+
+    def test_cancel(self):
+        waiting, fulfilled = self.queue(
+            self.books[0], self.readers[0], self.readers[1]
+        )
+        fulfilled.status = Reservation.FULFILLED
+        fulfilled.save()
+        self.client.force_authenticate(self.readers[0])
+
+        res = self.client.delete(reservation_url(waiting.id))
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        waiting.refresh_from_db()
+        self.assertEqual(waiting.status, Reservation.CANCELLED)
+
+        res = self.client.delete(reservation_url(fulfilled.id))
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+        self.client.force_authenticate(self.readers[1])
+        res = self.client.delete(reservation_url(fulfilled.id))
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
@@ -3,16 +3,38 @@ from borrowings_app.views import (
     BorrowingListCreateView,
     BorrowingDetailView,
     borrowing_return_view,
+    bulk_checkout_view,
+    bulk_return_view,
+    export_borrowings_view,
+    fees_report_view,
+    outstanding_fees_view,
+    ReservationDetailView,
+    ReservationListCreateView,
 )
 
 app_name = "borrowings_app"
 
 urlpatterns = [
     path("", BorrowingListCreateView.as_view(), name="borrowing-list"),
+    path("bulk/", bulk_checkout_view, name="borrowing-bulk-checkout"),
+    path("return/", bulk_return_view, name="borrowing-bulk-return"),
     path("<int:pk>/", BorrowingDetailView.as_view(), name="borrowing-detail"),
     path(
         "<int:pk>/return/",
         borrowing_return_view,
         name="borrowing-return",
     ),
+    path("fees/", outstanding_fees_view, name="outstanding-fees"),
+    path("fees/report/", fees_report_view, name="fees-report"),
+    path("export/", export_borrowings_view, name="borrowing-export"),
+    path(
+        "reservations/",
+        ReservationListCreateView.as_view(),
+        name="reservation-list",
+    ),
+    path(
+        "reservations/<int:pk>/",
+        ReservationDetailView.as_view(),
+        name="reservation-detail",
+    ),
 ]
@@ -1,26 +1,80 @@
 import datetime
-import asyncio
-from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.http import StreamingHttpResponse
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema, OpenApiParameter
-from rest_framework import generics, status
-from rest_framework.permissions import IsAuthenticated
+from rest_framework import generics, serializers, status
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 
-from borrowings_app.models import Borrowing
+from books_app.models import Book
+from borrowings_app.export import CONTENT_TYPES, CSV, export_lines
+from borrowings_app.fines import fines_report, user_fines
+from borrowings_app.models import Borrowing, Reservation
+from borrowings_app.reservations import reserve
 from borrowings_app.serializers import (
     BorrowingReadSerializer,
     BorrowingCreateSerializer,
-    BorrowingReturnSerializer,
+    BulkCheckoutSerializer,
+    BulkReturnSerializer,
+    ReservationSerializer,
 )
-from telegram_helper import TelegramHelper
+from borrowings_app.services import (
+    checkout_books,
+    create_borrowing,
+    return_borrowing,
+    return_borrowings,
+)
+from library_service.conditional import ConditionalGetMixin
+from library_service.pagination import OptInCursorPagination
+from users.authentication import get_model_user
+
+
+class BorrowingPagination(OptInCursorPagination):
+    ordering = "-id"
+
 
+def filter_borrowings(queryset, user, params):
+    """
+    Apply the ``is_active`` query parameter, and ``user_id`` for staff.
+    Other users only see their own borrowings. A ``user_id`` that isn't
+    an integer raises ValidationError.
+    """
+    is_active = params.get("is_active", "").lower()
 
-class BorrowingListCreateView(generics.ListCreateAPIView):
+    if user.is_staff:
+        user_id = params.get("user_id")
+
+        if user_id:
+            try:
+                user_id = int(user_id)
+            except ValueError:
+                raise serializers.ValidationError(
+                    {"user_id": "A valid integer is required"}
+                )
+
+            queryset = queryset.filter(user_id=user_id)
+    else:
+        queryset = queryset.filter(user_id=user.id)
+
+    if is_active == "true":
+        queryset = queryset.filter(is_active=True)
+    elif is_active == "false":
+        queryset = queryset.filter(is_active=False)
+
+    return queryset
+
+
+class BorrowingListCreateView(
+    ConditionalGetMixin, generics.ListCreateAPIView
+):
     permission_classes = [
         IsAuthenticated,
     ]
+    pagination_class = BorrowingPagination
+    list_version_models = (Borrowing, Book, get_user_model())
+    vary_on_user = True
 
     def get_serializer_class(self):
         if self.request.method == "POST":
@@ -29,47 +83,16 @@ class BorrowingListCreateView(generics.ListCreateAPIView):
         return BorrowingReadSerializer
 
     def get_queryset(self):
-        user = self.request.user
-        queryset = Borrowing.objects.all()
-
-        is_active = self.request.query_params.get("is_active", "").lower()
-
-        if user.is_staff:
-            user_id = self.request.query_params.get("user_id")
-
-            if user_id:
-                queryset = queryset.filter(user_id=int(user_id))
-        else:
-            queryset = queryset.filter(user_id=user.id)
-
-        if is_active == "true":
-            queryset = queryset.filter(is_active=True)
-        elif is_active == "false":
-            queryset = queryset.filter(is_active=False)
-
-        return queryset
-
-    @staticmethod
-    async def send_notification(message: str):
-        telegram_helper = TelegramHelper(
-            token=settings.TELEGRAM_BOT_TOKEN,
-            chat_id=settings.TELEGRAM_CHAT_ID,
+        return filter_borrowings(
+            Borrowing.objects.select_related("book", "user"),
+            self.request.user,
+            self.request.query_params,
         )
-        await telegram_helper.send_message(message)
 
     def perform_create(self, serializer):
-        borrowing = serializer.save()
-
-        message = (
-            f"New Borrowing Created:\n"
-            f"User: {borrowing.user}\n"
-            f"Book: {borrowing.book.title}"
-        )
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        loop.run_until_complete(self.send_notification(message))
-
-        loop.close()
+        # The notification is stored in the outbox together with the
+        # borrowing and delivered later by `dispatch_notifications`
+        create_borrowing(serializer)
 
     @extend_schema(
         parameters=[
@@ -91,12 +114,14 @@ class BorrowingListCreateView(generics.ListCreateAPIView):
         return self.list(request, *args, **kwargs)
 
 
-class BorrowingDetailView(generics.RetrieveAPIView):
-    queryset = Borrowing.objects.all()
+class BorrowingDetailView(ConditionalGetMixin, generics.RetrieveAPIView):
+    queryset = Borrowing.objects.select_related("book", "user")
     serializer_class = BorrowingReadSerializer
     permission_classes = [
         IsAuthenticated,
     ]
+    version_fields = ("updated_at", "book__updated_at", "user__updated_at")
+    vary_on_user = True
 
 
 @api_view(["POST"])
@@ -107,7 +132,9 @@ def borrowing_return_view(request, pk: int):
     Each borrowing can be returned only once.
     """
     try:
-        instance = Borrowing.objects.get(pk=pk)
+        instance = Borrowing.objects.select_related("book", "user").get(
+            pk=pk
+        )
     except Borrowing.DoesNotExist:
         return Response(
             {
@@ -118,19 +145,9 @@ def borrowing_return_view(request, pk: int):
 
     if request.method == "POST":
         if instance.is_active:
-            updated_data = {
-                "is_active": False,
-                "actual_return_date": datetime.date.today(),
-            }
-
-            serializer = BorrowingReturnSerializer(
-                instance,
-                data=updated_data,
-                partial=True,
-            )
+            serializer = return_borrowing(instance)
 
-            if serializer.is_valid():
-                serializer.save()
+            if not serializer.errors:
                 return Response(serializer.data, status=status.HTTP_200_OK)
             else:
                 return Response(
@@ -141,3 +158,282 @@ def borrowing_return_view(request, pk: int):
                 {"Error": "You cannot return borrowing twice"},
                 status=status.HTTP_403_FORBIDDEN,
             )
+
+
+@extend_schema(
+    request=BulkCheckoutSerializer,
+    responses={201: OpenApiTypes.OBJECT},
+)
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def bulk_checkout_view(request):
+    """
+    Borrow several books at once. Unless ``atomic`` is false, either
+    all of the books are borrowed or none of them; otherwise the
+    available books are borrowed and the others reported in ``errors``.
+    """
+    serializer = BulkCheckoutSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+
+    borrowings, errors = checkout_books(
+        get_model_user(request.user),
+        book_ids=serializer.validated_data["books"],
+        expected_return_date=serializer.validated_data[
+            "expected_return_date"
+        ],
+        borrow_date=serializer.validated_data.get("borrow_date"),
+        atomic=serializer.validated_data["atomic"],
+    )
+
+    return Response(
+        {
+            "borrowings": BorrowingReadSerializer(
+                borrowings, many=True
+            ).data,
+            "errors": errors,
+        },
+        status=(
+            status.HTTP_201_CREATED
+            if borrowings
+            else status.HTTP_400_BAD_REQUEST
+        ),
+    )
+
+
+@extend_schema(
+    request=BulkReturnSerializer,
+    responses={200: OpenApiTypes.OBJECT},
+    operation_id="borrowings_bulk_return",
+)
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def bulk_return_view(request):
+    """
+    Return several borrowings at once. Borrowings that can't be
+    returned (already returned, or not found) are reported in
+    ``errors``, the others are returned anyway.
+    """
+    serializer = BulkReturnSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+
+    returned, errors = return_borrowings(
+        serializer.validated_data["borrowings"], user=request.user
+    )
+
+    return Response(
+        {"returned": returned, "errors": errors},
+        status=(
+            status.HTTP_200_OK if returned else status.HTTP_400_BAD_REQUEST
+        ),
+    )
+
+
+class ReservationListCreateView(generics.ListCreateAPIView):
+    """
+    Reservations of the user, newest first. A book without copies left
+    can be reserved: the next returned copy is borrowed for the oldest
+    waiting reservation and a notification is sent, so there is no
+    need to poll the book.
+    """
+
+    serializer_class = ReservationSerializer
+    permission_classes = [
+        IsAuthenticated,
+    ]
+    pagination_class = BorrowingPagination
+
+    def get_queryset(self):
+        return Reservation.objects.filter(user_id=self.request.user.id)
+
+    def perform_create(self, serializer):
+        serializer.instance = reserve(
+            self.request.user.id,
+            serializer.validated_data["book"],
+            serializer.validated_data["loan_days"],
+        )
+
+
+class ReservationDetailView(generics.RetrieveDestroyAPIView):
+    """Cancel a waiting reservation with DELETE."""
+
+    serializer_class = ReservationSerializer
+    permission_classes = [
+        IsAuthenticated,
+    ]
+
+    def get_queryset(self):
+        return Reservation.objects.filter(user_id=self.request.user.id)
+
+    def perform_destroy(self, instance):
+        # The reservation is kept, and only cancelled if it is still
+        # waiting (a return may have fulfilled it meanwhile)
+        cancelled = Reservation.objects.filter(
+            pk=instance.pk, status=Reservation.WAITING
+        ).update(status=Reservation.CANCELLED)
+
+        if not cancelled:
+            raise serializers.ValidationError(
+                {"status": "Only a waiting reservation can be cancelled"}
+            )
+
+
+def _date_param(request, name: str = "date") -> datetime.date:
+    value = request.query_params.get(name)
+
+    if not value:
+        return None
+
+    try:
+        return datetime.date.fromisoformat(value)
+    except ValueError:
+        raise serializers.ValidationError(
+            {name: "Date must be in YYYY-MM-DD format"}
+        )
+
+
+def _int_param(request, name: str, default: int = None) -> int:
+    value = request.query_params.get(name)
+
+    if not value:
+        return default
+
+    try:
+        return int(value)
+    except ValueError:
+        raise serializers.ValidationError(
+            {name: "A valid integer is required"}
+        )
+
+
+@extend_schema(
+    parameters=[
+        OpenApiParameter(
+            "date",
+            type=OpenApiTypes.DATE,
+            description="Compute the fees as of this date, "
+            "today by default (ex. ?date=2024-03-01)",
+        ),
+        OpenApiParameter(
+            "user_id",
+            type=OpenApiTypes.INT,
+            description="Fees of another user [ONLY FOR ADMINS] "
+            "(ex. ?user_id=1)",
+        ),
+    ],
+    responses={200: OpenApiTypes.OBJECT},
+)
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def outstanding_fees_view(request):
+    """
+    Outstanding fees of the user: each active overdue borrowing
+    costs its book daily fee for every day past the expected return date.
+    """
+    user_id = request.user.id
+
+    if request.user.is_staff:
+        user_id = _int_param(request, "user_id", user_id)
+
+    as_of = _date_param(request) or datetime.date.today()
+
+    return Response(user_fines(user_id, as_of))
+
+
+@extend_schema(
+    parameters=[
+        OpenApiParameter(
+            "date",
+            type=OpenApiTypes.DATE,
+            description="Report date, today by default (ex. ?date=2024-03-01)",
+        ),
+        OpenApiParameter(
+            "limit",
+            type=OpenApiTypes.INT,
+            description="Number of top users and books to list "
+            "(ex. ?limit=10)",
+        ),
+    ],
+    responses={200: OpenApiTypes.OBJECT},
+)
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def fees_report_view(request):
+    """
+    Library-wide fees report: outstanding fees in total, per user and
+    per book, and the fees charged for the late returns of the day.
+    """
+    limit = min(max(_int_param(request, "limit", 100), 1), 1000)
+
+    as_of = _date_param(request) or datetime.date.today()
+
+    return Response(fines_report(as_of, limit=limit))
+
+
+@extend_schema(
+    parameters=[
+        OpenApiParameter(
+            "type",
+            type=OpenApiTypes.STR,
+            enum=list(CONTENT_TYPES),
+            description="Export format, csv by default (ex. ?type=ndjson)",
+        ),
+        OpenApiParameter(
+            "is_active",
+            type=OpenApiTypes.BOOL,
+            description="Filter by is_active parameter "
+            "(ex. ?is_active=true)",
+        ),
+        OpenApiParameter(
+            "user_id",
+            type=OpenApiTypes.INT,
+            description="Filter by user id (ex. ?user_id=1)",
+        ),
+        OpenApiParameter(
+            "borrowed_from",
+            type=OpenApiTypes.DATE,
+            description="Borrowed on or after this date "
+            "(ex. ?borrowed_from=2024-01-01)",
+        ),
+        OpenApiParameter(
+            "borrowed_to",
+            type=OpenApiTypes.DATE,
+            description="Borrowed on or before this date "
+            "(ex. ?borrowed_to=2024-12-31)",
+        ),
+    ],
+    responses={(200, "text/csv"): OpenApiTypes.STR},
+)
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def export_borrowings_view(request):
+    """
+    Borrowing history export for audits, streamed row by row
+    from a server-side cursor so that it works for any size.
+    """
+    file_format = request.query_params.get("type", CSV)
+
+    if file_format not in CONTENT_TYPES:
+        raise serializers.ValidationError(
+            {"type": f"Type must be one of {', '.join(CONTENT_TYPES)}"}
+        )
+
+    queryset = filter_borrowings(
+        Borrowing.objects.all(), request.user, request.query_params
+    )
+    borrowed_from = _date_param(request, "borrowed_from")
+    borrowed_to = _date_param(request, "borrowed_to")
+
+    if borrowed_from:
+        queryset = queryset.filter(borrow_date__gte=borrowed_from)
+    if borrowed_to:
+        queryset = queryset.filter(borrow_date__lte=borrowed_to)
+
+    response = StreamingHttpResponse(
+        export_lines(queryset, file_format),
+        content_type=CONTENT_TYPES[file_format],
+    )
+    response["Content-Disposition"] = (
+        f'attachment; filename="borrowings.{file_format}"'
+    )
+
+    return response
@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+
+
+class LibraryServiceConfig(AppConfig):
+    name = "library_service"
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        from library_service.db import configure_connection
+
+        connection_created.connect(configure_connection)
@@ -0,0 +1,108 @@
+import hashlib
+
+from django.core.exceptions import ValidationError
+from django.db import connections
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+from library_service.models import TableVersion
+from library_service.versions import has_version_triggers
+
+
+class ConditionalGetMixin:
+    """
+    ETag / Last-Modified support for ``list`` and ``retrieve``.
+
+    The version of the requested data is read with one query, so a
+    "304 Not Modified" reply costs no serialization: the
+    ``updated_at``-like columns listed in ``version_fields`` of an
+    object, and the TableVersion write counters of the tables of
+    ``list_version_models`` (the model of the queryset by default) for
+    a list, which any write to them changes, deletions included,
+    however many rows the list has. Lists don't send Last-Modified,
+    nor an ETag on databases without the counters.
+    """
+
+    version_fields = ("updated_at",)
+    list_version_models = ()
+    # Whether the response depends on the authenticated user
+    vary_on_user = False
+
+    def get_list_version(self):
+        if not has_version_triggers(connections[TableVersion.objects.db]):
+            return None
+
+        models = self.list_version_models or (self.get_queryset().model,)
+        versions = TableVersion.objects.versions(*models)
+        return [str(version) for version in versions], None
+
+    def get_object_version(self):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        lookup = {self.lookup_field: self.kwargs[lookup_url_kwarg]}
+
+        try:
+            row = (
+                self.get_queryset()
+                .filter(**lookup)
+                .values_list(*self.version_fields)
+                .first()
+            )
+        except (TypeError, ValueError, ValidationError):
+            row = None
+
+        if row is None:
+            return None
+
+        return [str(value) for value in row], max(filter(None, row))
+
+    def get_etag(self, request, parts):
+        if self.vary_on_user:
+            parts = [str(request.user.pk), *parts]
+
+        digest = hashlib.md5(
+            "|".join([request.get_full_path(), *parts]).encode()
+        ).hexdigest()
+        return quote_etag(digest)
+
+    def conditional_response(self, request, version, respond):
+        if version is None:
+            return respond()
+
+        parts, last_modified = version
+        etag = self.get_etag(request, parts)
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+
+        response = get_conditional_response(
+            request, etag=etag, last_modified=timestamp
+        )
+
+        if response is None:
+            response = respond()
+
+        if response.status_code in (200, 304):
+            response["ETag"] = etag
+            if timestamp is not None:
+                response["Last-Modified"] = http_date(timestamp)
+
+        if self.vary_on_user:
+            patch_vary_headers(response, ("Authorize",))
+
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            request,
+            self.get_list_version(),
+            lambda: super(ConditionalGetMixin, self).list(
+                request, *args, **kwargs
+            ),
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            request,
+            self.get_object_version(),
+            lambda: super(ConditionalGetMixin, self).retrieve(
+                request, *args, **kwargs
+            ),
+        )
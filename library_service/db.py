@@ -0,0 +1,74 @@
+import functools
+import random
+import time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections
+
+LOCKED_ATTEMPTS = 5
+LOCKED_BACKOFF = 0.05
+LOCKED_MAX_BACKOFF = 1.0
+
+
+def configure_connection(sender, connection, **kwargs):
+    """
+    ``connection_created`` receiver running the SQLITE_PRAGMAS on every
+    new SQLite connection (journal mode, sync level, page cache...).
+    """
+    if connection.vendor != "sqlite":
+        return
+
+    with connection.cursor() as cursor:
+        for pragma, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {pragma} = {value}")
+
+
+def is_locked(error: OperationalError) -> bool:
+    """Whether SQLite gave up waiting for a lock held by another writer."""
+    return "locked" in str(error)
+
+
+def retry_on_locked(
+    func=None,
+    *,
+    attempts: int = LOCKED_ATTEMPTS,
+    backoff: float = LOCKED_BACKOFF,
+    max_backoff: float = LOCKED_MAX_BACKOFF,
+    using: str = DEFAULT_DB_ALIAS,
+):
+    """
+    Run a write transaction again when SQLite reports the database as
+    locked, after an exponential backoff with jitter. ``busy_timeout``
+    makes most writers wait their turn, but a transaction that read
+    before writing cannot wait and fails at once, so it is rolled
+    back and started over.
+
+    Only outermost transactions are retried: inside an atomic block
+    the whole enclosing transaction is rolled back, so the error is
+    left to its owner.
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            delay = backoff
+
+            for attempt in range(1, attempts + 1):
+                try:
+                    return func(*args, **kwargs)
+                except OperationalError as error:
+                    if (
+                        attempt == attempts
+                        or not is_locked(error)
+                        or connections[using].in_atomic_block
+                    ):
+                        raise
+
+                time.sleep(random.uniform(0, delay))
+                delay = min(delay * 2, max_backoff)
+
+        return wrapper
+
+    if func is not None:
+        return decorator(func)
+    return decorator
@@ -0,0 +1,33 @@
+# Generated by Django 5.0.1 on 2026-10-18 18:29
+
+from django.db import migrations, models
+
+from library_service.versions import (
+    create_version_triggers,
+    drop_version_triggers,
+)
+
+
+class Migration(migrations.Migration):
+    initial = True
+
+    dependencies = [
+        ("books_app", "0004_book_stats"),
+        ("borrowings_app", "0007_borrowing_borrow_date_idx"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TableVersion",
+            fields=[
+                (
+                    "name",
+                    models.CharField(
+                        max_length=100, primary_key=True, serialize=False
+                    ),
+                ),
+                ("version", models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(create_version_triggers, drop_version_triggers),
+    ]
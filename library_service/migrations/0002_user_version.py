@@ -0,0 +1,27 @@
+# Generated by Django 5.0.1 on 2026-10-18 18:52
+
+from django.db import migrations
+
+from library_service.versions import (
+    create_version_triggers,
+    drop_version_triggers,
+)
+
+
+def create_user_triggers(apps, schema_editor):
+    create_version_triggers(apps, schema_editor, tables=["users_user"])
+
+
+def drop_user_triggers(apps, schema_editor):
+    drop_version_triggers(apps, schema_editor, tables=["users_user"])
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("library_service", "0001_table_version"),
+        ("users", "0003_user_updated_at"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_user_triggers, drop_user_triggers),
+    ]
@@ -0,0 +1,27 @@
+from django.db import models
+
+
+class TableVersionQuerySet(models.QuerySet):
+    def versions(self, *models_) -> list:
+        """The version of the table of each model, in one query."""
+        tables = [model._meta.db_table for model in models_]
+        versions = dict(
+            self.filter(name__in=tables).values_list("name", "version")
+        )
+        return [versions.get(table, 0) for table in tables]
+
+
+class TableVersion(models.Model):
+    """
+    A counter of the writes to a table, bumped by SQLite triggers in
+    the same transaction as every row inserted, updated or deleted,
+    including bulk, queryset and raw SQL writes that bypass model
+    signals. It versions whole lists (e.g. their ETags) without
+    scanning their rows.
+    """
+
+    # The name of the table
+    name = models.CharField(max_length=100, primary_key=True)
+    version = models.PositiveBigIntegerField(default=0)
+
+    objects = TableVersionQuerySet.as_manager()
@@ -0,0 +1,180 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db.models import Max
+from django.utils.functional import cached_property
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+# Counts up to this number of rows are exact
+ESTIMATE_THRESHOLD = 10000
+# ?count=exact asks for the exact total of a paginated list
+COUNT_QUERY_PARAM = "count"
+EXACT_COUNT = "exact"
+
+COUNT_SCHEMA = {
+    "count": {"type": "integer", "example": 123},
+    "count_exact": {
+        "type": "boolean",
+        "description": "Whether count is exact rather than estimated "
+        "(counts are cached for a minute, ask for a fresh and exact one "
+        "with ?count=exact)",
+    },
+}
+COUNT_PARAMETER = {
+    "name": COUNT_QUERY_PARAM,
+    "required": False,
+    "in": "query",
+    "description": "Set to exact for the exact count of the results",
+    "schema": {"type": "string", "enum": [EXACT_COUNT]},
+}
+
+
+def estimated_count(queryset, threshold: int = ESTIMATE_THRESHOLD) -> int:
+    """
+    The number of rows of ``queryset``, exact below ``threshold`` and
+    estimated beyond, so that it never scans more than that many rows.
+
+    Beyond it, a whole table is estimated by its highest primary key
+    (an index lookup, deleted rows are still counted) and a filtered
+    queryset is capped at ``threshold``.
+    """
+    queryset = queryset.order_by()
+    count = queryset[:threshold].count()
+
+    if count == threshold and not queryset.query.where:
+        highest = queryset.aggregate(highest=Max("pk"))["highest"] or 0
+        return max(highest, threshold)
+
+    return count
+
+
+def cached_count(
+    queryset, exact: bool = False, threshold: int = ESTIMATE_THRESHOLD
+) -> tuple:
+    """
+    ``(count, is_exact)`` of ``queryset``. The count is cached for
+    PAGINATION_COUNT_CACHE_TIMEOUT seconds per query, so it may lag
+    behind the writes of that time, and estimated when it would scan
+    too many rows (see ``estimated_count``), unless ``exact`` is asked.
+    """
+    queryset = queryset.order_by()
+
+    if queryset.query.is_empty():
+        return 0, True
+
+    sql, params = queryset.query.sql_with_params()
+    key = "count:" + hashlib.md5(
+        f"{queryset.db}|{sql}|{params}".encode()
+    ).hexdigest()
+
+    if exact:
+        result = queryset.count(), True
+    else:
+        result = cache.get(key)
+
+        if result is not None:
+            return result
+
+        count = estimated_count(queryset, threshold)
+        result = count, count < threshold
+
+    cache.set(key, result, settings.PAGINATION_COUNT_CACHE_TIMEOUT)
+
+    return result
+
+
+def exact_count_requested(request) -> bool:
+    return request.query_params.get(COUNT_QUERY_PARAM) == EXACT_COUNT
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator of admin changelists over big tables, see above."""
+
+    @cached_property
+    def count(self):
+        return estimated_count(self.object_list)
+
+
+class OptInCursorPagination(CursorPagination):
+    """
+    Keyset pagination that is only used when the client asks for it
+    with ``?page_size=`` or ``?cursor=``, so existing clients keep
+    receiving a plain list.
+
+    Subclasses must order by a unique indexed column, so that every
+    page is a single index range scan no matter how deep it is.
+
+    Pages carry the total ``count`` of the list, cached or estimated
+    (``count_exact`` tells which) unless ``?count=exact`` is given.
+    """
+
+    ordering = "id"
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 500
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if (
+            self.cursor_query_param not in request.query_params
+            and self.page_size_query_param not in request.query_params
+        ):
+            return None
+
+        self.count, self.count_exact = cached_count(
+            queryset, exact=exact_count_requested(request)
+        )
+
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        response.data["count"] = self.count
+        response.data["count_exact"] = self.count_exact
+        return response
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema["properties"].update(COUNT_SCHEMA)
+        return response_schema
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            *super().get_schema_operation_parameters(view),
+            COUNT_PARAMETER,
+        ]
+
+
+class CachedCountPageNumberPagination(PageNumberPagination):
+    """
+    Page number pagination whose total ``count`` is cached or
+    estimated like the one of OptInCursorPagination.
+    """
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.count_exact = exact_count_requested(request)
+        return super().paginate_queryset(queryset, request, view)
+
+    def django_paginator_class(self, object_list, per_page):
+        paginator = Paginator(object_list, per_page)
+        paginator.count, self.count_exact = cached_count(
+            object_list, exact=self.count_exact
+        )
+        return paginator
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        response.data["count_exact"] = self.count_exact
+        return response
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema["properties"].update(COUNT_SCHEMA)
+        return response_schema
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            *super().get_schema_operation_parameters(view),
+            COUNT_PARAMETER,
+        ]
@@ -0,0 +1,140 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+PRIMARY = DEFAULT_DB_ALIAS
+# Methods that may write, their requests read from the primary only
+UNSAFE_METHODS = ("POST", "PUT", "PATCH", "DELETE")
+
+_pinned = ContextVar("pinned_to_primary", default=False)
+_written = ContextVar("written_to_primary", default=False)
+
+
+def pin_to_primary():
+    """Send the reads of the current request (or context) to the primary."""
+    _pinned.set(True)
+
+
+def is_pinned() -> bool:
+    return _pinned.get()
+
+
+@contextmanager
+def pinned_to_primary(pinned: bool = True):
+    """Pin (or unpin) reads to the primary inside the block."""
+    token = _pinned.set(pinned)
+    try:
+        yield
+    finally:
+        _pinned.reset(token)
+
+
+def has_written() -> bool:
+    """Whether a write was routed to the primary in ``tracking_writes``."""
+    return _written.get()
+
+
+@contextmanager
+def tracking_writes():
+    """Start a block in which ``has_written`` tells whether it wrote."""
+    token = _written.set(False)
+    try:
+        yield
+    finally:
+        _written.reset(token)
+
+
+class PrimaryReplicaRouter:
+    """
+    Send writes to the primary (``default``) and reads to a random one
+    of the DATABASE_REPLICAS, unless they must see the latest data:
+
+    - after a write, the rest of the request reads from the primary too
+      (read-your-writes), and so do the requests that may write and the
+      following ones of the same client (see ``PrimaryPinningMiddleware``);
+    - reads inside a transaction on the primary stay on it.
+
+    Replicas are kept up to date by the database, out of Django, and
+    may lag behind the primary. Without replicas everything goes to
+    the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        replicas = settings.DATABASE_REPLICAS
+
+        if (
+            not replicas
+            or is_pinned()
+            or connections[PRIMARY].in_atomic_block
+        ):
+            return PRIMARY
+
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        pin_to_primary()
+        _written.set(True)
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        return True
+
+
+class PrimaryPinningMiddleware:
+    """
+    Start every request unpinned and keep a pin set by a write from
+    leaking into the next request served by the same thread.
+
+    Requests that may write read from the primary, and so do the
+    requests of a client for DATABASE_REPLICA_LAG seconds after one of
+    its requests wrote (a cookie marks it), so that the client sees its
+    own writes even on a lagging replica. Only a request that wrote
+    sets the cookie: one pinned by its method or by the cookie alone
+    doesn't extend it.
+    """
+
+    sync_capable = True
+    async_capable = True
+    cookie_name = "primary_pinned"
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        with pinned_to_primary(self.must_pin(request)), tracking_writes():
+            response = self.get_response(request)
+            return self.process_response(response)
+
+    async def __acall__(self, request):
+        with pinned_to_primary(self.must_pin(request)), tracking_writes():
+            response = await self.get_response(request)
+            return self.process_response(response)
+
+    def must_pin(self, request) -> bool:
+        return (
+            request.method in UNSAFE_METHODS
+            or self.cookie_name in request.COOKIES
+        )
+
+    def process_response(self, response):
+        if settings.DATABASE_REPLICAS and has_written():
+            response.set_cookie(
+                self.cookie_name,
+                "1",
+                max_age=settings.DATABASE_REPLICA_LAG,
+                httponly=True,
+                samesite="Lax",
+            )
+
+        return response
@@ -12,6 +12,8 @@ https://docs.djangoproject.com/en/5.0/ref/settings/
 import os
 from datetime import timedelta
 from pathlib import Path
+
+from celery.schedules import crontab
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -48,10 +50,13 @@ INSTALLED_APPS = [
     "books_app",
     "users",
     "borrowings_app",
+    "notifications_app",
+    "library_service",
 ]
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "library_service.routers.PrimaryPinningMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -90,6 +95,84 @@ DATABASES = {
     }
 }
 
+# Production mode for SQLite under concurrent writers: readers don't
+# block the writer in WAL mode, commits sync once per checkpoint
+# instead of once per transaction, and a writer waits up to
+# busy_timeout milliseconds for the lock instead of failing at once.
+# Connections are kept open between requests and checked before reuse.
+DATABASE_PRODUCTION_MODE = (
+    os.getenv("DATABASE_PRODUCTION_MODE", "false").lower() == "true"
+)
+
+SQLITE_PRAGMAS = {}
+
+if DATABASE_PRODUCTION_MODE:
+    DATABASES["default"].update(
+        {
+            "CONN_MAX_AGE": int(os.getenv("DATABASE_CONN_MAX_AGE", 600)),
+            "CONN_HEALTH_CHECKS": True,
+        }
+    )
+    SQLITE_PRAGMAS = {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        # Negative sizes are in KiB: 64 MiB of page cache
+        "cache_size": -64000,
+        "mmap_size": 268435456,
+        "busy_timeout": 5000,
+        "temp_store": "MEMORY",
+    }
+
+# Read replicas: comma-separated SQLite files relative to BASE_DIR,
+# e.g. DATABASE_REPLICAS=replica.sqlite3 with a copy of db.sqlite3 as a
+# local stand-in. Reads go to the replicas and writes to the primary,
+# see library_service.routers. Clients read from the primary for
+# DATABASE_REPLICA_LAG seconds after a write.
+DATABASE_REPLICAS = []
+
+for number, name in enumerate(
+    filter(None, os.getenv("DATABASE_REPLICAS", "").split(",")), start=1
+):
+    alias = f"replica_{number}"
+    DATABASES[alias] = {
+        **DATABASES["default"],
+        "NAME": BASE_DIR / name.strip(),
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_REPLICA_LAG = int(os.getenv("DATABASE_REPLICA_LAG", 5))
+
+DATABASE_ROUTERS = ["library_service.routers.PrimaryReplicaRouter"]
+
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+
+# The book cache is kept in process memory (least recently used
+# entries are evicted past MAX_ENTRIES) unless a Redis URL is given.
+# Redis evicts by its own maxmemory-policy, e.g. allkeys-lru.
+BOOK_CACHE_URL = os.getenv("BOOK_CACHE_URL")
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "books": (
+        {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": BOOK_CACHE_URL,
+            "TIMEOUT": 300,
+        }
+        if BOOK_CACHE_URL
+        else {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "books",
+            "TIMEOUT": 300,
+            "OPTIONS": {"MAX_ENTRIES": 10000},
+        }
+    ),
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
@@ -137,7 +220,7 @@ AUTH_USER_MODEL = "users.User"
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "users.authentication.ClaimsJWTAuthentication",
     ),
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
 }
@@ -147,11 +230,40 @@ SIMPLE_JWT = {
     "REFRESH_TOKEN_LIFETIME": timedelta(days=3),
     "ROTATE_REFRESH_TOKENS": True,
     "AUTH_HEADER_NAME": "HTTP_AUTHORIZE",
+    "TOKEN_OBTAIN_SERIALIZER": (
+        "users.serializers.ClaimsTokenObtainPairSerializer"
+    ),
+    "TOKEN_REFRESH_SERIALIZER": (
+        "users.serializers.ClaimsTokenRefreshSerializer"
+    ),
 }
 
+# Seconds the token state and the full user are cached for by
+# ClaimsJWTAuthentication
+AUTH_USER_CACHE_TIMEOUT = 60
+
 SPECTACULAR_SETTINGS = {
     "TITLE": "Library Service API",
     "DESCRIPTION": "A service for tracking books, borrowings, users",
     "VERSION": "1.0.0",
     "SERVE_INCLUDE_SCHEMA": False,
 }
+
+CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0")
+# Run tasks in-process, without a broker or a worker (for local runs)
+CELERY_TASK_ALWAYS_EAGER = (
+    os.getenv("CELERY_TASK_ALWAYS_EAGER", "false").lower() == "true"
+)
+CELERY_BEAT_SCHEDULE = {
+    "sweep-overdue-borrowings": {
+        "task": "borrowings_app.tasks.sweep_overdue_borrowings",
+        "schedule": crontab(hour=8, minute=0),
+    },
+}
+
+# Seconds the computed overdue fines are cached for
+FINES_CACHE_TIMEOUT = 300
+
+# Seconds the totals of paginated lists are cached for, unless a
+# client asks for the exact count with ?count=exact
+PAGINATION_COUNT_CACHE_TIMEOUT = 60
@@ -0,0 +1,31 @@
+from contextlib import contextmanager
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryBudgetMixin:
+    """
+    TestCase mixin to keep the number of SQL queries of a code path
+    within a budget. Unlike ``assertNumQueries`` it allows fewer
+    queries than budgeted and lists every executed query on failure,
+    which makes it easy to spot the one that runs per row.
+    """
+
+    @contextmanager
+    def assertMaxQueries(self, budget: int, using: str = DEFAULT_DB_ALIAS):
+        with CaptureQueriesContext(connections[using]) as context:
+            yield context
+
+        executed = len(context.captured_queries)
+        if executed > budget:
+            queries = "\n".join(
+                f"{number}. {query['sql']}"
+                for number, query in enumerate(
+                    context.captured_queries, start=1
+                )
+            )
+            self.fail(
+                f"{executed} queries executed, the budget is {budget}:\n"
+                f"{queries}"
+            )
@@ -0,0 +1,98 @@
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.db import connection, OperationalError, transaction
+from django.test import (
+    override_settings,
+    SimpleTestCase,
+    TransactionTestCase,
+)
+
+from library_service.db import retry_on_locked
+
+PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -1000,
+    "busy_timeout": 1234,
+}
+
+
+@override_settings(SQLITE_PRAGMAS=PRAGMAS)
+class ConfigureConnectionTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+
+        self.connection = connection.copy()
+        self.connection.settings_dict["NAME"] = str(
+            Path(directory.name) / "db.sqlite3"
+        )
+        self.addCleanup(self.connection.close)
+
+    def pragma(self, name):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"PRAGMA {name}")
+            return cursor.fetchone()[0]
+
+    def test_pragmas_set_on_connect(self):
+        self.assertEqual(self.pragma("journal_mode"), "wal")
+        # NORMAL
+        self.assertEqual(self.pragma("synchronous"), 1)
+        self.assertEqual(self.pragma("cache_size"), -1000)
+        self.assertEqual(self.pragma("busy_timeout"), 1234)
+
+    @override_settings(SQLITE_PRAGMAS={})
+    def test_defaults_without_pragmas(self):
+        self.assertEqual(self.pragma("journal_mode"), "delete")
+
+
+@mock.patch("library_service.db.time.sleep")
+class RetryOnLockedTests(TransactionTestCase):
+    def flaky(self, errors):
+        calls = []
+
+        @retry_on_locked(attempts=3)
+        def write():
+            calls.append(1)
+            if len(calls) <= len(errors):
+                raise errors[len(calls) - 1]
+            return "written"
+
+        return write, calls
+
+    def test_retried_until_it_succeeds(self, sleep):
+        write, calls = self.flaky(
+            [
+                OperationalError("database is locked"),
+                OperationalError("database table is locked"),
+            ]
+        )
+
+        self.assertEqual(write(), "written")
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(sleep.call_count, 2)
+
+    def test_gives_up_after_attempts(self, sleep):
+        write, calls = self.flaky(
+            [OperationalError("database is locked")] * 3
+        )
+
+        with self.assertRaises(OperationalError):
+            write()
+        self.assertEqual(len(calls), 3)
+
+    def test_other_errors_not_retried(self, sleep):
+        write, calls = self.flaky([OperationalError("no such table: book")])
+
+        with self.assertRaises(OperationalError):
+            write()
+        self.assertEqual(len(calls), 1)
+
+    def test_not_retried_inside_a_transaction(self, sleep):
+        write, calls = self.flaky([OperationalError("database is locked")])
+
+        with transaction.atomic(), self.assertRaises(OperationalError):
+            write()
+        self.assertEqual(len(calls), 1)
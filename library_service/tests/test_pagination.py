@@ -0,0 +1,122 @@
+from datetime import date
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from books_app.models import Book
+from borrowings_app.models import Borrowing
+from library_service.pagination import cached_count
+
+BOOK_URL = reverse("books_app:book-list")
+BORROWINGS_LIST_URL = reverse("borrowings_app:borrowing-list")
+
+
+def sample_book(title="Lorem ipsum"):
+    return Book.objects.create(
+        title=title,
+        author="John Connor",
+        cover=Book.HARD,
+        inventory=5,
+        daily_fee=9.99,
+    )
+
+
+class CachedCountTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com", "test12345"
+        )
+        self.client.force_authenticate(self.user)
+
+        for i in range(3):
+            sample_book(f"Volume {i}")
+
+    def test_count_is_cached(self):
+        books = Book.objects.all()
+
+        self.assertEqual(cached_count(books), (3, True))
+        sample_book()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(cached_count(books), (3, True))
+
+        self.assertEqual(cached_count(books, exact=True), (4, True))
+        # The exact count replaces the cached one
+        self.assertEqual(cached_count(books), (4, True))
+
+    def test_counts_are_cached_per_query(self):
+        self.assertEqual(cached_count(Book.objects.all()), (3, True))
+        self.assertEqual(
+            cached_count(Book.objects.filter(title="Volume 1")), (1, True)
+        )
+
+    def test_big_counts_are_estimated(self):
+        count, exact = cached_count(Book.objects.all(), threshold=2)
+
+        self.assertFalse(exact)
+        self.assertGreaterEqual(count, 2)
+
+    def test_book_list_count(self):
+        res = self.client.get(BOOK_URL, {"page_size": 2})
+
+        self.assertEqual(res.data["count"], 3)
+        self.assertTrue(res.data["count_exact"])
+
+        sample_book()
+        res = self.client.get(BOOK_URL, {"page_size": 2})
+        self.assertEqual(res.data["count"], 3)
+
+        res = self.client.get(BOOK_URL, {"page_size": 2, "count": "exact"})
+        self.assertEqual(res.data["count"], 4)
+
+    def test_search_count(self):
+        res = self.client.get(BOOK_URL, {"search": "volume"})
+
+        self.assertEqual(res.data["count"], 3)
+        self.assertTrue(res.data["count_exact"])
+
+        sample_book("Volume 3")
+        res = self.client.get(
+            BOOK_URL, {"search": "volume", "count": "exact"}
+        )
+        self.assertEqual(res.data["count"], 4)
+
+    def test_page_runs_no_full_count(self):
+        # Table version, capped count and page
+        with self.assertNumQueries(3) as queries:
+            self.client.get(BORROWINGS_LIST_URL, {"page_size": 1})
+
+        counts = [
+            query["sql"]
+            for query in queries.captured_queries
+            if "COUNT(" in query["sql"]
+        ]
+        self.assertEqual(len(counts), 1)
+        self.assertIn("LIMIT 10000", counts[0])
+
+        # Table version and page, the count is cached
+        with self.assertNumQueries(2) as queries:
+            self.client.get(BORROWINGS_LIST_URL, {"page_size": 1})
+
+        for query in queries.captured_queries:
+            self.assertNotIn("COUNT(", query["sql"])
+
+    def test_borrowing_list_count(self):
+        book = Book.objects.first()
+        for _ in range(2):
+            Borrowing.objects.create(
+                borrow_date=date.today(),
+                expected_return_date=date.today(),
+                book=book,
+                user=self.user,
+            )
+
+        res = self.client.get(BORROWINGS_LIST_URL, {"page_size": 1})
+
+        self.assertEqual(res.data["count"], 2)
+        self.assertEqual(len(res.data["results"]), 1)
@@ -0,0 +1,129 @@
+from unittest import mock
+
+from django.db import connections
+from django.http import HttpResponse
+from django.test import override_settings, RequestFactory, SimpleTestCase
+
+from books_app.models import Book
+from library_service.routers import (
+    is_pinned,
+    pinned_to_primary,
+    PrimaryPinningMiddleware,
+    PrimaryReplicaRouter,
+)
+
+REPLICAS = ["replica_1", "replica_2"]
+
+
+@override_settings(DATABASE_REPLICAS=REPLICAS)
+class PrimaryReplicaRouterTests(SimpleTestCase):
+    def setUp(self):
+        self.router = PrimaryReplicaRouter()
+
+    def read(self):
+        return self.router.db_for_read(Book)
+
+    def test_reads_go_to_replicas(self):
+        with pinned_to_primary(False):
+            self.assertIn(self.read(), REPLICAS)
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_reads_go_to_primary_without_replicas(self):
+        with pinned_to_primary(False):
+            self.assertEqual(self.read(), "default")
+
+    def test_write_pins_reads_to_primary(self):
+        with pinned_to_primary(False):
+            self.assertEqual(self.router.db_for_write(Book), "default")
+
+            self.assertTrue(is_pinned())
+            self.assertEqual(self.read(), "default")
+
+    def test_pin_restored_after_block(self):
+        with pinned_to_primary(False):
+            with pinned_to_primary():
+                self.router.db_for_write(Book)
+
+            self.assertFalse(is_pinned())
+
+    def test_reads_in_transaction_go_to_primary(self):
+        with pinned_to_primary(False), mock.patch.object(
+            connections["default"], "in_atomic_block", True
+        ):
+            self.assertEqual(self.read(), "default")
+
+
+@override_settings(DATABASE_REPLICAS=REPLICAS, DATABASE_REPLICA_LAG=5)
+class PrimaryPinningMiddlewareTests(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.router = PrimaryReplicaRouter()
+        self.reads = []
+
+    def view(self, request):
+        self.reads.append(self.router.db_for_read(Book))
+
+        if "write" in request.GET:
+            self.router.db_for_write(Book)
+            self.reads.append(self.router.db_for_read(Book))
+
+        return HttpResponse()
+
+    def call(self, request):
+        with pinned_to_primary(False):
+            response = PrimaryPinningMiddleware(self.view)(request)
+            self.assertFalse(is_pinned())
+        return response
+
+    def test_safe_request_reads_from_replica(self):
+        res = self.call(self.factory.get("/"))
+
+        self.assertIn(self.reads[0], REPLICAS)
+        self.assertNotIn(PrimaryPinningMiddleware.cookie_name, res.cookies)
+
+    def test_unsafe_request_reads_from_primary(self):
+        res = self.call(self.factory.post("/"))
+
+        self.assertEqual(self.reads, ["default"])
+        # Nothing was written
+        self.assertNotIn(PrimaryPinningMiddleware.cookie_name, res.cookies)
+
+        res = self.call(self.factory.post("/?write=1"))
+
+        cookie = res.cookies[PrimaryPinningMiddleware.cookie_name]
+        self.assertEqual(cookie["max-age"], 5)
+
+    def test_reads_after_write_go_to_primary(self):
+        res = self.call(self.factory.get("/", {"write": 1}))
+
+        self.assertIn(self.reads[0], REPLICAS)
+        self.assertEqual(self.reads[1], "default")
+        self.assertIn(PrimaryPinningMiddleware.cookie_name, res.cookies)
+
+    def test_client_reads_from_primary_after_its_write(self):
+        request = self.factory.get("/")
+        request.COOKIES[PrimaryPinningMiddleware.cookie_name] = "1"
+
+        res = self.call(request)
+
+        self.assertEqual(self.reads, ["default"])
+        # The pin expires DATABASE_REPLICA_LAG seconds after the write
+        self.assertNotIn(PrimaryPinningMiddleware.cookie_name, res.cookies)
+
+    async def test_async_request(self):
+        async def view(request):
+            return self.view(request)
+
+        middleware = PrimaryPinningMiddleware(view)
+
+        with pinned_to_primary(False):
+            res = await middleware(self.factory.get("/"))
+            self.assertNotIn(PrimaryPinningMiddleware.cookie_name, res.cookies)
+
+            res = await middleware(self.factory.get("/", {"write": 1}))
+            self.assertIn(PrimaryPinningMiddleware.cookie_name, res.cookies)
+            self.assertFalse(is_pinned())
+
+        self.assertIn(self.reads[0], REPLICAS)
+        self.assertIn(self.reads[1], REPLICAS)
+        self.assertEqual(self.reads[2], "default")
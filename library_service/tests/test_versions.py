@@ -0,0 +1,67 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+
+from books_app.models import Book
+from library_service.models import TableVersion
+
+
+def sample_book(title="Sample"):
+    return Book.objects.create(
+        title=title,
+        author="Somebody",
+        cover=Book.HARD,
+        inventory=10,
+        daily_fee=1,
+    )
+
+
+class TableVersionTests(TestCase):
+    def version(self):
+        (version,) = TableVersion.objects.versions(Book)
+        return version
+
+    def assertBumped(self, write):
+        version = self.version()
+        write()
+        self.assertGreater(self.version(), version)
+
+    def test_writes_bump_the_version(self):
+        book = sample_book()
+
+        self.assertBumped(lambda: sample_book("Other"))
+        self.assertBumped(lambda: Book.objects.checkout_copy(book.id))
+        self.assertBumped(lambda: Book.objects.filter(pk=book.pk).delete())
+
+    def test_raw_writes_bump_the_version(self):
+        book = sample_book()
+
+        def raw_update():
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "UPDATE books_app_book SET inventory = 0 WHERE id = %s",
+                    [book.id],
+                )
+
+        self.assertBumped(raw_update)
+
+    def test_user_writes_bump_the_version(self):
+        user = get_user_model().objects.create_user(
+            "reader@test.com", "test12345"
+        )
+        (version,) = TableVersion.objects.versions(get_user_model())
+
+        user.first_name = "Renamed"
+        user.save()
+
+        self.assertEqual(
+            TableVersion.objects.versions(get_user_model()), [version + 1]
+        )
+
+    def test_versions_of_several_tables(self):
+        sample_book()
+
+        with self.assertNumQueries(1):
+            versions = TableVersion.objects.versions(Book, TableVersion)
+
+        self.assertEqual(versions, [self.version(), 0])
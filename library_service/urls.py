@@ -16,6 +16,7 @@ urlpatterns = [
         ),
     ),
     path("api/borrowings/", include("borrowings_app.urls")),
+    path("api/async/borrowings/", include("borrowings_app.async_urls")),
     path("api/schema/", SpectacularAPIView.as_view(), name="schema"),
     path(
         "api/schema/swagger-ui/",
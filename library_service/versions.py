@@ -0,0 +1,51 @@
+# Tables whose writes are counted in TableVersion, by triggers
+VERSIONED_TABLES = ("books_app_book", "borrowings_app_borrowing", "users_user")
+VERSION_TABLE = "library_service_tableversion"
+
+
+def has_version_triggers(connection) -> bool:
+    """
+    Whether the tables of ``connection`` count their writes: only
+    SQLite ones do, the TableVersion rows never change on others.
+    """
+    return connection.vendor == "sqlite"
+
+
+def _trigger_statements(table: str) -> list:
+    bump = f"""
+        INSERT INTO {VERSION_TABLE} (name, version)
+        VALUES ('{table}', 1)
+        ON CONFLICT (name) DO UPDATE SET version = version + 1;
+    """
+    return [
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {table}_version_{event.lower()}
+        AFTER {event} ON {table} BEGIN {bump} END
+        """
+        for event in ("INSERT", "UPDATE", "DELETE")
+    ]
+
+
+def create_version_triggers(apps, schema_editor, tables=VERSIONED_TABLES):
+    """
+    Migration operation creating the version triggers. SQLite drops
+    the triggers whenever a migration rebuilds a table, so such
+    migrations must run it again afterwards.
+    """
+    if not has_version_triggers(schema_editor.connection):
+        return
+
+    for table in tables:
+        for statement in _trigger_statements(table):
+            schema_editor.execute(statement)
+
+
+def drop_version_triggers(apps, schema_editor, tables=VERSIONED_TABLES):
+    if not has_version_triggers(schema_editor.connection):
+        return
+
+    for table in tables:
+        for event in ("insert", "update", "delete"):
+            schema_editor.execute(
+                f"DROP TRIGGER IF EXISTS {table}_version_{event}"
+            )
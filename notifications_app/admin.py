@@ -0,0 +1,10 @@
+from django.contrib import admin
+
+from notifications_app.models import Notification
+
+
+@admin.register(Notification)
+class NotificationAdmin(admin.ModelAdmin):
+    list_display = ("id", "chat_id", "status", "attempts", "created_at")
+    list_filter = ("status",)
+    readonly_fields = ("created_at", "sent_at")
@@ -0,0 +1,319 @@
+import asyncio
+import logging
+import random
+import time
+import uuid
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils import timezone
+from telegram.error import BadRequest, Forbidden, RetryAfter
+
+from library_service.routers import pinned_to_primary
+from notifications_app.models import Notification
+from telegram_helper import (
+    close_telegram_helpers,
+    DIGEST_SEPARATOR,
+    get_telegram_helper,
+    split_digests,
+)
+
+logger = logging.getLogger(__name__)
+
+# Errors that will not go away by retrying the same message
+PERMANENT_ERRORS = (BadRequest, Forbidden)
+
+
+class CircuitBreaker:
+    """
+    Stops calling a failing service for a while.
+
+    After ``failure_threshold`` consecutive failures the breaker opens
+    and rejects calls for ``reset_timeout`` seconds. Then a single trial
+    call is let through: success closes the breaker, failure opens it
+    again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 60.0,
+        clock=time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = None
+
+    def allow(self) -> bool:
+        if self.state == self.OPEN:
+            if self.clock() - self.opened_at < self.reset_timeout:
+                return False
+            self.state = self.HALF_OPEN
+        return True
+
+    def remaining(self) -> float:
+        if self.state != self.OPEN:
+            return 0.0
+        return max(0.0, self.reset_timeout - (self.clock() - self.opened_at))
+
+    def record_success(self):
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self):
+        self.failures += 1
+        if (
+            self.state == self.HALF_OPEN
+            or self.failures >= self.failure_threshold
+        ):
+            self.state = self.OPEN
+            self.opened_at = self.clock()
+
+
+class Dispatcher:
+    """
+    Drains the notification outbox in batches.
+
+    Each pending notification is sent with ``send(chat_id, text)``.
+    Failures are retried with exponential backoff and jitter until
+    ``max_attempts`` is reached, after which the notification is
+    marked as failed. A circuit breaker stops hammering Telegram
+    while it is down.
+
+    In digest mode (``digest_max_events`` is set) the notifications
+    of a chat are held back until ``digest_max_events`` of them are
+    pending or the oldest one waited ``digest_interval`` seconds,
+    and are then delivered as a single merged message.
+
+    Several dispatchers may drain the same outbox: a batch is claimed
+    with a conditional UPDATE that leases its notifications for
+    ``lease`` seconds, so that no other dispatcher fetches them in the
+    meantime. The notifications of a dispatcher that dies are sent
+    again when their lease expires.
+    """
+
+    def __init__(
+        self,
+        send=None,
+        batch_size: int = 100,
+        max_attempts: int = 8,
+        backoff_base: float = 2.0,
+        backoff_max: float = 3600.0,
+        breaker: CircuitBreaker = None,
+        digest_max_events: int = None,
+        digest_interval: float = 0.0,
+        lease: float = 300.0,
+    ):
+        self.send = send or self._telegram_send
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker or CircuitBreaker()
+        self.digest_max_events = digest_max_events
+        self.digest_interval = digest_interval
+        self.lease = lease
+
+    @staticmethod
+    async def _telegram_send(chat_id, text):
+        helper = get_telegram_helper(
+            token=settings.TELEGRAM_BOT_TOKEN,
+            chat_id=settings.TELEGRAM_CHAT_ID,
+        )
+        await helper.send_message(text, chat_id=chat_id)
+
+    def backoff(self, attempts: int) -> float:
+        delay = min(self.backoff_max, self.backoff_base * 2 ** (attempts - 1))
+        return delay * random.uniform(0.5, 1.0)
+
+    def fetch_batch(self):
+        """
+        Claim up to ``batch_size`` due notifications. The ones another
+        dispatcher claimed first are left out.
+        """
+        now = timezone.now()
+        claim = uuid.uuid4()
+        due = Notification.objects.filter(
+            status=Notification.PENDING, next_attempt_at__lte=now
+        )
+
+        # A replica may still list notifications that were sent
+        with pinned_to_primary():
+            ids = list(
+                due.order_by("next_attempt_at", "id").values_list(
+                    "id", flat=True
+                )[: self.batch_size]
+            )
+            if not ids:
+                return []
+
+            due.filter(id__in=ids).update(
+                claim=claim,
+                next_attempt_at=now + timedelta(seconds=self.lease),
+            )
+            claimed = Notification.objects.filter(
+                id__in=ids, claim=claim
+            ).in_bulk()
+
+        return [claimed[id_] for id_ in ids if id_ in claimed]
+
+    @staticmethod
+    def release(ids):
+        """Make claimed notifications that weren't attempted due again."""
+        Notification.objects.filter(
+            id__in=ids, status=Notification.PENDING
+        ).update(next_attempt_at=timezone.now())
+
+    @staticmethod
+    def mark_sent(ids):
+        Notification.objects.filter(id__in=ids).update(
+            status=Notification.SENT,
+            sent_at=timezone.now(),
+            last_error="",
+        )
+
+    def mark_failed(
+        self, notifications, error, permanent=False, retry_after=None
+    ):
+        for notification in notifications:
+            attempts = notification.attempts + 1
+            fields = {"attempts": attempts, "last_error": repr(error)[:1000]}
+
+            if permanent or attempts >= self.max_attempts:
+                fields["status"] = Notification.FAILED
+            else:
+                delay = retry_after or self.backoff(attempts)
+                fields["next_attempt_at"] = timezone.now() + timedelta(
+                    seconds=delay
+                )
+
+            Notification.objects.filter(id=notification.id).update(**fields)
+
+    def group(self, batch):
+        """
+        Split a batch into ``(chat_id, notifications)`` deliveries.
+        Without digest mode every notification is delivered on its own.
+        """
+        if not self.digest_max_events:
+            return [(n.chat_id, [n]) for n in batch]
+
+        per_chat = {}
+        for notification in batch:
+            per_chat.setdefault(notification.chat_id, []).append(notification)
+
+        deadline = timezone.now() - timedelta(seconds=self.digest_interval)
+        deliveries = []
+
+        for chat_id, notifications in per_chat.items():
+            if (
+                len(notifications) < self.digest_max_events
+                and notifications[0].created_at > deadline
+            ):
+                # Wait for more events to merge into this digest
+                continue
+
+            for start in range(
+                0, len(notifications), self.digest_max_events
+            ):
+                deliveries.append(
+                    (
+                        chat_id,
+                        notifications[start: start + self.digest_max_events],
+                    )
+                )
+
+        return deliveries
+
+    async def deliver(self, chat_id, notifications) -> list:
+        """
+        Send the notifications of a chat as digests and return the ones
+        that were sent. When a digest fails, only the notifications of
+        it and of the following ones are marked as failed, those of the
+        digests already sent are not sent again.
+        """
+        sent = 0
+
+        try:
+            for group in split_digests([n.text for n in notifications]):
+                await self.send(chat_id, DIGEST_SEPARATOR.join(group))
+                sent += len(group)
+        except PERMANENT_ERRORS as error:
+            logger.warning("Dropping notifications to %s: %r", chat_id, error)
+            await sync_to_async(self.mark_failed)(
+                notifications[sent:], error, permanent=True
+            )
+        except RetryAfter as error:
+            self.breaker.record_failure()
+            await sync_to_async(self.mark_failed)(
+                notifications[sent:], error, retry_after=error.retry_after
+            )
+        except Exception as error:
+            logger.warning("Failed to send to %s: %r", chat_id, error)
+            self.breaker.record_failure()
+            await sync_to_async(self.mark_failed)(
+                notifications[sent:], error
+            )
+        else:
+            self.breaker.record_success()
+
+        return notifications[:sent]
+
+    async def dispatch_batch(self) -> int:
+        """
+        Send one batch of due notifications.
+        Return the number of notifications that were attempted.
+        """
+        if not self.breaker.allow():
+            return 0
+
+        batch = await sync_to_async(self.fetch_batch)()
+        unattempted = {n.id for n in batch}
+        sent_ids = []
+        attempted = 0
+
+        for chat_id, notifications in self.group(batch):
+            if not self.breaker.allow():
+                break
+
+            attempted += len(notifications)
+            unattempted.difference_update(n.id for n in notifications)
+            sent = await self.deliver(chat_id, notifications)
+            sent_ids.extend(n.id for n in sent)
+
+        if sent_ids:
+            await sync_to_async(self.mark_sent)(sent_ids)
+        if unattempted:
+            # Held back for a digest or stopped by the breaker
+            await sync_to_async(self.release)(list(unattempted))
+
+        return attempted
+
+    async def run(self, once: bool = False, idle_interval: float = 1.0):
+        """
+        Keep draining the outbox. With ``once`` stop as soon as
+        there is nothing left to send right now.
+        """
+        try:
+            while True:
+                attempted = await self.dispatch_batch()
+
+                if attempted:
+                    continue
+                if once:
+                    return
+
+                await asyncio.sleep(
+                    max(idle_interval, self.breaker.remaining())
+                )
+        finally:
+            if self.send == self._telegram_send:
+                await close_telegram_helpers()
@@ -0,0 +1,72 @@
+from asgiref.sync import async_to_sync
+from django.core.management.base import BaseCommand
+
+from notifications_app.dispatcher import CircuitBreaker, Dispatcher
+
+
+class Command(BaseCommand):
+    help = "Deliver pending notifications from the outbox to Telegram"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit when there is nothing left to send",
+        )
+        parser.add_argument("--batch-size", type=int, default=100)
+        parser.add_argument("--max-attempts", type=int, default=8)
+        parser.add_argument(
+            "--idle-interval",
+            type=float,
+            default=1.0,
+            help="Seconds to sleep when the outbox is empty",
+        )
+        parser.add_argument(
+            "--failure-threshold",
+            type=int,
+            default=5,
+            help="Consecutive failures that open the circuit breaker",
+        )
+        parser.add_argument(
+            "--reset-timeout",
+            type=float,
+            default=60.0,
+            help="Seconds the circuit breaker stays open",
+        )
+        parser.add_argument(
+            "--digest-max-events",
+            type=int,
+            default=None,
+            help="Merge up to this many notifications per chat "
+            "into a single digest message",
+        )
+        parser.add_argument(
+            "--digest-interval",
+            type=float,
+            default=30.0,
+            help="Seconds a notification may wait for a digest",
+        )
+        parser.add_argument(
+            "--lease",
+            type=float,
+            default=300.0,
+            help="Seconds a fetched batch is hidden from other "
+            "dispatchers, longer than sending it takes",
+        )
+
+    def handle(self, *args, **options):
+        dispatcher = Dispatcher(
+            batch_size=options["batch_size"],
+            max_attempts=options["max_attempts"],
+            breaker=CircuitBreaker(
+                failure_threshold=options["failure_threshold"],
+                reset_timeout=options["reset_timeout"],
+            ),
+            digest_max_events=options["digest_max_events"],
+            digest_interval=options["digest_interval"],
+            lease=options["lease"],
+        )
+        async_to_sync(dispatcher.run)(
+            once=options["once"],
+            idle_interval=options["idle_interval"],
+        )
@@ -0,0 +1,17 @@
+# Generated by Django 5.0.1 on 2026-10-18 18:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("notifications_app", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="notification",
+            name="claim",
+            field=models.UUIDField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,67 @@
+from django.conf import settings
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+
+
+class NotificationManager(models.Manager):
+    """Manager for the notification outbox."""
+
+    def enqueue(self, text, chat_id=None):
+        """
+        Store a notification to be delivered by the dispatcher.
+        Call it inside the transaction that writes the related rows,
+        so that the message exists if and only if they do.
+        """
+        return self.create(
+            chat_id=chat_id or settings.TELEGRAM_CHAT_ID or "",
+            text=text,
+        )
+
+    def enqueue_many(self, texts, chat_id=None):
+        """Store several notifications with a single INSERT."""
+        chat_id = chat_id or settings.TELEGRAM_CHAT_ID or ""
+        return self.bulk_create(
+            [self.model(chat_id=chat_id, text=text) for text in texts]
+        )
+
+
+class Notification(models.Model):
+    PENDING = "PENDING"
+    SENT = "SENT"
+    FAILED = "FAILED"
+
+    STATUS_CHOICES = [
+        (PENDING, "Pending"),
+        (SENT, "Sent"),
+        (FAILED, "Failed"),
+    ]
+
+    chat_id = models.CharField(max_length=64)
+    text = models.TextField()
+    status = models.CharField(
+        max_length=7,
+        choices=STATUS_CHOICES,
+        default=PENDING,
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    # Token of the dispatcher batch that last claimed the notification
+    claim = models.UUIDField(null=True, blank=True, editable=False)
+
+    objects = NotificationManager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["next_attempt_at", "id"],
+                condition=Q(status="PENDING"),
+                name="notification_pending_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"Notification #{self.id} to {self.chat_id} ({self.status})"
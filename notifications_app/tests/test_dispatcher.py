@@ -0,0 +1,147 @@
+from datetime import timedelta
+
+from asgiref.sync import async_to_sync
+from django.test import TestCase
+from django.utils import timezone
+
+from notifications_app.dispatcher import CircuitBreaker, Dispatcher
+from notifications_app.models import Notification
+
+
+class FakeSender:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.sent = []
+
+    async def __call__(self, chat_id, text):
+        if self.fail:
+            raise ConnectionError("Telegram is down")
+        self.sent.append((chat_id, text))
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class NotificationOutboxTest(TestCase):
+    def test_enqueue_uses_default_chat(self):
+        with self.settings(TELEGRAM_CHAT_ID="42"):
+            notification = Notification.objects.enqueue("Hello")
+
+        self.assertEqual(notification.chat_id, "42")
+        self.assertEqual(notification.status, Notification.PENDING)
+
+
+class DispatcherTest(TestCase):
+    def setUp(self):
+        for i in range(3):
+            Notification.objects.enqueue(f"message {i}", chat_id="1")
+
+    def test_dispatch_sends_pending_notifications(self):
+        sender = FakeSender()
+        dispatcher = Dispatcher(send=sender)
+
+        async_to_sync(dispatcher.run)(once=True)
+
+        self.assertEqual(
+            sender.sent,
+            [("1", "message 0"), ("1", "message 1"), ("1", "message 2")],
+        )
+        self.assertEqual(
+            Notification.objects.filter(status=Notification.SENT).count(), 3
+        )
+
+    def test_dispatch_respects_batch_size(self):
+        sender = FakeSender()
+        dispatcher = Dispatcher(send=sender, batch_size=2)
+
+        attempted = async_to_sync(dispatcher.dispatch_batch)()
+
+        self.assertEqual(attempted, 2)
+        self.assertEqual(len(sender.sent), 2)
+
+    def test_failure_schedules_retry_with_backoff(self):
+        dispatcher = Dispatcher(
+            send=FakeSender(fail=True),
+            breaker=CircuitBreaker(failure_threshold=100),
+        )
+
+        async_to_sync(dispatcher.dispatch_batch)()
+
+        for notification in Notification.objects.all():
+            self.assertEqual(notification.status, Notification.PENDING)
+            self.assertEqual(notification.attempts, 1)
+            self.assertGreater(notification.next_attempt_at, timezone.now())
+            self.assertIn("Telegram is down", notification.last_error)
+
+    def test_failed_after_max_attempts(self):
+        dispatcher = Dispatcher(
+            send=FakeSender(fail=True),
+            max_attempts=1,
+            breaker=CircuitBreaker(failure_threshold=100),
+        )
+
+        async_to_sync(dispatcher.dispatch_batch)()
+
+        self.assertEqual(
+            Notification.objects.filter(status=Notification.FAILED).count(),
+            3,
+        )
+
+    def test_circuit_breaker_stops_sending(self):
+        clock = FakeClock()
+        sender = FakeSender(fail=True)
+        dispatcher = Dispatcher(
+            send=sender,
+            breaker=CircuitBreaker(
+                failure_threshold=1, reset_timeout=60, clock=clock
+            ),
+        )
+
+        attempted = async_to_sync(dispatcher.dispatch_batch)()
+
+        self.assertEqual(attempted, 1)
+        self.assertEqual(dispatcher.breaker.state, CircuitBreaker.OPEN)
+
+        Notification.objects.update(next_attempt_at=timezone.now())
+        sender.fail = False
+        self.assertEqual(async_to_sync(dispatcher.dispatch_batch)(), 0)
+
+        clock.now = 61
+        async_to_sync(dispatcher.run)(once=True)
+
+        self.assertEqual(dispatcher.breaker.state, CircuitBreaker.CLOSED)
+        self.assertEqual(len(sender.sent), 3)
+
+    def test_batch_is_claimed_once(self):
+        first = Dispatcher(send=FakeSender(), batch_size=2)
+        second = Dispatcher(send=FakeSender())
+
+        batch = first.fetch_batch()
+
+        self.assertEqual([n.text for n in batch], ["message 0", "message 1"])
+        self.assertEqual([n.text for n in second.fetch_batch()], ["message 2"])
+        self.assertEqual(second.fetch_batch(), [])
+
+    def test_lease_expires(self):
+        dispatcher = Dispatcher(send=FakeSender(), lease=60)
+        self.assertEqual(len(dispatcher.fetch_batch()), 3)
+
+        Notification.objects.update(
+            next_attempt_at=timezone.now() - timedelta(seconds=1)
+        )
+
+        self.assertEqual(len(dispatcher.fetch_batch()), 3)
+
+    def test_unattempted_notifications_are_released(self):
+        dispatcher = Dispatcher(
+            send=FakeSender(), digest_max_events=5, digest_interval=60
+        )
+
+        self.assertEqual(async_to_sync(dispatcher.dispatch_batch)(), 0)
+
+        self.assertEqual(len(dispatcher.fetch_batch()), 3)
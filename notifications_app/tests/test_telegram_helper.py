@@ -0,0 +1,143 @@
+from datetime import timedelta
+
+from asgiref.sync import async_to_sync
+from django.test import TestCase
+from django.utils import timezone
+
+from notifications_app.dispatcher import CircuitBreaker, Dispatcher
+from notifications_app.models import Notification
+from telegram_helper import (
+    TelegramHelper,
+    build_digests,
+    close_telegram_helpers,
+    get_telegram_helper,
+)
+
+
+class FakeBot:
+    """Local stand-in for telegram.Bot that records sent messages."""
+
+    def __init__(self):
+        self.messages = []
+        self.closed = False
+
+    async def send_message(self, chat_id, text):
+        self.messages.append((chat_id, text))
+
+    async def shutdown(self):
+        self.closed = True
+
+
+class TelegramHelperTest(TestCase):
+    def test_shared_helper_is_reused(self):
+        first = get_telegram_helper("123:token", "1")
+        second = get_telegram_helper("123:token", "1")
+
+        self.assertIs(first, second)
+        self.assertIs(first.bot, second.bot)
+
+        async_to_sync(close_telegram_helpers)()
+        self.assertIsNot(get_telegram_helper("123:token", "1"), first)
+        async_to_sync(close_telegram_helpers)()
+
+    def test_send_message_to_other_chat(self):
+        bot = FakeBot()
+        helper = TelegramHelper("123:token", "1", bot=bot)
+
+        async_to_sync(helper.send_message)("Hello")
+        async_to_sync(helper.send_message)("Hi", chat_id="2")
+
+        self.assertEqual(bot.messages, [("1", "Hello"), ("2", "Hi")])
+
+    def test_build_digests_respects_limit(self):
+        digests = build_digests(["a" * 6, "b" * 6, "c" * 6], limit=14)
+
+        self.assertEqual(digests, ["a" * 6 + "\n\n" + "b" * 6, "c" * 6])
+
+
+class DigestDispatcherTest(TestCase):
+    def setUp(self):
+        self.bot = FakeBot()
+        self.helper = TelegramHelper("123:token", "1", bot=self.bot)
+
+    def dispatcher(self, **kwargs):
+        return Dispatcher(send=self.send, **kwargs)
+
+    async def send(self, chat_id, text):
+        await self.helper.send_message(text, chat_id=chat_id)
+
+    def test_burst_is_merged_into_one_message_per_chat(self):
+        for i in range(5):
+            Notification.objects.enqueue(f"event {i}", chat_id="1")
+        Notification.objects.enqueue("other chat", chat_id="2")
+        Notification.objects.update(
+            created_at=timezone.now() - timedelta(minutes=1)
+        )
+
+        dispatcher = self.dispatcher(digest_max_events=10, digest_interval=30)
+        async_to_sync(dispatcher.run)(once=True)
+
+        self.assertEqual(len(self.bot.messages), 2)
+        chat_id, text = self.bot.messages[0]
+        self.assertEqual(chat_id, "1")
+        self.assertEqual(text.count("event"), 5)
+        self.assertEqual(
+            Notification.objects.filter(status=Notification.SENT).count(), 6
+        )
+
+    def test_failed_digest_does_not_resend_earlier_ones(self):
+        for i in range(3):
+            Notification.objects.enqueue(f"event {i} " + "x" * 1500, "1")
+        sent = []
+
+        async def send(chat_id, text):
+            if sent:
+                raise ConnectionError("Telegram is down")
+            sent.append(text)
+
+        # The first two events fit in one digest, the third doesn't
+        dispatcher = Dispatcher(
+            send=send,
+            digest_max_events=3,
+            breaker=CircuitBreaker(failure_threshold=100),
+        )
+        async_to_sync(dispatcher.dispatch_batch)()
+
+        self.assertEqual(len(sent), 1)
+        self.assertEqual(
+            list(
+                Notification.objects.order_by("id").values_list(
+                    "status", "attempts"
+                )
+            ),
+            [
+                (Notification.SENT, 0),
+                (Notification.SENT, 0),
+                (Notification.PENDING, 1),
+            ],
+        )
+
+    def test_digest_waits_for_interval(self):
+        Notification.objects.enqueue("event", chat_id="1")
+
+        dispatcher = self.dispatcher(digest_max_events=10, digest_interval=30)
+        async_to_sync(dispatcher.run)(once=True)
+
+        self.assertEqual(self.bot.messages, [])
+        self.assertEqual(
+            Notification.objects.get().status, Notification.PENDING
+        )
+
+    def test_digest_sent_when_max_events_reached(self):
+        for i in range(5):
+            Notification.objects.enqueue(f"event {i}", chat_id="1")
+
+        dispatcher = self.dispatcher(digest_max_events=2, digest_interval=30)
+        async_to_sync(dispatcher.dispatch_batch)()
+
+        self.assertEqual(len(self.bot.messages), 3)
+        self.assertFalse(
+            Notification.objects.filter(
+                status=Notification.PENDING
+            ).exists()
+        )
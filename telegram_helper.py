@@ -1,10 +1,87 @@
 from telegram import Bot
+from telegram.constants import MessageLimit
+from telegram.request import HTTPXRequest
+
+DEFAULT_POOL_SIZE = 8
+DIGEST_SEPARATOR = "\n\n"
+
+_shared_helpers = {}
 
 
 class TelegramHelper:
-    def __init__(self, token, chat_id):
-        self.bot = Bot(token)
+    def __init__(self, token, chat_id, bot=None, pool_size=DEFAULT_POOL_SIZE):
+        self.bot = bot or Bot(
+            token,
+            request=HTTPXRequest(connection_pool_size=pool_size),
+        )
         self.chat_id = chat_id
 
-    async def send_message(self, text):
-        await self.bot.send_message(chat_id=self.chat_id, text=text)
+    async def send_message(self, text, chat_id=None):
+        await self.bot.send_message(
+            chat_id=chat_id or self.chat_id,
+            text=text,
+        )
+
+    async def close(self):
+        await self.bot.shutdown()
+
+
+def get_telegram_helper(token, chat_id):
+    """
+    Return a process-wide helper for the given bot token.
+    The helper keeps its HTTP connections open between messages,
+    so it must be used from a single event loop
+    (e.g. the one of the notification dispatcher).
+    """
+    key = (token, chat_id)
+
+    if key not in _shared_helpers:
+        _shared_helpers[key] = TelegramHelper(token, chat_id)
+
+    return _shared_helpers[key]
+
+
+async def close_telegram_helpers():
+    """Close the pooled connections of all shared helpers."""
+    while _shared_helpers:
+        _, helper = _shared_helpers.popitem()
+        await helper.close()
+
+
+def split_digests(texts, limit=MessageLimit.MAX_TEXT_LENGTH):
+    """
+    Split several messages, in order, into as few groups as possible
+    whose digest (see ``build_digests``) fits within Telegram's message
+    length limit. Too long messages are cut.
+    """
+    groups = []
+    current = []
+    length = 0
+
+    for text in texts:
+        text = text[:limit]
+        extra = len(text) + (len(DIGEST_SEPARATOR) if current else 0)
+
+        if current and length + extra > limit:
+            groups.append(current)
+            current = []
+            extra = len(text)
+            length = 0
+
+        current.append(text)
+        length += extra
+
+    if current:
+        groups.append(current)
+
+    return groups
+
+
+def build_digests(texts, limit=MessageLimit.MAX_TEXT_LENGTH):
+    """
+    Merge several messages into as few digest messages as possible,
+    keeping every digest within Telegram's message length limit.
+    """
+    return [
+        DIGEST_SEPARATOR.join(group) for group in split_digests(texts, limit)
+    ]
@@ -4,3 +4,14 @@ from django.apps import AppConfig
 class UsersConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "users"
+
+    def ready(self):
+        from django.db.models.signals import post_delete, post_save
+
+        from users.authentication import forget_saved_user
+
+        # Registers the OpenAPI security scheme of the authentication
+        import users.schema  # noqa: F401
+
+        post_save.connect(forget_saved_user, sender="users.User")
+        post_delete.connect(forget_saved_user, sender="users.User")
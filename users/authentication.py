@@ -0,0 +1,230 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils.functional import cached_property
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+CACHE_PREFIX = "auth"
+# Token claims of the user, besides the user id
+CLAIMS = ("is_staff", "is_superuser", "auth_version")
+
+
+def set_user_claims(token, user):
+    for claim in CLAIMS:
+        token[claim] = getattr(user, claim)
+
+
+def get_auth_version(user_id):
+    """
+    ``auth_version`` of an active user, None if the user is inactive
+    or deleted, read through a cache of AUTH_USER_CACHE_TIMEOUT seconds.
+    """
+    key = f"{CACHE_PREFIX}:version:{user_id}"
+    version = cache.get(key)
+
+    if version is None:
+        row = (
+            get_user_model()
+            .objects.filter(pk=user_id)
+            .values_list("auth_version", "is_active")
+            .first()
+        )
+        version = row[0] if row and row[1] else -1
+        cache.set(key, version, settings.AUTH_USER_CACHE_TIMEOUT)
+
+    return None if version == -1 else version
+
+
+async def aget_auth_version(user_id):
+    """Async version of ``get_auth_version``."""
+    key = f"{CACHE_PREFIX}:version:{user_id}"
+    version = await cache.aget(key)
+
+    if version is None:
+        row = await (
+            get_user_model()
+            .objects.filter(pk=user_id)
+            .values_list("auth_version", "is_active")
+            .afirst()
+        )
+        version = row[0] if row and row[1] else -1
+        await cache.aset(key, version, settings.AUTH_USER_CACHE_TIMEOUT)
+
+    return None if version == -1 else version
+
+
+def get_cached_user(user_id):
+    """The user with ``user_id`` (None if deleted), cached like above."""
+    key = f"{CACHE_PREFIX}:user:{user_id}"
+    user = cache.get(key)
+
+    if user is None:
+        user = get_user_model().objects.filter(pk=user_id).first()
+
+        if user is not None:
+            cache.set(key, user, settings.AUTH_USER_CACHE_TIMEOUT)
+
+    return user
+
+
+async def aget_cached_user(user_id):
+    """Async version of ``get_cached_user``."""
+    key = f"{CACHE_PREFIX}:user:{user_id}"
+    user = await cache.aget(key)
+
+    if user is None:
+        user = await get_user_model().objects.filter(pk=user_id).afirst()
+
+        if user is not None:
+            await cache.aset(key, user, settings.AUTH_USER_CACHE_TIMEOUT)
+
+    return user
+
+
+def forget_user(user_id):
+    cache.delete_many(
+        [f"{CACHE_PREFIX}:version:{user_id}", f"{CACHE_PREFIX}:user:{user_id}"]
+    )
+
+
+def forget_saved_user(sender, instance, **kwargs):
+    forget_user(instance.pk)
+
+
+class ClaimsUser(TokenUser):
+    """
+    User built from the claims of an access token: ``id``, ``is_staff``
+    and ``is_superuser`` cost nothing. Any other attribute is read from
+    the full user, loaded on first use through the user cache, and so
+    are the permissions of non-superusers (TokenUser has none).
+
+    The token of a user deleted since it was checked fails with
+    AuthenticationFailed when the full user is needed.
+    """
+
+    @cached_property
+    def user(self):
+        user = get_cached_user(self.id)
+
+        if user is None:
+            raise AuthenticationFailed(
+                "User not found", code="user_not_found"
+            )
+
+        return user
+
+    def __getattr__(self, attr):
+        if attr.startswith("_"):
+            raise AttributeError(attr)
+        return getattr(self.user, attr)
+
+    def __str__(self):
+        return str(self.user)
+
+    # Superusers are active (see ClaimsJWTAuthentication) and have
+    # every permission, the others' are read from the database
+
+    def has_perm(self, perm, obj=None):
+        return self.is_superuser or self.user.has_perm(perm, obj)
+
+    def has_perms(self, perm_list, obj=None):
+        return self.is_superuser or self.user.has_perms(perm_list, obj)
+
+    def has_module_perms(self, module):
+        return self.is_superuser or self.user.has_module_perms(module)
+
+    def get_all_permissions(self, obj=None):
+        return self.user.get_all_permissions(obj)
+
+    def get_group_permissions(self, obj=None):
+        return self.user.get_group_permissions(obj)
+
+
+def get_model_user(user):
+    """The User instance of a request user, loaded if it is a ClaimsUser."""
+    if isinstance(user, ClaimsUser):
+        return user.user
+    return user
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication without a user query per request.
+
+    Tokens issued with the user claims (see ``set_user_claims``) are
+    trusted as long as their ``auth_version`` is the current one of an
+    active user. It is cached for AUTH_USER_CACHE_TIMEOUT seconds, so
+    deactivating or demoting a user (which bumps it) revokes the tokens
+    at once in this process and within that time in the others. Older
+    tokens get the full user from the user cache.
+    """
+
+    def get_user(self, validated_token):
+        user_id = self.get_user_id(validated_token)
+
+        if "auth_version" not in validated_token:
+            return self.check_user(get_cached_user(user_id))
+
+        self.check_auth_version(validated_token, get_auth_version(user_id))
+
+        return ClaimsUser(validated_token)
+
+    async def aauthenticate(self, request):
+        """
+        Async version of ``authenticate`` for plain Django async views,
+        with the cache and the ORM awaited.
+        """
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+
+        return await self.aget_user(validated_token), validated_token
+
+    async def aget_user(self, validated_token):
+        user_id = self.get_user_id(validated_token)
+
+        if "auth_version" not in validated_token:
+            return self.check_user(await aget_cached_user(user_id))
+
+        self.check_auth_version(
+            validated_token, await aget_auth_version(user_id)
+        )
+
+        return ClaimsUser(validated_token)
+
+    @staticmethod
+    def get_user_id(validated_token):
+        try:
+            return validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise AuthenticationFailed(
+                "Token contained no recognizable user identification",
+                code="token_not_valid",
+            )
+
+    @staticmethod
+    def check_user(user):
+        if user is None:
+            raise AuthenticationFailed("User not found", code="user_not_found")
+        if not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed(
+                "User is inactive", code="user_inactive"
+            )
+
+        return user
+
+    @staticmethod
+    def check_auth_version(validated_token, auth_version):
+        if validated_token["auth_version"] != auth_version:
+            raise AuthenticationFailed(
+                "Token has been revoked", code="token_revoked"
+            )
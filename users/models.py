@@ -40,11 +40,45 @@ class UserManager(BaseUserManager):
 class User(AbstractUser):
     username = None
     email = models.EmailField(_("email address"), unique=True)
+    # Part of the tokens of the user, bumped to revoke all of them
+    auth_version = models.PositiveIntegerField(default=0)
+    # The ETags of the borrowings showing the user depend on it
+    updated_at = models.DateTimeField(auto_now=True)
 
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = []
+    # Changing any of these revokes the issued tokens
+    TOKEN_FIELDS = ("is_active", "is_staff", "is_superuser", "password")
 
     objects = UserManager()
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        user = super().from_db(db, field_names, values)
+
+        # Deferred fields are unknown, changes can't be detected
+        if not user.get_deferred_fields() & set(cls.TOKEN_FIELDS):
+            user._token_state = user.get_token_state()
+
+        return user
+
+    def get_token_state(self):
+        return tuple(getattr(self, field) for field in self.TOKEN_FIELDS)
+
+    def save(self, *args, **kwargs):
+        token_state = getattr(self, "_token_state", None)
+
+        if token_state is not None and token_state != self.get_token_state():
+            self.auth_version += 1
+
+            update_fields = kwargs.get("update_fields")
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "auth_version"}
+
+        super().save(*args, **kwargs)
+
+        if not self.get_deferred_fields() & set(self.TOKEN_FIELDS):
+            self._token_state = self.get_token_state()
+
     def __str__(self):
         return f"{self.first_name} {self.last_name} ({self.email})"
@@ -0,0 +1,7 @@
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+
+
+class ClaimsJWTScheme(SimpleJWTScheme):
+    """The jwtAuth security scheme of ClaimsJWTAuthentication."""
+
+    target_class = "users.authentication.ClaimsJWTAuthentication"
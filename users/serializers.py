@@ -1,5 +1,13 @@
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import (
+    TokenObtainPairSerializer,
+    TokenRefreshSerializer,
+)
+from rest_framework_simplejwt.settings import api_settings
+
+from users.authentication import set_user_claims
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -27,3 +35,37 @@ class UserSerializer(serializers.ModelSerializer):
             user.save()
 
         return user
+
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """Issue tokens carrying the claims ClaimsJWTAuthentication needs."""
+
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        set_user_claims(token, user)
+        return token
+
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    """Refuse to refresh the tokens of an inactive or changed user."""
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs["refresh"])
+        user = (
+            get_user_model()
+            .objects.filter(pk=refresh.get(api_settings.USER_ID_CLAIM))
+            .first()
+        )
+
+        if (
+            user is None
+            or not user.is_active
+            or refresh.get("auth_version", user.auth_version)
+            != user.auth_version
+        ):
+            raise AuthenticationFailed(
+                "Token has been revoked", code="token_revoked"
+            )
+
+        return super().validate(attrs)
@@ -1,5 +1,21 @@
-from django.test import TestCase
 from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Permission
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from drf_spectacular.drainage import GENERATOR_STATS
+from drf_spectacular.generators import SchemaGenerator
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from users.authentication import ClaimsUser, get_model_user
+
+TOKEN_URL = reverse("users:token_obtain_pair")
+REFRESH_URL = reverse("users:token_refresh")
+BORROWINGS_LIST_URL = reverse("borrowings_app:borrowing-list")
+ME_URL = reverse("users:manage")
 
 
 class UserModelTest(TestCase):
@@ -13,3 +29,189 @@ class UserModelTest(TestCase):
 
     def test_str_method(self):
         self.assertEqual(str(self.user), "John Lennon (testovich@test.com)")
+
+
+class ClaimsJWTAuthenticationTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "reader@test.com", "test12345", is_staff=True
+        )
+
+    def obtain_tokens(self):
+        res = self.client.post(
+            TOKEN_URL, {"email": "reader@test.com", "password": "test12345"}
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res.data
+
+    def get_borrowings(self, access):
+        return self.client.get(
+            BORROWINGS_LIST_URL, HTTP_AUTHORIZE=f"Bearer {access}"
+        )
+
+    def test_token_carries_claims(self):
+        access = AccessToken(self.obtain_tokens()["access"])
+
+        self.assertTrue(access["is_staff"])
+        self.assertFalse(access["is_superuser"])
+        self.assertEqual(access["auth_version"], 0)
+
+    def test_no_user_query_per_request(self):
+        access = self.obtain_tokens()["access"]
+        self.get_borrowings(access)
+
+        # ETag version and borrowings only
+        with self.assertNumQueries(2):
+            res = self.get_borrowings(access)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_claims_user(self):
+        token = AccessToken(self.obtain_tokens()["access"])
+        user = ClaimsUser(token)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(user.id, self.user.id)
+            self.assertTrue(user.is_staff)
+
+        self.assertEqual(user.email, "reader@test.com")
+        self.assertEqual(str(user), str(self.user))
+        self.assertEqual(get_model_user(user), self.user)
+
+    def test_claims_user_permissions(self):
+        self.user.user_permissions.add(
+            Permission.objects.get(codename="view_book")
+        )
+        user = ClaimsUser(AccessToken(self.obtain_tokens()["access"]))
+
+        self.assertTrue(user.has_perm("books_app.view_book"))
+        self.assertFalse(user.has_perm("books_app.delete_book"))
+        self.assertTrue(user.has_module_perms("books_app"))
+        self.assertIn("books_app.view_book", user.get_all_permissions())
+
+        self.user.is_superuser = True
+        self.user.save()
+        superuser = ClaimsUser(AccessToken(self.obtain_tokens()["access"]))
+
+        with self.assertNumQueries(0):
+            self.assertTrue(superuser.has_perm("books_app.delete_book"))
+
+    def test_claims_user_deleted(self):
+        user = ClaimsUser(AccessToken(self.obtain_tokens()["access"]))
+        self.user.delete()
+
+        with self.assertRaises(AuthenticationFailed):
+            user.email
+
+    def test_revoked_on_deactivation_and_demotion(self):
+        for field in ("is_active", "is_staff"):
+            access = self.obtain_tokens()["access"]
+            self.assertEqual(
+                self.get_borrowings(access).status_code, status.HTTP_200_OK
+            )
+
+            setattr(self.user, field, False)
+            self.user.save()
+
+            res = self.get_borrowings(access)
+            self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+            self.user.is_active = True
+            self.user.save()
+
+    def test_revoked_on_password_change(self):
+        tokens = self.obtain_tokens()
+
+        self.user.set_password("changed12345")
+        self.user.save()
+
+        res = self.get_borrowings(tokens["access"])
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        res = self.client.post(REFRESH_URL, {"refresh": tokens["refresh"]})
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_revoked_token_cannot_manage_user(self):
+        access = self.obtain_tokens()["access"]
+        headers = {"HTTP_AUTHORIZE": f"Bearer {access}"}
+
+        res = self.client.get(ME_URL, **headers)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["email"], "reader@test.com")
+
+        self.user.set_password("changed12345")
+        self.user.is_staff = False
+        self.user.save()
+
+        res = self.client.get(ME_URL, **headers)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        res = self.client.patch(
+            ME_URL, {"password": "hijacked12345"}, **headers
+        )
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password("changed12345"))
+
+    def test_manage_user(self):
+        access = self.obtain_tokens()["access"]
+
+        res = self.client.patch(
+            ME_URL,
+            {"first_name": "Changed"},
+            HTTP_AUTHORIZE=f"Bearer {access}",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.first_name, "Changed")
+
+    def test_login_does_not_revoke(self):
+        access = self.obtain_tokens()["access"]
+
+        self.user.refresh_from_db()
+        self.user.last_login = None
+        self.user.first_name = "Changed"
+        self.user.save()
+
+        self.assertEqual(
+            self.get_borrowings(access).status_code, status.HTTP_200_OK
+        )
+
+    def test_refresh(self):
+        tokens = self.obtain_tokens()
+
+        res = self.client.post(REFRESH_URL, {"refresh": tokens["refresh"]})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(AccessToken(res.data["access"])["is_staff"])
+
+        self.user.is_active = False
+        self.user.save()
+        res = self.client.post(REFRESH_URL, {"refresh": res.data["refresh"]})
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_token_without_claims(self):
+        access = RefreshToken.for_user(self.user).access_token
+
+        res = self.get_borrowings(access)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        self.user.is_active = False
+        self.user.save()
+
+        res = self.get_borrowings(access)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class SchemaTest(TestCase):
+    def test_api_operations_use_jwt(self):
+        with GENERATOR_STATS.silence():
+            schema = SchemaGenerator().get_schema(request=None, public=True)
+
+        for path in ("/api/books/", "/api/borrowings/"):
+            self.assertIn(
+                {"jwtAuth": []}, schema["paths"][path]["get"]["security"]
+            )
@@ -1,6 +1,6 @@
+from django.contrib.auth import get_user_model
 from rest_framework import generics
 from rest_framework.permissions import IsAuthenticated
-from rest_framework_simplejwt.authentication import JWTAuthentication
 
 from users.serializers import UserSerializer
 
@@ -11,8 +11,9 @@ class CreateUserView(generics.CreateAPIView):
 
 class ManageUserView(generics.RetrieveUpdateAPIView):
     serializer_class = UserSerializer
-    authentication_classes = (JWTAuthentication,)
     permission_classes = (IsAuthenticated,)
 
     def get_object(self):
-        return self.request.user
+        # Not the cached user of a ClaimsUser, which may be stale and
+        # would overwrite recent changes when saved
+        return get_user_model().objects.get(pk=self.request.user.id)